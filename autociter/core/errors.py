@@ -18,3 +18,8 @@
 class AutociterError(Exception):
    """Base class for all user-defined exceptions."""
    pass
+
+
+class DocumentTooLargeError(AutociterError):
+   """Raised when a downloaded document exceeds its size limit."""
+   pass
@@ -15,6 +15,7 @@
 # Author: Michael Wan <m.wan@berkeley.edu>
 """Data pipeline file that extracts and prepares data for analysis"""
 
+import atexit
 import datetime
 import inspect
 import io
@@ -24,48 +25,210 @@ import os.path
 import re
 import string
 import sys
+import tempfile
+import threading
 import time
-import requests
 
 from PyPDF2 import PdfFileReader
+from PyPDF2.generic import NameObject
+try:
+    from PyPDF2 import PageObject
+except ImportError:  # PyPDF2 < 2.0
+    from PyPDF2.pdf import PageObject
 from termcolor import colored
 
 from dateparser.search import search_dates
 
 import autociter.data.standardization as standardization
 import autociter.data.queries as queries
-from autociter.data.storage import Table
-from autociter.web.webpages import Webpage
-from autociter.utils.decorators import timeout
+import autociter.data.mapped as mapped
+import autociter.data.datasets as datasets
+from autociter.data.storage import LazyView
+from autociter.core.errors import DocumentTooLargeError
+from autociter.web import connections
+from autociter.web.scheduling import HostScheduler
+from autociter.web.webpages import Webpage, ua
+from autociter.utils.deadlines import Deadline
+from autociter.utils.workers import WorkerPool
 from autociter.utils.debugging import debug
 
 ASSETS_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../../assets'
 WIKI_FILE_PATH = ASSETS_PATH + '/data/citations.csv'
 BAD_WIKI_LINKS_PATH = ASSETS_PATH + '/data/bad_links.dat'
-ARTICLE_DATA_FILE_PATH = ASSETS_PATH + '/data/article_data.dat'
+ARTICLE_DATA_FILE_PATH = ASSETS_PATH + '/data/article_data'
+# Article data used to be saved as JSON, which migrate_saved_data converts
+LEGACY_ARTICLE_DATA_FILE_PATH = ASSETS_PATH + '/data/article_data.dat'
 
 SUPPORTED_SPECIAL_CHARS = ['-', ':', '.', ' ', '\n', '#']
 ENCODING_COL = list(string.ascii_uppercase) + list(string.ascii_lowercase) + \
                list(string.digits) + SUPPORTED_SPECIAL_CHARS
 ENCODING_RANGE = len(ENCODING_COL)
+ENCODING_INDEX = {char: index for index, char in enumerate(ENCODING_COL)}
+
+# The pipeline only needs text and headings, so it uses the lite converter
+HTML_CONVERTER = "lite"
+
+PDF_MAX_BYTES = 50 * 1024**2
+PDF_SPOOL_BYTES = 1024**2
+PDF_INHERITABLE_PAGE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox",
+                                   "/Rotate")
+# Set PDF_WORKER_COUNT to 0 to parse pdfs without worker processes
+PDF_WORKER_COUNT = min(4, os.cpu_count() or 1)
+PDF_PARSE_TIMEOUT = 15
+PDF_WORKERS = None
+PDF_WORKERS_LOCK = threading.Lock()
 
 # Data Aggregation
 
-@timeout(15)
-def get_text_from_pdf(pdf_url):
-    """Method to retrieve text from an online pdf"""
-    start_time = time.time()
+def download_pdf(pdf_url, deadline, max_bytes=PDF_MAX_BYTES, file=None):
+    """Stream an online pdf into a temporary file and return the file
+
+    By default, the file is kept in memory while it is small and spills to disk
+    after PDF_SPOOL_BYTES, so memory use does not grow with the size of the pdf.
+    Arguments:
+        pdf_url, a string url
+        deadline, a Deadline for the download
+        max_bytes, the largest pdf that will be downloaded
+        file, a binary file object to download into (optional)
+    """
+    file = file or tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES)
     try:
-        req = requests.get(pdf_url, stream=True)
-        file = io.BytesIO(req.content)
-        reader = PdfFileReader(file, strict=False)
+        disk_cache = Webpage.DISK_CACHE
+        if disk_cache and disk_cache.get_file(pdf_url, file):
+            if file.tell() > max_bytes:
+                raise DocumentTooLargeError(
+                    "PDF exceeds {0} bytes".format(max_bytes))
+            file.seek(0)
+            return file
+        headers = {"User-Agent": ua.random}
+        with connections.DEFAULT_POOL.urlopen(
+                pdf_url, headers=headers, deadline=deadline) as response:
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise DocumentTooLargeError(
+                    "PDF is {0} bytes (limit {1})".format(length, max_bytes))
+            size = 0
+            for chunk in response.stream(deadline):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLargeError(
+                        "PDF exceeds {0} bytes".format(max_bytes))
+                file.write(chunk)
+        if disk_cache:
+            file.seek(0)
+            disk_cache.put_file(pdf_url, file)
+        file.seek(0)
+        return file
+    except:
+        file.close()
+        raise
+
+
+def get_pdf_page(reader, page_number):
+    """Return a page of a pdf by descending the page tree
+
+    Unlike PdfFileReader.getPage, only the page tree nodes on the path to the
+    requested page are read, rather than every page in the document.
+    """
+    node = reader.trailer["/Root"]["/Pages"]
+    reference, inherited = None, {}
+    while "/Kids" in node:
+        for attribute in PDF_INHERITABLE_PAGE_ATTRIBUTES:
+            if attribute in node:
+                inherited[attribute] = node[attribute]
+        for kid in node["/Kids"]:
+            kid_node = kid.getObject()
+            count = kid_node.get("/Count", 1) if "/Kids" in kid_node else 1
+            if page_number < count:
+                node, reference = kid_node, kid
+                break
+            page_number -= count
+        else:
+            raise IndexError("PDF page index out of range")
+    page = PageObject(reader, reference)
+    for attribute, value in inherited.items():
+        page[NameObject(attribute)] = value
+    page.update(node)
+    return page
+
+
+def extract_text_from_pdf(file, deadline=None):
+    """Return the text of the first and last pages of a pdf file object"""
+    reader = PdfFileReader(file, strict=False)
+    try:
+        num_pages = reader.trailer["/Root"]["/Pages"]["/Count"]
+        get_page = lambda number: get_pdf_page(reader, number)
+    except (KeyError, TypeError, ValueError):
+        # Fall back on the full page tree for malformed pdfs
         num_pages = reader.getNumPages()
-        contents = reader.getPage(0).extractText()
-        if num_pages > 1:
-            contents += reader.getPage(num_pages - 1).extractText()
+        get_page = reader.getPage
+    if deadline:
+        deadline.check()
+    contents = get_page(0).extractText()
+    if num_pages > 1:
+        if deadline:
+            deadline.check()
+        contents += get_page(num_pages - 1).extractText()
+    return contents
+
+
+def pdf_to_text(source):
+    """Return the standardized text of the first and last pages of a pdf
+
+    This function runs in the PDF worker processes.
+    Arguments:
+        source, a pdf as bytes or the path to a pdf file
+    """
+    if isinstance(source, bytes):
+        contents = extract_text_from_pdf(io.BytesIO(source))
+    else:
+        with open(source, "rb") as file:
+            contents = extract_text_from_pdf(file)
+    return standardization.standardize(contents, "text")
+
+
+def get_pdf_workers():
+    """Return the pool of processes that parse pdfs, creating it if needed
+
+    Returns None if PDF_WORKER_COUNT is 0, in which case pdfs are parsed in the
+    calling process.
+    """
+    global PDF_WORKERS  # pylint: disable=global-statement
+    with PDF_WORKERS_LOCK:
+        if PDF_WORKERS is None and PDF_WORKER_COUNT:
+            PDF_WORKERS = WorkerPool(
+                pdf_to_text,
+                num_workers=PDF_WORKER_COUNT,
+                max_pending=4 * PDF_WORKER_COUNT,
+                timeout=PDF_PARSE_TIMEOUT)
+            atexit.register(PDF_WORKERS.close)
+        return PDF_WORKERS
+
+
+def get_text_from_pdf(pdf_url, deadline=None, max_bytes=PDF_MAX_BYTES):
+    """Method to retrieve text from an online pdf
+
+    The pdf is parsed in a worker process, so that parsing does not hold the
+    GIL while other threads are fetching webpages.
+    Arguments:
+        pdf_url, a string url
+        deadline, a Deadline for downloading and parsing (default: 15 seconds)
+        max_bytes, the largest pdf that will be downloaded
+    """
+    start_time = time.time()
+    deadline = deadline or Deadline(15)
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as file:
+            download_pdf(pdf_url, deadline, max_bytes, file)
+            file.flush()
+            workers = get_pdf_workers()
+            if workers:
+                text = workers.apply(file.name, deadline=deadline)
+            else:
+                text = pdf_to_text(file.name)
         debug("PDF scrape successfully finished in {0} seconds: {1}".format(
             time.time() - start_time, pdf_url))
-        return standardization.standardize(contents, "text")
+        return text
     except Exception as error:
         func_name = inspect.getframeinfo(inspect.currentframe()).function
         debug(
@@ -75,15 +238,23 @@ def get_text_from_pdf(pdf_url):
         return ""
 
 
-@timeout(15)
-def get_text_from_url(url):
-    """Method to get text from any url"""
+def get_text_from_url(url, webpage=None, deadline=None):
+    """Method to get text from any url
+
+    Arguments:
+        url, a string url
+        webpage, an optional Webpage for url whose source may already be fetched
+        deadline, a Deadline for fetching and extracting (default: 15 seconds)
+    """
     start_time = time.time()
+    deadline = deadline or Deadline(15)
     if ".pdf" in url:
-        return get_text_from_pdf(url)
+        return get_text_from_pdf(url, deadline)
     else:
         try:
-            text = standardization.standardize(Webpage(url).content, "text")
+            webpage = webpage or Webpage(url, converter=HTML_CONVERTER)
+            webpage.deadline = deadline
+            text = standardization.standardize(webpage.content, "text")
             debug(
                 "Text scrape successfully finished in {0} seconds: {1}".format(
                     time.time() - start_time, url))
@@ -97,11 +268,10 @@ def get_text_from_url(url):
             return ""
 
 
-@timeout(15)
-def get_content_from_url(url):
+def get_content_from_url(url, webpage=None, deadline=None):
     # Extracts only the ceontent / specific text from a da
     try:
-        return slice_text(get_text_from_url(url))
+        return slice_text(get_text_from_url(url, webpage, deadline))
     except Exception as error:
         return ""
 
@@ -113,17 +283,14 @@ def get_wiki_article_links_info(file, args, num=1000, already_collected=[]):
     """
     debug("Reading Wikipedia Article Links from...", file)
     start_time = time.time()
-    table = standardization.standardize(Table(file), 'Table').query(
-        queries.contains(*args))
-    data = []
-    total = 0
-    for rec in table.records:
-        url = rec['url']
-        if url not in already_collected:
-            data.append(tuple([rec[a] for a in args]))
-            total += 1
-        if total == num:
-            break
+    # A set makes each already collected check O(1) when resuming with -append
+    already_collected = set(already_collected)
+    # Records are streamed and the view is lazy, so only the records before
+    # the num-th match are read and standardized
+    view = LazyView(mapped.stream(file)).map(
+        standardization.std_record).filter(queries.contains(*args)).filter(
+            lambda rec: rec['url'] not in already_collected).limit(num)
+    data = [tuple([rec[a] for a in args]) for rec in view]
 
     # data = [tuple([rec[a] for a in args]) for rec in table.records]
     # Return labels in order to remember what each index in a datapoint represents
@@ -134,13 +301,22 @@ def get_wiki_article_links_info(file, args, num=1000, already_collected=[]):
 
 
 def locate_attributes(text, citation_dict):
-    """Return indices of attribute in the text string if it is found"""
+    """Return indices of attribute in the text string if it is found
+
+    Arguments:
+        text, a string or a StandardizedDocument, which is standardized once
+            for all attributes
+        citation_dict, a dictionary mapping attributes to citation values
+    """
     location_dict = {}
-    std_text = standardization.standardize(text, 'text')
+    if isinstance(text, standardization.StandardizedDocument):
+        document = text
+    else:
+        document = standardization.StandardizedDocument(text)
     for key, val in citation_dict.items():
         if key != 'url' and val:
             data_field = standardization.standardize(val, key)
-            pos = standardization.find(data_field, std_text, key)
+            pos = standardization.find(data_field, document, key)
             good = False
             if isinstance(pos, list):
                 good = not all([k == (-1, -1) for k in pos])
@@ -151,11 +327,14 @@ def locate_attributes(text, citation_dict):
     return location_dict
 
 
-def aggregate_data(info):
+def aggregate_data(info, concurrency=16, max_per_host=2, min_interval=0.5):
     """Collect info and manipulate into the proper format to be saved
     as data
     Arguments:
         info, a tuple containing data points, and a label lookup dict
+        concurrency, the number of webpages downloaded simultaneously
+        max_per_host, the number of simultaneous downloads from a single host
+        min_interval, the minimum number of seconds between requests to a host
     """
 
     datapoints, label_lookup = info[0], info[1]
@@ -165,6 +344,18 @@ def aggregate_data(info):
     except:
         bad_links = {}
     debug("Getting {0} points...".format(len(datapoints)))
+    urls = [entry[label_lookup['url']] for entry in datapoints]
+    scheduler = HostScheduler(concurrency, max_per_host, min_interval)
+    webpages = Webpage.fetch_many(
+        [Webpage(url, converter=HTML_CONVERTER)
+         for url in urls if ".pdf" not in url],
+        scheduler=scheduler)
+    scheduler.shutdown()
+    webpages = {webpage.url: webpage for webpage in webpages}
+    busiest_hosts = sorted(
+        scheduler.stats().items(), key=lambda item: -item[1].total_wait)
+    for host, host_stats in busiest_hosts[:5]:
+        debug("Fetched {0}: {1}".format(host, host_stats))
     for entry in datapoints:
         url = entry[label_lookup['url']]
         citation_dict = {
@@ -172,18 +363,20 @@ def aggregate_data(info):
             for x in label_lookup.keys()
         }
         try:
-            text = get_content_from_url(url)
+            text = get_content_from_url(url, webpages.get(url))
             if text.strip() != "":
                 vec = vectorize_text(text)
                 if vec:
+                    # Standardize and index the article once for all attributes
+                    document = standardization.StandardizedDocument(text)
                     entry = {
                         'url': url,
                         'citation_info': {},
-                        'article_one_hot': str(hash_vectorization(vec))
+                        'article_indices': hash_vectorization(vec)
                     }
                     for key in citation_dict.keys():
                         entry['citation_info'][key] = citation_dict[key]
-                    entry['locs'] = locate_attributes(text, citation_dict)
+                    entry['locs'] = locate_attributes(document, citation_dict)
                     data.append(entry)
             else:
                 bad_links[url] = time.time()
@@ -196,41 +389,34 @@ def aggregate_data(info):
 
 
 def save_data(file_name, data, override_data=True):
-    """Given a file_name and data, a list of tuples containing url link, list of citation info,
-    create an entry in the dict in article_data.dat
+    """Given a file_name and data, a list of dicts containing url link, citation info, and
+    text vectorization, save each article to the dataset in file_name
     Arguments:
-        file_name, a string file name
-        data, a list of dicts, each dict contains the citation information, url, and text
-              vectorization of an article
+        file_name, a dataset directory
+        data, a list of dicts, each dict contains the citation information, url, text
+              vectorization, and attribute locations of an article
+        override_data, whether to replace the saved articles instead of adding to them
     """
-    aggregate_keys = ('article_one_hot', 'locs')
-
-    if not os.path.isfile(file_name):
-        file = open(file_name, "w+")
-        file.write('{}')
-        file.close()
+    with datasets.DatasetWriter(
+            file_name, ENCODING_RANGE, append=not override_data) as writer:
+        for datapoint in data:
+            writer.add(datapoint['url'], datapoint['citation_info'],
+                       datapoint['article_indices'], datapoint['locs'])
 
-    try:
-        if override_data:
-            saved_dict = {}
-        else:
-            saved_dict = json.load(open(file_name))
-    except:
-        saved_dict = {}
 
-    for datapoint in data:
-        chosen_key = datapoint['url']
-        saved_dict[chosen_key] = {}
-        for key, val in datapoint['citation_info'].items():
-            saved_dict[chosen_key][key] = val
-        for key in aggregate_keys:
-            saved_dict[chosen_key][key] = datapoint[key]
-    with open(file_name, 'w') as out:
-        json.dump(saved_dict, out, sort_keys=True, indent=4)
+def migrate_saved_data(source=LEGACY_ARTICLE_DATA_FILE_PATH,
+                       destination=ARTICLE_DATA_FILE_PATH):
+    """Convert article data saved as JSON into a dataset, unless the dataset
+    already exists"""
+    if os.path.isfile(source) and not datasets.is_dataset(destination):
+        debug("Migrating {0} to {1}...".format(source, destination))
+        datasets.migrate(source, destination, ENCODING_RANGE)
 
 
 def get_saved_keys(file_name):
     """Given a file_name, collect the saved data and return a data dict"""
+    if datasets.is_dataset(file_name):
+        return datasets.Dataset(file_name).urls
     if not os.path.isfile(file_name):
         print(colored(">>> Error: Opening file {0}".format(file_name), "red"))
         return []
@@ -239,15 +425,12 @@ def get_saved_keys(file_name):
 
 
 def get_saved_data(file_name):
-    """Given a file_name, collect the saved data and return a data dict"""
-    if not os.path.isfile(file_name):
+    """Given a dataset directory, return the saved Dataset, whose articles are
+    expanded to one-hot matrices with Dataset.one_hot"""
+    if not datasets.is_dataset(file_name):
         print(colored(">>> Error: Opening file {0}".format(file_name), "red"))
-        return {}
-    saved_dict = json.load(open(file_name))
-    for k in saved_dict.keys():
-        str_one_hot = eval(saved_dict[k]['article_one_hot'])
-        saved_dict[k]['article_one_hot'] = unhash_vectorization(str_one_hot)
-    return saved_dict
+        return None
+    return datasets.Dataset(file_name)
 
 
 # String Vectorization
@@ -263,25 +446,13 @@ def one_hot(str_):
                with dimensions (600, 1)
     """
     mat = [[0 for _ in range(ENCODING_RANGE)] for __ in range(len(str_))]
-    for i in range(len(str_)):
-        char = str_[i]
-        if ord(char) != 10 and not (ord(char) < 127 and ord(char) > 31):
-            char = standardization.clean_to_ascii(char)
-        if char not in ENCODING_COL:
+    for i, char in enumerate(standardization.transliterate(str_)):
+        if char not in ENCODING_INDEX:
             print(
                 colored("Not in one-hot encoding range: {0}".format(char),
                         'yellow'))
             char = ' '
-        if char.isupper():
-            mat[i][ord(char) - 65] = 1
-        elif char.islower():
-            mat[i][26 + ord(char) - 97] = 1
-        elif char.isnumeric():
-            mat[i][52 + ord(char) - 48] = 1
-        elif char in SUPPORTED_SPECIAL_CHARS:
-            ind = len(SUPPORTED_SPECIAL_CHARS) - SUPPORTED_SPECIAL_CHARS.index(
-                char)
-            mat[i][ENCODING_RANGE - ind] = 1
+        mat[i][ENCODING_INDEX[char]] = 1
     return mat
 
 
@@ -351,6 +522,7 @@ if __name__ == '__main__':
     OVERRIDE_DATA = True
     NUM_DATA_POINTS = 1000
     ALREADY_COLLECTED_KEYS = []
+    migrate_saved_data()
 
     if len(sys.argv) > 1:
         NUM_DATA_POINTS = int(sys.argv[1])
@@ -372,5 +544,5 @@ if __name__ == '__main__':
     DATA = aggregate_data(INFO)
     save_data(ARTICLE_DATA_FILE_PATH, DATA, override_data=OVERRIDE_DATA)
 
-# d = get_saved_data('assets/article_data.dat')
-# print(json.dumps(d, sort_keys=True, indent=4))
+# d = get_saved_data('assets/data/article_data')
+# print(d[0])
@@ -73,19 +73,21 @@ def build_model(input_length=68, output_dim=600):
     print("Outputs: {0}".format(model.output_shape))
     return model
 
-def get_x_y(train_data, attribute=""):
-    """Given the overall training data (list of dics), get a list of
+def get_x_y(dataset, attribute="", num=None):
+    """Given the overall training data (a Dataset) get a list of
     x (input) and y (output), which will be the input for the model (x),
-    and the supervised learning output (y)"""
-    x, y = [], []
-    for data_point in train_data:
-        if attribute in data_point['locs']:
-            x.append(np.array(data_point['article_one_hot']))
+    and the supervised learning output (y). Only the first num articles
+    are used, and only their one-hot matrices are built"""
+    articles, y = [], []
+    for article in range(len(dataset) if num is None else min(num, len(dataset))):
+        locs = dataset[article]['locs']
+        if attribute in locs:
+            articles.append(article)
             # To-do: if attribute is author, do something special because
             # type could be list
             if attribute == 'author':
-                authors = data_point['locs']['author']
-                hash_map = [0] * len(data_point['article_one_hot'])
+                authors = locs['author']
+                hash_map = [0] * dataset.length
                 for loc in authors:
                     for i in range(loc[0], loc[1]):
                         hash_map[i] = 1
@@ -96,15 +98,14 @@ def get_x_y(train_data, attribute=""):
                         ">>> Fatal Error: Attribute model not supported yet",
                         "cyan", "on_red"))
                 sys.exit()
-    return np.array(x), np.array(y)
+    return dataset.one_hot(articles), np.array(y)
 
 def train(attribute, num, max_epoch=250, nfolds=10, batch_size=128):
-    saved_article_data_path = ASSETS_PATH + '/data/article_data.dat'
-    saved_article_data = pipeline.get_saved_data(saved_article_data_path)
-    article_data = list(saved_article_data.values())[:num]
+    pipeline.migrate_saved_data()
+    dataset = pipeline.get_saved_data(pipeline.ARTICLE_DATA_FILE_PATH)
     process_id = int(time.time())
 
-    X, Y = get_x_y(article_data, attribute=attribute)
+    X, Y = get_x_y(dataset, attribute=attribute, num=num)
 
     print("X.shape", X.shape)
     print("Y.shape", Y.shape)
@@ -164,12 +165,11 @@ def train(attribute, num, max_epoch=250, nfolds=10, batch_size=128):
     return optimal_model
 
 def simple_train(attribute, num):
-    saved_article_data_path = ASSETS_PATH + '/data/article_data.dat'
-    saved_article_data = pipeline.get_saved_data(saved_article_data_path)
-    article_data = list(saved_article_data.values())[:num]
+    pipeline.migrate_saved_data()
+    dataset = pipeline.get_saved_data(pipeline.ARTICLE_DATA_FILE_PATH)
     process_id = int(time.time())
 
-    X, Y = get_x_y(article_data, attribute=attribute)
+    X, Y = get_x_y(dataset, attribute=attribute, num=num)
 
     print("X.shape", X.shape)
     print("Y.shape", Y.shape)
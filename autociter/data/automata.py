@@ -0,0 +1,139 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Library that finds many strings in a text at once with an Aho-Corasick
+automaton
+
+References:
+Aho, A. V., & Corasick, M. J. (1975). Efficient string matching: an aid to
+bibliographic search. Communications of the ACM, 18(6), 333-340.
+"""
+
+import collections
+
+
+# Automata with at most this many patterns fold failure links into their
+# transitions, which is faster but can take memory quadratic in the patterns
+DENSE_PATTERNS = 256
+
+
+class AhoCorasick:
+    """An automaton that finds every occurrence of a set of patterns in one
+    pass over a text.
+
+    With few patterns, the failure links are folded into the transitions, so
+    reading a character is a single dictionary lookup. With many patterns,
+    the transitions stay sparse and failure links are followed while reading.
+
+        >>> automaton = AhoCorasick(["he", "she", "hers"])
+        >>> list(automaton.find_all("ushers"))
+        [(1, 4, 1), (2, 4, 0), (2, 6, 2)]
+
+    Arguments:
+        patterns: A sequence of strings. Matches refer to patterns by index.
+        dense: Whether to fold failure links into the transitions (default:
+               if there are at most DENSE_PATTERNS patterns).
+    """
+
+    def __init__(self, patterns, dense=None):
+        self.patterns = list(patterns)
+        self.transitions = [{}]
+        self.outputs = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append([])
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            # Empty patterns are matched once by find_all, not at every step
+            if pattern:
+                self.outputs[state].append(index)
+        if dense is None:
+            dense = len(self.patterns) <= DENSE_PATTERNS
+        self.dense = dense
+        self.failures = self.link_failures()
+
+    def link_failures(self):
+        """Merge each state's failure outputs into its own, and its failure
+        transitions too if the automaton is dense.
+
+        Returns:
+            The failure state of each state.
+        """
+        failures = [0] * len(self.transitions)
+        queue = collections.deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            failure = failures[state]
+            if self.outputs[failure]:
+                self.outputs[state] = self.outputs[state] + self.outputs[failure]
+            children = self.transitions[state]
+            for char, child in children.items():
+                queue.append(child)
+                # Children of the root fail to the root
+                if state:
+                    failures[child] = self.step(failures, failure, char)
+            # States are visited in breadth-first order, so the failure state
+            # already has its complete transitions.
+            if state and self.dense:
+                self.transitions[state] = dict(self.transitions[failure],
+                                               **children)
+        return failures
+
+    def step(self, failures, state, char):
+        """Return the state reached by reading a character in a state."""
+        transitions = self.transitions
+        if not self.dense:
+            while state and char not in transitions[state]:
+                state = failures[state]
+        return transitions[state].get(char, 0)
+
+    def find_all(self, text, start=0, end=None):
+        """Yield (start, end, pattern index) for every occurrence of every
+        pattern in text[start:end], ordered by end position."""
+        transitions, outputs = self.transitions, self.outputs
+        failures, dense = self.failures, self.dense
+        lengths = [len(pattern) for pattern in self.patterns]
+        start, end, _ = slice(start, end).indices(len(text))
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                yield (start, start, index)
+        state = 0
+        for position in range(start, end):
+            char = text[position]
+            if not dense:
+                while state and char not in transitions[state]:
+                    state = failures[state]
+            state = transitions[state].get(char, 0)
+            for index in outputs[state]:
+                yield (position + 1 - lengths[index], position + 1, index)
+    def find_first(self, text, start=0, end=None):
+        """Return a list with the (start, end) of the first occurrence of each
+        pattern in text[start:end], or (-1, -1) if a pattern does not occur.
+
+        The text is only read until every pattern has been found.
+        """
+        first = [(-1, -1)] * len(self.patterns)
+        remaining = len(self.patterns)
+        for match_start, match_end, index in self.find_all(text, start, end):
+            if first[index] != (-1, -1):
+                continue
+            first[index] = (match_start, match_end)
+            remaining -= 1
+            if not remaining:
+                break
+        return first
@@ -0,0 +1,387 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a Table backend that stores records in a SQLite database.
+
+Databases live on disk, so tables do not need to fit in memory, and several
+processes can open the same database file.
+"""
+import sqlite3
+
+import numpy as np
+
+from autociter.data.storage import (LazyView, Record, RecordWriter, Table,
+                                    TableView, csv_header, field_positions)
+
+# Types that SQLite stores and compares like Python
+SQL_TYPES = (str, int, float)
+KEY_COLUMN = "__key__"
+
+
+def quote(identifier):
+    """Return an identifier quoted for SQL."""
+    return '"{0}"'.format(identifier.replace('"', '""'))
+
+
+class SQLiteTable:
+    """A data table stored in a SQLite database.
+
+    The table has the same add, find, query and iteration interface as Table.
+    Records are added in batches of BATCH_SIZE, each in one transaction, and
+    queries from the queries module are translated into SQL. Rows are numbered
+    from 0 in the order that records were added, and records without a custom
+    key are keyed by their row, like in Table.
+
+    Values must be strings or numbers. Records with fewer values than fields
+    are padded with empty strings, and values beyond the fields are not stored.
+
+        >>> table = SQLiteTable("citations.db", fields=["title", "url"])
+        >>> table.extend(Table.stream("citations.csv"))
+        >>> table.query(queries.contains("title"))
+
+    Arguments:
+        database: The name of a database file, or ":memory:".
+        name: The name of the table in the database.
+        fields: A list of attribute names. If the table already exists, its
+                fields are read from the database.
+    """
+
+    BATCH_SIZE = 10000
+    DELIMITER = Table.DELIMITER
+
+    def __init__(self, database, name="records", fields=()):
+        if fields and not hasattr(fields, "__iter__"):
+            raise TypeError("fields must be a collection.")
+        self.connection = sqlite3.connect(database)
+        self.table_name, self.name = name, quote(name)
+        self.pending, self.pending_keys = [], set()
+        columns = self.connection.execute("PRAGMA table_info({0})".format(
+            self.name)).fetchall()
+        if columns:
+            stored = [column[1] for column in columns[1:]]
+            if fields and list(fields) != stored:
+                raise ValueError("Table and database fields are mismatched.")
+            fields = fields or stored
+        elif fields:
+            if KEY_COLUMN in fields or len(set(fields)) != len(fields):
+                raise ValueError("Fields must be unique and not " + KEY_COLUMN)
+            with self.connection:
+                self.connection.execute("CREATE TABLE {0} ({1})".format(
+                    self.name, ", ".join(
+                        [quote(KEY_COLUMN) + " UNIQUE"] +
+                        [quote(field) for field in fields])))
+        self.fields = fields
+        self.positions = field_positions(fields)
+        self.insert = "INSERT INTO {0} VALUES ({1})".format(
+            self.name, ", ".join("?" * (len(fields) + 1)))
+        self.select = "SELECT rowid, {0} FROM {1}".format(
+            ", ".join(quote(field) for field in fields) or "NULL", self.name)
+
+    def execute(self, sql, parameters=()):
+        """Run a statement after adding pending records, and return a cursor."""
+        self.flush()
+        return self.connection.execute(sql, parameters)
+
+    def flush(self):
+        """Insert the pending records in one transaction."""
+        if self.pending:
+            with self.connection:
+                self.connection.executemany(self.insert, self.pending)
+            self.pending, self.pending_keys = [], set()
+
+    def load(self, filename, num_records=1000000):
+        """Load data from a file and return table.
+
+        Arguments:
+            filename: The name of some data file
+            num_records: How many records should be loaded
+        """
+        self.extend(Table.stream(filename, self.fields or None, num_records))
+        return self
+
+    def parse(self, line):
+        """Parse a line of text that represents a data record."""
+        values = line.split(self.DELIMITER)
+        return Record(self.fields, values, self.positions)
+
+    def save(self, filename):
+        """Save data to a file."""
+        with RecordWriter(filename, self.fields, self.DELIMITER) as writer:
+            writer.write_all(self)
+
+    @property
+    def header(self):
+        """A string representing this table's header."""
+        return csv_header(self.fields, self.DELIMITER)
+
+    @property
+    def records(self):
+        """Return a list of this table's records."""
+        return list(self)
+
+    @property
+    def dictionary(self):
+        """Return a dictionary mapping keys to this table's records."""
+        cursor = self.execute("SELECT rowid, {0}, {1} FROM {2}".format(
+            quote(KEY_COLUMN), ", ".join(quote(field) for field in self.fields)
+            or "NULL", self.name))
+        return {
+            row[0] - 1 if row[1] is None else row[1]: self.to_record(row[2:])
+            for row in cursor
+        }
+
+    def to_record(self, values):
+        """Return a record with values read from the database."""
+        return Record(self.fields, list(values), self.positions)
+
+    def record(self, row):
+        """Return the record stored in a row of this table."""
+        values = self.execute(self.select + " WHERE rowid = ?",
+                              (int(row) + 1,)).fetchone()
+        if values is None:
+            raise KeyError("Table has no record at row " + str(row))
+        return self.to_record(values[1:])
+
+    def find(self, field, value):
+        """Return the first record that contains the given field-value pair.
+
+        If no such values are found, the method returns None.
+
+        Arguments:
+            field: A record field
+            value: A record value
+        """
+        if field not in self.positions or not isinstance(value, SQL_TYPES):
+            return next((record for record in self if record[field] == value),
+                        None)
+        values = self.execute(
+            self.select + " WHERE {0} = ? ORDER BY rowid LIMIT 1".format(
+                quote(field)), (value,)).fetchone()
+        return self.to_record(values[1:]) if values else None
+
+    def where(self, expression):
+        """Return a SQL condition and its parameters for a query expression,
+        or None if the expression cannot be translated."""
+        operation, arguments = expression[0], expression[1:]
+        if operation == "contains":
+            # Python treats empty strings and zeros as missing values
+            return " AND ".join(
+                "({0} != '' AND {0} != 0)".format(quote(field))
+                if field in self.positions else "0"
+                for field in arguments[0]) or "1", []
+        if operation in ("equals", "prefix"):
+            field, value = arguments
+            if not isinstance(value, SQL_TYPES):
+                return None
+            if field not in self.positions:
+                # Records have an empty value for fields they do not have
+                return ("1" if value == "" else "0"), []
+            if operation == "equals":
+                return "{0} = ?".format(quote(field)), [value]
+            if not isinstance(value, str):
+                return None
+            return ("(typeof({0}) = 'text' AND substr({0}, 1, ?) = ?)".format(
+                quote(field)), [len(value), value])
+        if operation in ("either", "both", "negate"):
+            conditions = [self.where(argument) for argument in arguments]
+            if None in conditions:
+                return None
+            if operation == "negate":
+                return "NOT ({0})".format(conditions[0][0]), conditions[0][1]
+            joiner = " OR " if operation == "either" else " AND "
+            return (joiner.join("({0})".format(sql) for sql, _ in conditions),
+                    [p for _, parameters in conditions for p in parameters])
+        return None
+
+    def create_index(self, field, kind="hash"):
+        """Index a field in the database, so that finding records by its value
+        does not scan the table.
+
+        SQLite indexes are B-trees, so every kind of index is the same.
+        """
+        if kind not in Table.INDEXES:
+            raise ValueError("Unknown index kind: {0}".format(kind))
+        if field not in self.positions:
+            raise ValueError("Table has no field {0}".format(field))
+        with self.connection:
+            self.execute("CREATE INDEX IF NOT EXISTS {0} ON {1} ({2})".format(
+                quote(self.table_name + " " + field), self.name,
+                quote(field)))
+
+    def mask(self, field, test):
+        """Return a NumPy boolean array of whether each row's value for a field
+        passes a test."""
+        if field not in self.positions:
+            return np.full(len(self), bool(test("")))
+        cursor = self.execute("SELECT {0} FROM {1} ORDER BY rowid".format(
+            quote(field), self.name))
+        return np.fromiter((test(value) for value, in cursor), dtype=bool,
+                           count=len(self))
+
+    def query(self, function):
+        """Return a TableView of the records that satisfy some function.
+
+        Queries from the queries module are run as SQL, and any other function
+        is called on each record.
+        """
+        condition = None
+        if hasattr(function, "expression"):
+            condition = self.where(function.expression)
+        if condition:
+            sql, parameters = condition
+            cursor = self.execute(
+                "SELECT rowid - 1 FROM {0} WHERE {1} ORDER BY rowid".format(
+                    self.name, sql), parameters)
+            rows = [row for row, in cursor]
+        else:
+            rows = [
+                row for row, record in enumerate(self) if function(record)
+            ]
+        return TableView(self, rows)
+
+    def map(self, function):
+        """Return a LazyView of the results of a function of each record."""
+        return LazyView(self).map(function)
+
+    def filter(self, function):
+        """Return a LazyView of the records that satisfy some function."""
+        return LazyView(self).filter(function)
+
+    def limit(self, count):
+        """Return a LazyView of at most the first count records."""
+        return LazyView(self).limit(count)
+
+    def add(self, record, key=None):
+        """Add record to the end of this table.
+
+        Records are inserted in batches, so they reach the database when
+        BATCH_SIZE records are pending or when the table is next read.
+
+        Arguments:
+            record: A Record object with the same fields as this table
+            key: The desired key for the record (optional)
+        """
+        if not hasattr(record, 'fields') or not hasattr(record, 'values'):
+            raise TypeError("Expected object with fields and values.")
+        if record.fields != self.fields:
+            raise ValueError("Table and record fields are mismatched.")
+        values = list(record.values[:len(self.fields)])
+        values += [""] * (len(self.fields) - len(values))
+        if not all(isinstance(value, SQL_TYPES) for value in values):
+            raise TypeError("Values must be strings or numbers.")
+        if key is not None:
+            if not isinstance(key, SQL_TYPES):
+                raise TypeError("Keys must be strings or numbers.")
+            if self.has_key(key):
+                raise ValueError("A record with that key already exists.")
+            self.pending_keys.add(key)
+        self.pending.append([key] + values)
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.flush()
+
+    def extend(self, records):
+        """Add collection of records to the table.
+
+        Arguments:
+            records: A collection of Record objects.
+        """
+        if not hasattr(records, '__iter__'):
+            raise TypeError("records must be iterable.")
+        for record in records:
+            self.add(record)
+        self.flush()
+
+    def has_key(self, key):
+        """Return true if a stored or pending record has a key.
+
+        Unlike row, this does not add the pending records, so adding keyed
+        records does not end their batch.
+        """
+        if key in self.pending_keys:
+            return True
+        if self.connection.execute(
+                "SELECT 1 FROM {0} WHERE {1} = ?".format(
+                    self.name, quote(KEY_COLUMN)), (key,)).fetchone():
+            return True
+        if not isinstance(key, int) or isinstance(key, bool) or key < 0:
+            return False
+        # Records without a custom key are keyed by their row
+        stored = len(self) - len(self.pending)
+        if key >= stored:
+            return key < len(self) and self.pending[key - stored][0] is None
+        found = self.connection.execute(
+            "SELECT {0} IS NULL FROM {1} WHERE rowid = ?".format(
+                quote(KEY_COLUMN), self.name), (key + 1,)).fetchone()
+        return bool(found and found[0])
+
+    def row(self, key):
+        """Return the row of the record with a key, or None if there is none."""
+        found = self.execute(
+            "SELECT rowid FROM {0} WHERE {1} = ?".format(
+                self.name, quote(KEY_COLUMN)), (key,)).fetchone()
+        if found:
+            return found[0] - 1
+        if isinstance(key, int) and not isinstance(key, bool) and key >= 0:
+            found = self.execute(
+                "SELECT {0} IS NULL FROM {1} WHERE rowid = ?".format(
+                    quote(KEY_COLUMN), self.name), (key + 1,)).fetchone()
+            if found and found[0]:
+                return key
+        return None
+
+    def close(self):
+        """Add pending records and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __contains__(self, record):
+        if not isinstance(record, Record) or record.fields != self.fields:
+            return any(record == value for value in self)
+        if not all(isinstance(value, SQL_TYPES) for value in record.values):
+            return False
+        if len(record.values) != len(self.fields):
+            return any(record == value for value in self)
+        conditions = " AND ".join(
+            "{0} = ?".format(quote(field)) for field in self.fields) or "1"
+        return self.execute(
+            "SELECT 1 FROM {0} WHERE {1} LIMIT 1".format(
+                self.name, conditions), record.values).fetchone() is not None
+
+    def __getitem__(self, key):
+        row = self.row(key)
+        if row is None:
+            raise KeyError("Table has no record with key " + str(key))
+        return self.record(row)
+
+    def __len__(self):
+        # Records are never deleted, so the largest rowid is the count
+        count, = self.connection.execute("SELECT MAX(rowid) FROM {0}".format(
+            self.name)).fetchone()
+        return (count or 0) + len(self.pending)
+
+    def __iter__(self):
+        cursor = self.execute(self.select + " ORDER BY rowid")
+        return (self.to_record(values[1:]) for values in cursor)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Table, SQLiteTable)):
+            return False
+        return len(self) == len(other) and self.dictionary == other.dictionary
@@ -0,0 +1,356 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Define a compact format for the article training dataset.
+
+A dataset is a directory with an index and shards of at most SHARD_SIZE
+articles. Each shard is stored as
+    <shard>-indices.npy: a uint8 array with the encoding index of each
+                         character of each article (articles x length)
+    <shard>-spans.npy: an int64 array of label spans, one row of
+                       (article, attribute, start, end, multiple) per span
+    <shard>.json: the url and citation information of each article
+and the index lists the shards, the attributes that spans refer to, the
+article length and the encoding depth (the number of one-hot columns).
+
+Arrays are memory-mapped when they are read, and one-hot matrices are only
+built when they are asked for. Convert an old JSON data file with
+`python -m autociter.data.datasets <source.dat> <destination> <depth>`.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+INDEX_NAME = "index.json"
+VERSION = 1
+SHARD_SIZE = 4096
+INDEX_TYPE = np.uint8
+SPAN_TYPE = np.int64
+# Span columns
+ARTICLE, ATTRIBUTE, START, END, MULTIPLE = range(5)
+
+
+def is_dataset(path):
+    """Return true if path is a dataset directory."""
+    return os.path.isfile(os.path.join(path, INDEX_NAME))
+
+
+def read_index(path):
+    """Return the index of a dataset."""
+    with open(os.path.join(path, INDEX_NAME)) as file:
+        index = json.load(file)
+    if index.get("version") != VERSION:
+        raise ValueError("{0} has an unsupported dataset version.".format(path))
+    return index
+
+
+class DatasetWriter:
+    """Writes articles to a dataset, one shard at a time.
+
+    The index is replaced when the writer is closed, so readers never see a
+    partly written shard. If the with block raises, the new shards are
+    deleted and the dataset is left as it was.
+
+        >>> with DatasetWriter("article_data", depth=68) as writer:
+        ...     writer.add(url, citation_info, indices, locs)
+
+    Arguments:
+        path: The dataset directory, which is created if needed.
+        depth: The number of distinct encoding indices.
+        append: Whether to add to an existing dataset instead of replacing it.
+                Appended articles supersede saved articles with the same url.
+        shard_size: The number of articles in each shard.
+    """
+
+    def __init__(self, path, depth, append=False, shard_size=SHARD_SIZE):
+        self.path, self.depth, self.shard_size = path, depth, shard_size
+        os.makedirs(path, exist_ok=True)
+        self.replaced = []
+        if is_dataset(path):
+            index = read_index(path)
+            if append:
+                if index["depth"] != depth:
+                    raise ValueError("Dataset depth {0} does not match {1}"
+                                     .format(index["depth"], depth))
+            else:
+                self.replaced = [shard["name"] for shard in index["shards"]]
+                index = None
+        else:
+            index = None
+        self.index = index or {
+            "version": VERSION,
+            "depth": depth,
+            "length": None,
+            "attributes": [],
+            "shards": []
+        }
+        self.attributes = {
+            attribute: code
+            for code, attribute in enumerate(self.index["attributes"])
+        }
+        self.indices, self.spans, self.metadata = [], [], []
+        # The shards written by this writer
+        self.created = []
+
+    def add(self, url, citation_info, indices, locs):
+        """Add an article to the dataset.
+
+        Arguments:
+            url: The article's url
+            citation_info: A dictionary of the article's citation information
+            indices: The encoding index of each character of the article
+            locs: A dictionary mapping attributes to a (start, end) location
+                  or a list of them
+        """
+        indices = np.asarray(indices)
+        if self.index["length"] is None:
+            self.index["length"] = len(indices)
+        if indices.shape != (self.index["length"],):
+            raise ValueError("Expected {0} indices, not {1}".format(
+                self.index["length"], indices.shape))
+        if len(indices) and (indices.min() < 0 or indices.max() >= self.depth):
+            raise ValueError("Indices must be in range({0})".format(
+                self.depth))
+        article = len(self.metadata)
+        for attribute, location in locs.items():
+            if not location:
+                continue
+            code = self.attributes.setdefault(attribute, len(self.attributes))
+            multiple = not isinstance(location[0], (int, np.integer))
+            for start, end in location if multiple else [location]:
+                self.spans.append((article, code, start, end, multiple))
+        self.indices.append(indices.astype(INDEX_TYPE))
+        self.metadata.append({"url": url, "citation_info": citation_info})
+        if len(self.metadata) == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Write the pending articles as a new shard."""
+        if not self.metadata:
+            return
+        shards = self.index["shards"]
+        # New shards are numbered after every shard in the directory, so they
+        # do not overwrite shards that are being replaced
+        names = [shard["name"] for shard in shards] + self.replaced
+        name = "shard-{0:05d}".format(
+            max([int(name.split("-")[1]) for name in names], default=-1) + 1)
+        base = os.path.join(self.path, name)
+        np.save(base + "-indices.npy", np.stack(self.indices))
+        np.save(base + "-spans.npy",
+                np.array(self.spans, dtype=SPAN_TYPE).reshape(-1, 5))
+        with open(base + ".json", "w") as out:
+            json.dump(self.metadata, out)
+        shards.append({"name": name, "size": len(self.metadata)})
+        self.created.append(name)
+        self.indices, self.spans, self.metadata = [], [], []
+
+    def close(self):
+        """Write the pending articles and the index."""
+        self.flush()
+        self.index["attributes"] = sorted(self.attributes,
+                                          key=self.attributes.get)
+        temporary = os.path.join(self.path, INDEX_NAME + ".tmp")
+        with open(temporary, "w") as out:
+            json.dump(self.index, out, indent=4)
+        os.replace(temporary, os.path.join(self.path, INDEX_NAME))
+        self.remove(self.replaced)
+        self.replaced, self.created = [], []
+
+    def abort(self):
+        """Delete the shards written by this writer without changing the
+        index."""
+        self.remove(self.created)
+        self.indices, self.spans, self.metadata = [], [], []
+        self.replaced, self.created = [], []
+
+    def remove(self, names):
+        """Delete the files of shards."""
+        for name in names:
+            for suffix in ("-indices.npy", "-spans.npy", ".json"):
+                path = os.path.join(self.path, name + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        if exception[0] is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Shard:
+    """The arrays and metadata of one shard, read when first needed."""
+
+    def __init__(self, path, name, size):
+        self.base = os.path.join(path, name)
+        self.size = size
+        self._indices = self._spans = self._metadata = None
+
+    @property
+    def indices(self):
+        """Return the memory-mapped indices of the shard's articles."""
+        if self._indices is None:
+            self._indices = np.load(self.base + "-indices.npy", mmap_mode="r")
+        return self._indices
+
+    @property
+    def spans(self):
+        """Return the label spans of the shard, ordered by article."""
+        if self._spans is None:
+            self._spans = np.load(self.base + "-spans.npy")
+        return self._spans
+
+    @property
+    def metadata(self):
+        """Return the url and citation information of each article."""
+        if self._metadata is None:
+            with open(self.base + ".json") as file:
+                self._metadata = json.load(file)
+        return self._metadata
+
+
+class Dataset:
+    """A read-only dataset of articles.
+
+    Articles are numbered from 0 in the order they were written, skipping
+    articles that were superseded by a later article with the same url.
+
+        >>> dataset = Dataset("article_data")
+        >>> dataset[0]["locs"]
+        {'title': [24, 51]}
+        >>> dataset.one_hot([0, 1]).shape
+        (2, 600, 68)
+
+    Arguments:
+        path: A dataset directory.
+    """
+
+    def __init__(self, path):
+        index = read_index(path)
+        self.path = path
+        self.depth, self.length = index["depth"], index["length"]
+        self.attributes = index["attributes"]
+        self.shards = [
+            Shard(path, shard["name"], shard["size"])
+            for shard in index["shards"]
+        ]
+        sizes = [shard.size for shard in self.shards]
+        self.starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self._rows = None
+
+    @property
+    def rows(self):
+        """Return the global row of each article that was not superseded."""
+        if self._rows is None:
+            latest = {}
+            for shard, start in zip(self.shards, self.starts.tolist()):
+                for offset, entry in enumerate(shard.metadata):
+                    latest[entry["url"]] = start + offset
+            self._rows = np.array(sorted(latest.values()), dtype=np.int64)
+        return self._rows
+
+    @property
+    def urls(self):
+        """Return the url of each article."""
+        urls = []
+        for row in self.rows.tolist():
+            shard, row = self.locate(row)
+            urls.append(shard.metadata[row]["url"])
+        return urls
+
+    def locate(self, row):
+        """Return the shard of a global row and the row within the shard."""
+        shard = int(np.searchsorted(self.starts, row, side="right")) - 1
+        return self.shards[shard], row - int(self.starts[shard])
+
+    def indices(self, articles=None):
+        """Return a uint8 array with the encoding indices of articles.
+
+        Arguments:
+            articles: A sequence of article numbers (default: every article)
+        """
+        rows = self.rows if articles is None else self.rows[articles]
+        result = np.empty((len(rows), self.length or 0), dtype=INDEX_TYPE)
+        shards = np.searchsorted(self.starts, rows, side="right") - 1
+        for shard in np.unique(shards).tolist():
+            selected = shards == shard
+            result[selected] = self.shards[shard].indices[
+                rows[selected] - self.starts[shard]]
+        return result
+
+    def one_hot(self, articles=None):
+        """Return a uint8 array of one-hot matrices of articles, with shape
+        (articles, length, depth)."""
+        return np.eye(self.depth, dtype=INDEX_TYPE)[self.indices(articles)]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, article):
+        """Return a dictionary with an article's url, citation information,
+        encoding indices and label locations."""
+        shard, row = self.locate(int(self.rows[article]))
+        spans = shard.spans
+        start, end = np.searchsorted(spans[:, ARTICLE], [row, row + 1])
+        locs = {}
+        for span in spans[start:end].tolist():
+            attribute = self.attributes[span[ATTRIBUTE]]
+            location = [span[START], span[END]]
+            if span[MULTIPLE]:
+                locs.setdefault(attribute, []).append(location)
+            else:
+                locs[attribute] = location
+        entry = dict(shard.metadata[row])
+        entry["indices"] = shard.indices[row]
+        entry["locs"] = locs
+        return entry
+
+    def __iter__(self):
+        return (self[article] for article in range(len(self)))
+
+
+def migrate(source, destination, depth):
+    """Convert a JSON data file written by pipeline.save_data into a dataset.
+
+    Arguments:
+        source: The name of the JSON data file
+        destination: The dataset directory
+        depth: The number of distinct encoding indices
+    """
+    with open(source) as file:
+        saved_dict = json.load(file)
+    with DatasetWriter(destination, depth) as writer:
+        for url, saved in sorted(saved_dict.items()):
+            citation_info = {
+                key: value
+                for key, value in saved.items()
+                if key not in ("article_one_hot", "locs")
+            }
+            citation_info.setdefault("url", url)
+            # Indices were saved as the str() of a list of ints
+            writer.add(url, citation_info, json.loads(saved["article_one_hot"]),
+                       saved["locs"])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print("Usage: datasets.py <source.dat> <destination> <depth>")
+        sys.exit(1)
+    migrate(sys.argv[1], sys.argv[2], int(sys.argv[3]))
@@ -0,0 +1,127 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Library that finds the parts of a text that may contain dates, so that only
+those parts need to be parsed by dateparser"""
+
+import functools
+import re
+
+from dateparser.languages.loader import LocaleDataLoader
+from dateparser.search import search_dates
+
+from autociter.data.automata import AhoCorasick
+
+MONTHS = ("january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december")
+# Numeric dates such as "04 13 2000" or "2000-04-13", and ISO timestamps
+NUMERIC_DATES = re.compile(
+    r"\b\d{1,4}[\s/.\-]+\d{1,2}[\s/.\-]+\d{1,4}\b|\b\d{4}-\d{2}-\d{2}T")
+DIGIT = re.compile(r"\d")
+# dateparser splits text into sentences at line breaks, among other places
+LINE_BREAKS = "\r\n"
+
+
+@functools.lru_cache(maxsize=None)
+def month_automaton():
+    """Return an automaton that finds the month names of every language that
+    dateparser knows, lowercased and without periods."""
+    names = set()
+    for locale in LocaleDataLoader().get_locales():
+        for month in MONTHS:
+            names.update(
+                name.lower().replace(".", "")
+                for name in locale.info.get(month, []))
+    names.discard("")
+    return AhoCorasick(sorted(names))
+
+
+def is_cased(char):
+    """Return true if a character is a letter of a script with case, whose
+    words are separated by spaces or punctuation."""
+    return char.lower() != char.upper()
+
+
+def month_names(lowered):
+    """Yield the start of every month name in a lowercased text.
+
+    Names that start or end with a cased letter only count as whole words, so
+    "mar" is found in "12 mar 2000" but not in "market". Names in scripts
+    without case, such as "11月", may be part of a longer word.
+    """
+    automaton = month_automaton()
+    for start, end, index in automaton.find_all(lowered):
+        name = automaton.patterns[index]
+        if is_cased(name[0]) and start and lowered[start - 1].isalpha():
+            continue
+        if (is_cased(name[-1]) and end < len(lowered)
+                and lowered[end].isalpha()):
+            continue
+        yield start
+
+
+def candidate_windows(text):
+    """Return the (start, end) spans of the lines of a text that may contain a
+    date.
+
+    A line is a candidate if it contains a month name in any language or a
+    numeric date, and a digit. dateparser never joins text across line breaks,
+    so searching each window finds the dates that searching the whole text
+    would.
+
+        >>> candidate_windows("Hello\\nPublished April 13 2000\\nBye")
+        [(6, 28)]
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Lowercasing moved offsets, so every line is a candidate
+        starts = [0] + [i + 1 for i, c in enumerate(text) if c in LINE_BREAKS]
+    else:
+        starts = sorted(
+            [match.start() for match in NUMERIC_DATES.finditer(text)] +
+            list(month_names(lowered)))
+    windows = []
+    line_end = -1
+    for position in starts:
+        if position <= line_end:
+            continue
+        start = max(text.rfind(c, 0, position) for c in LINE_BREAKS) + 1
+        ends = [text.find(c, position) for c in LINE_BREAKS]
+        line_end = min([e for e in ends if e != -1], default=len(text))
+        if DIGIT.search(text, start, line_end):
+            windows.append((start, line_end))
+    return windows
+
+
+def iter_dates(text, settings=None, languages=None, windows=None):
+    """Yield (original text, datetime) for every date found in a text, in order.
+
+    Only candidate windows are passed to dateparser, which detects the
+    language of each window unless languages are given.
+
+    Arguments:
+        text: The text to search.
+        settings: dateparser settings.
+        languages: The languages that dateparser parses windows in (default:
+                   detected).
+        windows: The candidate windows of the text, if already computed.
+    """
+    if windows is None:
+        windows = candidate_windows(text)
+    for start, end in windows:
+        matches = search_dates(
+            text[start:end], languages=languages, settings=settings)
+        for match in matches or []:
+            yield match
@@ -0,0 +1,450 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a binary columnar table format that is memory-mapped when opened.
+
+A file starts with MAGIC, the length of a JSON header and the header, which
+lists the fields, the number of rows and where each column is stored. Every
+column is either a string column (an array of n + 1 offsets into a heap of
+UTF-8 bytes) or an encoded column (an array of n codes into a string column
+of distinct values). Arrays are aligned to 8 bytes.
+
+Opening a file only reads the header. Values are read from the mapped file
+when they are used, so only the columns that are touched are paged in.
+
+Convert between formats with
+`python -m autociter.data.mapped [to-binary|to-tsv] <source> <destination>`.
+"""
+import array
+import itertools
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+from autociter.data.storage import (EncodedColumn, Record, Table,
+                                    field_positions)
+
+MAGIC = b"ACTABLE1"
+ALIGNMENT = 8
+OFFSET_TYPE = np.dtype("<u8")
+CODE_TYPE = np.dtype("<u4")
+# Rows are converted in batches of this many rows by save_rows
+SPOOL_ROWS = 65536
+
+
+def encode_strings(values):
+    """Return the offsets and heap of a string column."""
+    encoded = []
+    for value in values:
+        if not isinstance(value, str):
+            raise TypeError("Mapped tables can only store strings, not "
+                            "{0}".format(type(value).__name__))
+        encoded.append(value.encode("utf-8"))
+    offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_TYPE)
+    offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    return offsets, b"".join(encoded)
+
+
+def save(table, filename):
+    """Save a table in the binary format.
+
+    Encoded columns stay encoded. Keys and records with more or fewer values
+    than fields are not preserved, since each row stores one value per field.
+    """
+    sections, columns = [], []
+
+    def section(data):
+        """Queue data to be written and return its index."""
+        sections.append(data)
+        return len(sections) - 1
+
+    for column in table.columns:
+        if isinstance(column, EncodedColumn):
+            offsets, heap = encode_strings(column.values)
+            columns.append({
+                "kind": "encoded",
+                "codes": section(np.asarray(column.codes, dtype=CODE_TYPE)),
+                "offsets": section(offsets),
+                "heap": section(heap),
+                "values": len(column.values)
+            })
+        else:
+            offsets, heap = encode_strings(column)
+            columns.append({
+                "kind": "strings",
+                "offsets": section(offsets),
+                "heap": section(heap)
+            })
+    write_sections(filename, table.fields, len(table), columns, sections)
+
+
+def save_rows(rows, fields, filename):
+    """Save rows in the binary format without holding them in memory.
+
+    Columns are spooled to temporary files SPOOL_ROWS rows at a time, and a
+    column stays encoded while a Table would keep it encoded.
+
+    Arguments:
+        rows: An iterable of lists of strings, one string per field.
+        fields: The fields of the rows.
+        filename: The name of the file to write.
+    """
+    writers = [ColumnWriter() for _ in fields]
+    size = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, SPOOL_ROWS))
+        if not batch:
+            break
+        for row, values in enumerate(batch):
+            if len(values) != len(writers):
+                values = list(values[:len(writers)])
+                batch[row] = values + [""] * (len(writers) - len(values))
+        for writer, values in zip(writers, zip(*batch)):
+            writer.extend(values)
+        size += len(batch)
+    sections, columns = [], []
+    for writer in writers:
+        column = writer.close()
+        for key in ("codes", "offsets", "heap"):
+            if key in column:
+                sections.append(column[key])
+                column[key] = len(sections) - 1
+        columns.append(column)
+    try:
+        write_sections(filename, fields, size, columns, sections)
+    finally:
+        for data in sections:
+            if isinstance(data, Spool):
+                data.close()
+
+
+def write_sections(filename, fields, rows, columns, sections):  #pylint: disable=too-many-arguments
+    """Write the header and sections of a binary file.
+
+    Arguments:
+        filename: The name of the file to write.
+        fields: The names of the columns.
+        rows: The number of rows.
+        columns: A dictionary for each column whose "codes", "offsets" and
+                 "heap" values are indices into sections.
+        sections: A list of arrays, bytes or Spool objects.
+    """
+    # Sections are placed after the header, whose size depends on their
+    # positions, so the header is laid out until its size stops changing
+    header_size = 0
+    while True:
+        position, positions = align(len(MAGIC) + 8 + header_size), []
+        for data in sections:
+            positions.append(position)
+            position = align(position + nbytes(data))
+        header = json.dumps({
+            "fields": list(fields),
+            "rows": rows,
+            "columns": [{
+                key: positions[value] if key in ("codes", "offsets",
+                                                 "heap") else value
+                for key, value in column.items()
+            } for column in columns]
+        }).encode("utf-8")
+        if len(header) == header_size:
+            break
+        header_size = len(header)
+    with open(filename, "wb") as file:
+        file.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for start, data in zip(positions, sections):
+            file.write(b"\0" * (start - file.tell()))
+            if isinstance(data, Spool):
+                data.copy(file)
+            else:
+                file.write(memoryview(data).cast("B"))
+
+
+def nbytes(data):
+    """Return the size of a section in bytes."""
+    if isinstance(data, Spool):
+        return data.nbytes
+    return memoryview(data).nbytes
+
+
+class Spool:
+    """A temporary file that a section is written to piece by piece."""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.nbytes = 0
+
+    def write(self, data):
+        """Append an array or bytes to the section."""
+        data = memoryview(data).cast("B")
+        self.file.write(data)
+        self.nbytes += data.nbytes
+
+    def copy(self, destination):
+        """Write the section to the end of a file."""
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, destination)
+
+    def close(self):
+        """Delete the temporary file."""
+        self.file.close()
+
+
+class ColumnWriter:
+    """Spools the values of one column to temporary files.
+
+    Codes are only kept while the column could stay encoded.
+    """
+
+    def __init__(self):
+        self.offsets, self.heap, self.codes = Spool(), Spool(), Spool()
+        self.offsets.write(np.zeros(1, dtype=OFFSET_TYPE))
+        self.size, self.rows = 0, 0
+        self.values, self.lookup = [], {}
+
+    def extend(self, values):
+        """Append a batch of strings to the column."""
+        encoded = [value.encode("utf-8") for value in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64,
+                              count=len(encoded))
+        self.offsets.write((self.size + np.cumsum(lengths)).astype(OFFSET_TYPE))
+        self.heap.write(b"".join(encoded))
+        self.size += int(lengths.sum())
+        if self.lookup is not None:
+            self.encode(values)
+        self.rows += len(values)
+
+    def encode(self, values):
+        """Spool the codes of a batch of strings, or stop encoding the column
+        if a Table would decode it."""
+        codes = array.array("I")
+        for row, value in enumerate(values, self.rows):
+            code = self.lookup.get(value)
+            if code is None:
+                if len(self.values) >= max(Table.ENCODING_SIZE,
+                                           Table.ENCODING_RATIO * row):
+                    self.lookup = self.values = None
+                    self.codes.close()
+                    return
+                code = self.lookup[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        self.codes.write(np.asarray(codes, dtype=CODE_TYPE))
+
+    def close(self):
+        """Return the column's header entry, whose sections are arrays or
+        spools instead of indices."""
+        if self.lookup is None:
+            return {"kind": "strings", "offsets": self.offsets,
+                    "heap": self.heap}
+        self.offsets.close()
+        self.heap.close()
+        offsets, heap = encode_strings(self.values)
+        return {
+            "kind": "encoded",
+            "codes": self.codes,
+            "offsets": offsets,
+            "heap": heap,
+            "values": len(self.values)
+        }
+
+
+def align(position):
+    """Return the first aligned position at or after position."""
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class MappedStrings:
+    """A string column read from a mapped file."""
+
+    def __init__(self, buffer, offsets, heap, size):
+        self.offsets = np.frombuffer(
+            buffer, dtype=OFFSET_TYPE, count=size + 1, offset=offsets)
+        self.heap = memoryview(buffer)[heap:]
+
+    def __getitem__(self, row):
+        start, end = self.offsets[row:row + 2].tolist()
+        return str(self.heap[start:end], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield str(self.heap[start:end], "utf-8")
+
+    def nonempty(self):
+        """Return a NumPy boolean array of whether each value is nonempty."""
+        return np.diff(self.offsets) > 0
+
+    def mask(self, test):
+        """Return a NumPy boolean array of whether each value passes a test."""
+        if test is bool:
+            return self.nonempty()
+        return np.fromiter(map(test, self), dtype=bool, count=len(self))
+
+
+class MappedEncodedStrings:
+    """An encoded string column read from a mapped file.
+
+    The distinct values are decoded the first time they are needed.
+    """
+
+    def __init__(self, buffer, codes, offsets, heap, size, values):
+        self.codes = np.frombuffer(
+            buffer, dtype=CODE_TYPE, count=size, offset=codes)
+        self.strings = MappedStrings(buffer, offsets, heap, values)
+        self._values = None
+
+    @property
+    def values(self):
+        """Return the distinct values of the column."""
+        if self._values is None:
+            self._values = list(self.strings)
+        return self._values
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes.tolist())
+
+    def mask(self, test):
+        """Return a NumPy boolean array of whether each value passes a test.
+
+        Each distinct value is only tested once.
+        """
+        if test is bool:
+            passes = self.strings.nonempty()
+        else:
+            passes = np.fromiter(map(test, self.values), dtype=bool,
+                                 count=len(self.values))
+        return passes[self.codes]
+
+
+class MappedTable(Table):
+    """A read-only Table backed by a memory-mapped file in the binary format.
+
+        >>> table = MappedTable("citations.tbl")
+        >>> table.query(queries.contains("url", "title"))
+
+    Arguments:
+        filename: The name of a file written by save.
+    """
+
+    COLUMNS = {"strings": MappedStrings, "encoded": MappedEncodedStrings}
+
+    def __init__(self, filename):
+        Table.__init__(self)
+        self.filename = filename
+        with open(filename, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            self.buffer.close()
+            raise ValueError("{0} is not a mapped table.".format(filename))
+        header_size, = struct.unpack_from("<Q", self.buffer, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(
+            bytes(self.buffer[header_start:header_start + header_size]))
+        self._fields = header["fields"]
+        self.positions = field_positions(self._fields)
+        self.size = header["rows"]
+        self.columns = []
+        for column in header["columns"]:
+            arguments = {
+                key: value for key, value in column.items() if key != "kind"
+            }
+            self.columns.append(self.COLUMNS[column["kind"]](
+                self.buffer, size=self.size, **arguments))
+
+    def append(self, values):
+        raise TypeError("Mapped tables are read-only.")
+
+    def mask(self, field, test):
+        """Return a NumPy boolean array of whether each row's value for a field
+        passes a test."""
+        if field not in self.positions:
+            return np.full(self.size, bool(test("")))
+        return self.columns[self.positions[field]].mask(test)
+
+    def __iter__(self):
+        for values in zip(*self.columns):
+            yield Record(self.fields, list(values), self.positions)
+
+    def close(self):
+        """Unmap the file.
+
+        Arrays returned by the columns must not be used after closing.
+        """
+        self.columns, self.size = [], 0
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def is_mapped(filename):
+    """Return true if a file is in the binary format."""
+    with open(filename, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def stream(filename):
+    """Yield the records of a data file in either format one at a time."""
+    if not is_mapped(filename):
+        yield from Table.stream(filename)
+        return
+    with MappedTable(filename) as table:
+        yield from table
+
+
+def to_binary(source, destination):
+    """Convert a tab-delimited data file into the binary format.
+
+    Lines are streamed from the source, so every record is converted and
+    files larger than memory can be converted.
+    """
+    with open(source, encoding="utf-8") as file:
+        fields = next(file, "").rstrip("\n").split(Table.DELIMITER)
+        save_rows((line.rstrip("\n").split(Table.DELIMITER) for line in file),
+                  fields, destination)
+
+
+def to_tsv(source, destination):
+    """Convert a file in the binary format into a tab-delimited data file."""
+    with MappedTable(source) as table:
+        table.save(destination)
+
+
+CONVERSIONS = {"to-binary": to_binary, "to-tsv": to_tsv}
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in CONVERSIONS:
+        print("Usage: mapped.py [{0}] <source> <destination>".format(
+            "|".join(CONVERSIONS)))
+        sys.exit(1)
+    CONVERSIONS[sys.argv[1]](sys.argv[2], sys.argv[3])
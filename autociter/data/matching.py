@@ -0,0 +1,103 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Library for approximate substring search with Myers' bit-parallel
+edit distance algorithm
+
+References:
+Myers, G. (1999). A fast bit-vector algorithm for approximate string matching
+based on dynamic programming. Journal of the ACM, 46(3), 395-415.
+"""
+
+
+def pattern_masks(pattern):
+    """Return a dictionary mapping each character to the bitmask of the
+    positions where it occurs in pattern"""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def edit_distances(pattern, text, anchored=False):
+    """Yield the edit distance between pattern and the best substring of text
+    ending at each position of text.
+
+    The columns of the edit distance matrix are encoded as bit vectors of
+    vertical differences, so each character of text costs O(m/w) word
+    operations for a pattern of length m and a word size w. Python integers
+    are used as bit vectors of any length.
+
+    Arguments:
+        pattern: The string to search for.
+        text: The string to search in.
+        anchored: If true, substrings must start at the beginning of text, so
+                  the distance is to the prefix of text ending at each position.
+    """
+    length = len(pattern)
+    masks = pattern_masks(pattern)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = full, 0, length
+    carry = 1 if anchored else 0
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | carry) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive)
+                                          & full)
+        negative = horizontal_positive & vertical
+        yield score
+
+
+def find_approximate(pattern, text, max_edits, start=0, end=None):
+    """Return the (start, end) of the substring of text with the fewest edits
+    from pattern, or (-1, -1) if every substring needs more than max_edits.
+
+    The best end position is found in one bit-parallel pass over the text.
+    The start is then found by searching backwards from the end with the
+    reversed pattern, which only looks at len(pattern) + max_edits characters.
+    Ties go to the leftmost end and then to the shortest substring.
+
+        >>> find_approximate("climate report", "a new clmate reprt today", 3)
+        (6, 18)
+    """
+    start, end, _ = slice(start, end).indices(len(text))
+    if not pattern or max_edits < 0:
+        return (-1, -1)
+    best_edits, best_end = max_edits + 1, -1
+    for position, edits in enumerate(
+            edit_distances(pattern, text[start:end]), start):
+        if edits < best_edits:
+            best_edits, best_end = edits, position + 1
+            if not edits:
+                break
+    if best_end == -1:
+        return (-1, -1)
+    window_start = max(start, best_end - len(pattern) - best_edits)
+    window = text[window_start:best_end][::-1]
+    for length, edits in enumerate(
+            edit_distances(pattern[::-1], window, anchored=True), 1):
+        if edits == best_edits:
+            return (best_end - length, best_end)
+    return (-1, -1)
@@ -0,0 +1,134 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Library that indexes the character n-grams of a text so that many fields
+can be located approximately without refitting a vectorizer for each field"""
+
+import functools
+
+import numpy as np
+from scipy import sparse
+
+INDEX_CACHE_SIZE = 8
+SCORE_DECIMALS = 12
+
+
+class NgramIndex:
+    """A character n-gram index of a text.
+
+    The index maps every n-gram of the text to an integer once, so locating a
+    field only builds sparse term-count matrices for the windows it compares.
+    Weights follow sklearn's TfidfVectorizer defaults (raw counts, smoothed
+    idf, l2 normalization), so results are the same as fitting a vectorizer to
+    the field and the windows of the text.
+
+        >>> index = NgramIndex("the quick brown fox jumps over the lazy dog and")
+        >>> index.find("brown fox")
+        (10, 19)
+
+    Arguments:
+        text: The text to index.
+        n: The length of the n-grams.
+    """
+
+    def __init__(self, text, n=3):
+        self.text, self.n = text, n
+        self.vocabulary = {}
+        self.ids = np.fromiter(
+            (self.vocabulary.setdefault(text[i:i + n], len(self.vocabulary))
+             for i in range(len(text) - n + 1)),
+            dtype=np.int64)
+
+    def __len__(self):
+        return len(self.text)
+
+    def field_counts(self, field):
+        """Return the n-gram ids and counts of a field.
+
+        N-grams that do not occur in the text get ids after the vocabulary.
+        """
+        vocabulary = dict(self.vocabulary)
+        ids = [
+            vocabulary.setdefault(field[i:i + self.n], len(vocabulary))
+            for i in range(len(field) - self.n + 1)
+        ]
+        ids, counts = np.unique(np.array(ids, dtype=np.int64),
+                                return_counts=True)
+        return ids, counts.astype(np.float64), len(vocabulary)
+
+    def similarities(self, field, starts, offset=0):
+        """Return the tf-idf cosine similarity of a field to windows of the text.
+
+        Each window has the length of the field. The field and the windows form
+        the corpus that the idf weights are computed from.
+
+        Arguments:
+            field: The string to compare.
+            starts: The start of each window, relative to offset.
+            offset: The position in the text that starts are relative to.
+        """
+        grams_per_window = len(field) - self.n + 1
+        field_ids, field_counts, size = self.field_counts(field)
+        starts = np.asarray(starts, dtype=np.int64)
+        positions = offset + starts[:, None] + np.arange(grams_per_window)
+        rows = np.repeat(np.arange(len(starts)), grams_per_window)
+        counts = sparse.csr_matrix(
+            (np.ones(rows.size), (rows, self.ids[positions.ravel()])),
+            shape=(len(starts), size))
+        counts.sum_duplicates()
+        document_frequency = np.bincount(counts.indices, minlength=size)
+        document_frequency[field_ids] += 1
+        documents = len(starts) + 1
+        idf = np.log((1 + documents) / (1 + document_frequency)) + 1
+        weights = counts.multiply(idf[None, :]).tocsr()
+        window_norms = np.sqrt(weights.multiply(weights).sum(axis=1)).A1
+        field_weights = np.zeros(size)
+        field_weights[field_ids] = field_counts * idf[field_ids]
+        field_norm = np.linalg.norm(field_weights)
+        scores = (weights @ field_weights) / (window_norms * field_norm)
+        # Round away floating point noise, so that ties go to the first window
+        return np.round(scores, SCORE_DECIMALS)
+
+    def find(self, field, threshold_value=0.6, start=0, end=None):
+        """Return the (start, end) of the window most similar to a field.
+
+        Like standardization.find for titles, the text is first compared in
+        chunks the length of the field, and then at every position near the
+        best chunk. Returns (-1, -1) if no window is similar enough.
+        """
+        start, end, _ = slice(start, end).indices(len(self.text))
+        length, text_length = len(field), max(0, end - start)
+        if length < self.n:
+            return (-1, -1)
+        chunks = np.arange(0, text_length - length, length)
+        if not chunks.size:
+            return (-1, -1)
+        scores = self.similarities(field, chunks, start)
+        index = int(np.argmax(scores)) * length
+        first = max(0, index - length)
+        windows = np.arange(first, min(index + length, text_length - length))
+        if not windows.size:
+            return (-1, -1)
+        scores = self.similarities(field, windows, start)
+        if np.max(scores) < threshold_value:
+            return (-1, -1)
+        best = first + int(np.argmax(scores))
+        return (start + best, start + best + length)
+
+
+@functools.lru_cache(maxsize=INDEX_CACHE_SIZE)
+def ngram_index(text, n=3):
+    """Return an NgramIndex of a text, reusing recently built indices."""
+    return NgramIndex(text, n)
@@ -13,7 +13,18 @@
 #   limitations under the License.
 #
 # Author: Balaji Veeramani <bveeramani@berkeley.edu>
-"""Define query functions."""
+"""Define query functions.
+
+Each query is a function of a record. Queries also have a mask method that
+evaluates them on a whole table (or table view) at once, returning a NumPy
+boolean array with one entry per row. Tables use masks to answer queries
+column by column instead of record by record.
+
+Queries also describe themselves with an expression, a tuple of an operation
+and its arguments such as ("equals", field, value), which storage backends
+can translate into their own query languages.
+"""
+import numpy as np
 
 
 def contains(*fields):
@@ -25,6 +36,50 @@ def contains(*fields):
                 return False
         return True
 
+    def mask(table):
+        result = np.ones(len(table), dtype=bool)
+        for field in fields:
+            result &= table.mask(field, bool)
+        return result
+
+    query.mask = mask
+    query.expression = ("contains", fields)
+    return query
+
+
+def equals(field, value):
+    """Return true if record's value for field equals value.
+
+    Tables answer this query with an index on field if there is one.
+    """
+
+    def query(record):
+        return record[field] == value
+
+    def test(other):
+        return other == value
+
+    query.mask = lambda table: table.mask(field, test)
+    query.index_lookup = ("equals", field, value)
+    query.expression = ("equals", field, value)
+    return query
+
+
+def startswith(field, prefix):
+    """Return true if record's value for field starts with prefix.
+
+    Tables answer this query with a sorted index on field if there is one.
+    """
+
+    def test(other):
+        return isinstance(other, str) and other.startswith(prefix)
+
+    def query(record):
+        return test(record[field])
+
+    query.mask = lambda table: table.mask(field, test)
+    query.index_lookup = ("prefix", field, prefix)
+    query.expression = ("prefix", field, prefix)
     return query
 
 
@@ -34,6 +89,10 @@ def either(query1, query2):
     def query(record):
         return query1(record) or query2(record)
 
+    if hasattr(query1, "mask") and hasattr(query2, "mask"):
+        query.mask = lambda table: query1.mask(table) | query2.mask(table)
+    if hasattr(query1, "expression") and hasattr(query2, "expression"):
+        query.expression = ("either", query1.expression, query2.expression)
     return query
 
 
@@ -43,6 +102,16 @@ def both(query1, query2):
     def query(record):
         return query1(record) and query2(record)
 
+    if hasattr(query1, "mask") and hasattr(query2, "mask"):
+        query.mask = lambda table: query1.mask(table) & query2.mask(table)
+    if hasattr(query1, "expression") and hasattr(query2, "expression"):
+        query.expression = ("both", query1.expression, query2.expression)
+    # Records that satisfy both queries satisfy either one, so either index
+    # narrows the search
+    lookup = getattr(query1, "index_lookup", None) or getattr(
+        query2, "index_lookup", None)
+    if lookup:
+        query.index_lookup = lookup
     return query
 
 
@@ -52,4 +121,8 @@ def negate(query1):
     def query(record):
         return not query1(record)
 
+    if hasattr(query1, "mask"):
+        query.mask = lambda table: ~query1.mask(table)
+    if hasattr(query1, "expression"):
+        query.expression = ("negate", query1.expression)
     return query
@@ -17,148 +17,244 @@
 located within a text"""
 
 import re
-import itertools
 import datetime
-import numpy as np
+import functools
+import unicodedata
 
 from dateparser.search import search_dates
-from sklearn.feature_extraction.text import TfidfVectorizer
 
+from autociter.data import automata, dates, matching, ngrams
 from autociter.data.storage import Table, Record
 from autociter.data.queries import contains
 from autociter.utils.debugging import debug
 from autociter.utils.decorators import timeit
 
 
-def standardize(data, datatype):
-    """Define methods that standardize fields into a singular format that is logical
-    and searchable
+# Words (runs of word characters and "#") and individual newlines. Every other
+# character separates words.
+TEXT_TOKENS = re.compile(r"[\w#]+|\n")
+HTML_IGNORED_ELEMENTS = ("script", "style")
+# Formats of most citation dates, such as "2018-11-12" and "12 Nov 2018". Each
+# is parsed exactly like dateparser parses it.
+DATE_FORMATS = ("%Y-%m-%d", "%B %d, %Y", "%B %d %Y", "%d %B %Y", "%b %d, %Y",
+                "%b %d %Y", "%d %b %Y")
+# Formats without a day, which strict parsing rejects
+PARTIAL_DATE_FORMATS = ("%B %Y", "%b %Y", "%Y")
+DATE_CACHE_SIZE = 2**16
+FIND_METHODS = ("tfidf", "edits")
+AUTOMATON_CACHE_SIZE = 256
+
+
+def std_markdown(markdown):
+    """Remove the substring 'Image\n\n' from markdown."""
+    return markdown.replace("Image\n\n", "")
+
+
+def std_html(html):
+    """Remove script and style elements from HTML.
+
+    An element spans from its opening tag to the end of the first closing tag
+    after it. Elements are removed in a single pass over the source.
     """
+    for tag_name in HTML_IGNORED_ELEMENTS:
+        html = remove_elements(html, tag_name)
+    return html
 
-    def std_markdown(markdown):
-        """Remove the substring 'Image\n\n' from markdown."""
-        for substring in {"Image\n\n"}:
-            markdown = markdown.replace(substring, "")
-        return markdown
-
-    def std_html(html):
-        """Remove script and style elements from HTML."""
-
-        def remove_elements(html, tag_name):
-            """Remove elements of a given type from HTML."""
-            while "<" + tag_name in html:
-                open_tag_start = html.find("<" + tag_name)
-                open_tag_end = html.find(">", open_tag_start)
-                close_tag_start = html.find("</" + tag_name, open_tag_end)
-                close_tag_end = html.find(">", close_tag_start)
-                html = html[:open_tag_start] + html[close_tag_end + 1:]
-            return html
-
-        html = remove_elements(html, "script")
-        html = remove_elements(html, "style")
-        return html
-
-    def std_table(table):
-        """Standardizes a default Table object so that it can be processed by
-        pipeline. (i.e Author field is created from first, last, first1, last1, etc.)
-        """
-        std_fields = [
-            "title", "author", "publisher", "date", "url", "archive-url"
-        ]
-        ret = Table(fields=std_fields)
-        for rec in table.records:
-            author_fields = [("first", "last"), ("first1", "last1"),
-                             ("first2", "last2")]
-            authors = []
-            for i in author_fields:
-                author = (rec[i[0]] + " " + rec[i[1]]).strip()
-                if author != "":
-                    authors.append(author)
-            values = []
-            for attr in std_fields:
-                if contains(attr)(rec):
-                    values.append(rec[attr])
-                elif attr == 'author':
-                    values.append(list(set(authors)))
-                else:
-                    values.append("")
-            ret.add(Record(std_fields, values))
-        return ret
-
-    def std_text(text):
-        """Standardizes a string representing article text
-        Resources: https://stackoverflow.com/questions/19785458/capitalization-of-sentences-in-python
-        """
 
-        def clean_text(text):
-            """Method that cleans a string to only include relevant characters and words"""
-            text = text.replace('\'', '')
-            text = text.replace('\"', '')
-            matched_words = re.findall(r'\S+|\n', re.sub(
-                "[^\w#\n]", " ", text))
-            words_and_pound_newline = [
-                i for i, j in itertools.zip_longest(
-                    matched_words, matched_words[1:]) if i != j
-            ]
-            words_and_pound_newline = [('#' if '#' in x else x)
-                                       for x in words_and_pound_newline]
-            words_and_pound_newline = [(x.replace('_', '') if '_' in x else x)
-                                       for x in words_and_pound_newline]
-            ret = ''
-            for i in range(len(words_and_pound_newline)):
-                word = words_and_pound_newline[i]
-                if i == 0 or word == '\n' or (
-                        i > 0 and words_and_pound_newline[i - 1] == '\n'):
-                    ret += word
-                else:
-                    ret += (" " + word)
-            return ret
-
-        def uppercase(matchobj):
-            return matchobj.group(0).upper()
-
-        def capitalize(s):
-            return re.sub('^([a-z])|[\.|\?|\!]\s*([a-z])|\s+([a-z])(?=\.)',
-                          uppercase, s)
-
-        text = clean_text(text)
-        return capitalize(text)
-
-    def std_author(authors):
-        """Method for standardizing a field if it is a list of authors"""
-        return [
-            ' '.join([
-                name.capitalize() for name in author.replace('.', '').replace(
-                    '-', ' ').split(' ')
-            ]) for author in authors
-        ]
-
-    def std_date(date):
-        """Method for standardizing a field if it is a date"""
-        base = datetime.datetime(1000, 1, 1, 0, 0)
+def remove_elements(html, tag_name):
+    """Remove elements of a given type from HTML.
+
+    Raises:
+        ValueError: if an element is never closed.
+    """
+    open_tag, close_tag = "<" + tag_name, "</" + tag_name
+    overlap = len(open_tag) - 1
+    pieces, tail = [], ""
+    position = 0
+    while True:
+        open_tag_start = html.find(open_tag, position)
+        if open_tag_start == -1:
+            break
+        open_tag_end = html.find(">", open_tag_start)
+        close_tag_start = html.find(close_tag, open_tag_end)
+        if open_tag_end == -1 or close_tag_start == -1:
+            # The element extends to the end if the document ends with ">"
+            close_tag_end = len(html) - 1 if html.endswith(">") else -1
+        else:
+            close_tag_end = html.find(">", close_tag_start)
+        if close_tag_end == -1:
+            raise ValueError("Unclosed <{0}> element".format(tag_name))
+        kept = html[position:open_tag_start]
+        pieces.append(kept)
+        tail = (tail + kept)[-overlap:]
+        position = close_tag_end + 1
+        # Removing an element can join the text around it into a new opening
+        # tag, as in "<<script></script>script>", which is removed as well.
+        joined = (tail + html[position:position + overlap]).find(open_tag)
+        if joined != -1:
+            rewound = tail[joined:]
+            drop_last_characters(pieces, len(rewound))
+            html = rewound + html[position:]
+            position = 0
+            tail = "".join(pieces[-overlap:])[-overlap:]
+    pieces.append(html[position:])
+    return "".join(pieces)
+
+
+def drop_last_characters(pieces, count):
+    """Remove count characters from the end of a list of strings."""
+    while count:
+        piece = pieces.pop()
+        if len(piece) > count:
+            pieces.append(piece[:-count])
+            return
+        count -= len(piece)
+
+
+STD_FIELDS = ["title", "author", "publisher", "date", "url", "archive-url"]
+AUTHOR_FIELDS = [("first", "last"), ("first1", "last1"), ("first2", "last2")]
+
+
+def std_table(table):
+    """Standardizes a default Table object so that it can be processed by
+    pipeline. (i.e Author field is created from first, last, first1, last1, etc.)
+    """
+    ret = Table(fields=STD_FIELDS)
+    ret.extend(table.map(std_record))
+    return ret
+
+
+def std_record(rec):
+    """Standardizes a single record of a default Table, so that records can be
+    standardized as they are streamed from a file"""
+    authors = []
+    for i in AUTHOR_FIELDS:
+        author = (rec[i[0]] + " " + rec[i[1]]).strip()
+        if author != "":
+            authors.append(author)
+    values = []
+    for attr in STD_FIELDS:
+        if contains(attr)(rec):
+            values.append(rec[attr])
+        elif attr == 'author':
+            values.append(list(set(authors)))
+        else:
+            values.append("")
+    return Record(STD_FIELDS, values)
+
+
+def std_text(text):
+    """Standardizes a string representing article text
+    Resources: https://stackoverflow.com/questions/19785458/capitalization-of-sentences-in-python
+    """
+    text = clean_text(text)
+    # Cleaned text has no punctuation, so the only sentence that needs to be
+    # capitalized is the first one.
+    if "a" <= text[:1] <= "z":
+        return text[0].upper() + text[1:]
+    return text
+
+
+def clean_text(text):
+    """Method that cleans a string to only include relevant characters and words
+
+    Repeated words and newlines are collapsed, words containing "#" become
+    "#", and underscores are removed.
+    """
+    words = TEXT_TOKENS.findall(text.replace("'", "").replace('"', ""))
+    if not words:
+        return ""
+    # Of each run of repeated words, only the last one is kept
+    words.append(None)
+    words = [("#" if "#" in word else word.replace("_", ""))
+             for word, following in zip(words, words[1:])
+             if word != following]
+    # Words are separated by spaces, except next to newlines
+    return " ".join(words).replace(" \n", "\n").replace("\n ", "\n")
+
+
+def std_author(authors):
+    """Method for standardizing a field if it is a list of authors"""
+    return [
+        ' '.join([
+            name.capitalize() for name in author.replace('.', '').replace(
+                '-', ' ').split(' ')
+        ]) for author in authors
+    ]
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def std_date(date):
+    """Method for standardizing a field if it is a date
+
+    Common formats are parsed with strptime, and other dates are searched for
+    with dateparser. Results are memoized because citations repeat dates.
+    """
+    base = datetime.datetime(1000, 1, 1, 0, 0)
+    parsed = parse_common_date(date)
+    if parsed is None:
         matches = search_dates(
             date, settings={
                 'STRICT_PARSING': True,
                 'RELATIVE_BASE': base
             })
-        if matches and matches[0][1] - base > datetime.timedelta(days=2 * 365):
-            return matches[0][1].strftime('%m/%d/%y')
-        return date.lower().replace(',', ' ').replace('-', ' ')
+        parsed = matches[0][1] if matches else False
+    if parsed and parsed - base > datetime.timedelta(days=2 * 365):
+        return parsed.strftime('%m/%d/%y')
+    return date.lower().replace(',', ' ').replace('-', ' ')
+
+
+def parse_common_date(date):
+    """Parse a date written in a common format.
+
+    Returns:
+        A datetime, False if the date has no day (so strict parsing would
+        reject it), or None if the date is not in a common format.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date, date_format)
+        except ValueError:
+            pass
+    for date_format in PARTIAL_DATE_FORMATS:
+        try:
+            datetime.datetime.strptime(date, date_format)
+            return False
+        except ValueError:
+            pass
+    return None
+
+
+def std_title(title):
+    """Method for standardizing a field if it is a title"""
+    return title.title()
+
+
+def std_url(url):
+    """Method to standardize a url"""
+    return url
+
 
-    def std_title(title):
-        """Method for standardizing a field if it is a title"""
-        return title.title()
+STANDARDIZERS = {
+    "markdown": std_markdown,
+    "html": std_html,
+    "table": std_table,
+    "text": std_text,
+    "author": std_author,
+    "date": std_date,
+    "title": std_title,
+    "url": std_url
+}
 
-    def std_url(url):
-        """Method to standardize a url"""
-        return url
 
+def standardize(data, datatype):
+    """Define methods that standardize fields into a singular format that is logical
+    and searchable
+    """
     try:
-        if datatype.lower() in [
-                "markdown", "html", "table", "text", "author", "date", "title",
-                "url"
-        ]:
-            return eval("std_{0}(data)".format(datatype.lower()))
+        standardizer = STANDARDIZERS.get(datatype.lower())
+        if standardizer:
+            return standardizer(data)
         else:
             debug(
                 "*** Error in standardization.standardize: {0} not standardizable"
@@ -169,9 +265,120 @@ def standardize(data, datatype):
         return ""
 
 
-def find(field, text, datatype, start=0, end=None, threshold_value=0.6):
+class StandardizedDocument:
+    """A standardized text and the views of it that fields are located with.
+
+    Each view is computed the first time it is used and then cached, so
+    locating several fields in the same document, or passing the document
+    between the pipeline, statistics and extractors, standardizes and indexes
+    the text only once.
+
+        >>> document = StandardizedDocument("by michael wan")
+        >>> find(["Michael Wan"], document, "author")
+        [(3, 14)]
+
+    Arguments:
+        data: The text to standardize.
+        datatype: The datatype that data is standardized as.
+        standardized: If true, data is already standardized.
+    """
+
+    def __init__(self, data, datatype="text", standardized=False):
+        self.data, self.datatype = data, datatype
+        self.cache = {}
+        if standardized:
+            self.cache["text"] = data
+
+    def __len__(self):
+        return len(self.text)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def text(self):
+        """Return the standardized text."""
+        if "text" not in self.cache:
+            self.cache["text"] = standardize(self.data, self.datatype)
+        return self.cache["text"]
+
+    @property
+    def lower(self):
+        """Return the lowercased standardized text."""
+        if "lower" not in self.cache:
+            self.cache["lower"] = self.text.lower()
+        return self.cache["lower"]
+
+    @property
+    def ngram_index(self):
+        """Return the character n-gram index of the lowercased text."""
+        if "ngram_index" not in self.cache:
+            self.cache["ngram_index"] = ngrams.ngram_index(self.lower)
+        return self.cache["ngram_index"]
+
+    @property
+    def date_windows(self):
+        """Return the spans of the lines of the text that may contain dates."""
+        if "date_windows" not in self.cache:
+            self.cache["date_windows"] = dates.candidate_windows(self.text)
+        return self.cache["date_windows"]
+
+    def heading_offsets(self, heading_size):
+        """Return the offsets of the markdown headings of a size in the text.
+
+        A heading is a run of exactly heading_size "#" followed by a space.
+        """
+        key = ("heading_offsets", heading_size)
+        if key not in self.cache:
+            text, prefix = self.text, "#" * heading_size + " "
+            offsets = []
+            index = text.find(prefix)
+            while index != -1:
+                if text[index - 1] != "#":
+                    offsets.append(index)
+                index = text.find(prefix, index + 1)
+            self.cache[key] = offsets
+        return self.cache[key]
+
+
+@functools.lru_cache(maxsize=AUTOMATON_CACHE_SIZE)
+def author_automaton(authors):
+    """Return an automaton that finds a tuple of standardized authors in
+    lowercased text, reusing the automata of recently searched authors"""
+    return automata.AhoCorasick([author.lower() for author in authors])
+
+
+def find_authors(authors, text, start=0, end=None):
+    """Return a list with the (start, end) of every occurrence of each author
+    in text, found in one pass over the lowercased text"""
+    if isinstance(text, StandardizedDocument):
+        lower = text.lower
+    else:
+        lower = text.lower()
+    automaton = author_automaton(tuple(standardize(authors, 'author')))
+    occurrences = [[] for _ in automaton.patterns]
+    for match_start, match_end, index in automaton.find_all(lower, start, end):
+        occurrences[index].append((match_start, match_end))
+    return occurrences
+
+
+def find(field, text, datatype, start=0, end=None, threshold_value=0.6,
+         method="tfidf"):
     """Attempts to locate a field as a substring of text based on its datatype.
-    Assumes text is cleaned by pipeline's clean_text"""
+    Assumes text is cleaned by pipeline's clean_text, or is a
+    StandardizedDocument whose cached views are reused
+
+    Titles are located approximately with one of FIND_METHODS: "tfidf"
+    compares n-gram vectors of the title and chunks of the text, and "edits"
+    finds the substring with the fewest edits, allowing up to
+    (1 - threshold_value) edits per character of the title.
+    """
+
+    if isinstance(text, StandardizedDocument):
+        document = text
+    else:
+        document = StandardizedDocument(text, standardized=True)
+    text = document.text
 
     def find_generic(field, text, start=0, end=None):
         """Basic method for finding any generic field within a text"""
@@ -183,85 +390,43 @@ def find(field, text, datatype, start=0, end=None, threshold_value=0.6):
 
     def find_fuzzy_fast(field, text, start=0, end=None):
         """Fast fuzzy string matching
+
+        The text's n-gram index is reused between fields, so locating several
+        fields in the same text only indexes it once.
         References:
         https://bergvca.github.io/2017/10/14/super-fast-string-matching.html
         http://blog.christianperone.com/2013/09/machine-learning-cosine-similarity-for-vector-space-models-part-iii/
         https://stackoverflow.com/questions/52048562/efficient-way-to-compute-cosine-similarity-between-1d-array-and-all-rows-in-a-2d
         https://stackoverflow.com/questions/36013295/find-best-substring-match
         """
-
-        def generate_chunks(string, length):
-            return [
-                string[0 + i:length + i]
-                for i in range(0, len(string), length) if length + i < len(string)
-            ]
-
-        def generate_ngrams(string, n=3):
-            """Helper method for generating ngrams"""
-            ngrams = zip(*[string[i:] for i in range(n)])
-            return [''.join(ngram) for ngram in ngrams]
-
         try:
-            text = text[start:end]
-            chunks = [field] + generate_chunks(text, len(field))
-            vectorizer = TfidfVectorizer(min_df=1, analyzer=generate_ngrams)
-            tf_idf_matrix = vectorizer.fit_transform(chunks)
-            vec, arr = tf_idf_matrix[0].toarray().flatten(
-            ), tf_idf_matrix[1:].toarray()
-            a, b = np.linalg.norm(arr, axis=1), np.linalg.norm(vec)
-            out = (arr @ vec) / (a * b)
-            index = np.argmax(out) * len(field)
-
-            ngrams = [field]
-            for i in range(
-                    max(0, index - len(field)), min(index + len(field),
-                                                    len(text))):
-                if i+len(field) >= len(text):
-                    break
-                ngrams.append(text[i:i + len(field)])
-
-            vectorizer = TfidfVectorizer(min_df=1, analyzer=generate_ngrams)
-            tf_idf_matrix = vectorizer.fit_transform(ngrams)
-            vec, arr = tf_idf_matrix[0].toarray().flatten(
-            ), tf_idf_matrix[1:].toarray()
-            a, b = np.linalg.norm(arr, axis=1), np.linalg.norm(vec)
-            out = (arr @ vec) / (a * b)
-            ans = np.argmax(out) + max(0, index - len(field))
-            if np.max(out) < threshold_value:
-                return (-1, -1)
-            ret = (ans, ans + len(field))
-            return (start + ret[0].item(), start + ret[1].item())
+            return document.ngram_index.find(field, threshold_value, start, end)
         except Exception as e:
             return (-1, -1)
 
-    def find_singular_author(author, text, start=0, end=None):
-        """Helper method for finding a singular author"""
-        return find_generic(author.lower(), text.lower(), start, end)
-
     def find_author(authors, text, start=0, end=None):
-        """Method for finding an "author" field (a list of authors) in a text"""
-        authors = standardize(authors, 'author')
-        ret = []
-        for author in authors:
-            pos = find_singular_author(author, text, start, end)
-            ret.append(pos)
-        return ret
+        """Method for finding an "author" field (a list of authors) in a text
+
+        Every author is searched for in the same pass over the text.
+        """
+        automaton = author_automaton(tuple(standardize(authors, 'author')))
+        return automaton.find_first(document.lower, start, end)
 
     def find_date(date, text, start=0, end=None):
         """Method for finding a date field in a text"""
-        text = text[start:end]
         date = datetime.datetime.strptime(date, '%m/%d/%y')
         # Pass an impossible relative base so that relative words like "today" won't be detected
-        matches = search_dates(
+        matches = dates.iter_dates(
             text,
             settings={
                 'STRICT_PARSING': True,
                 'RELATIVE_BASE': datetime.datetime(1000, 1, 1, 0, 0)
-            })
-        if matches:
-            for original_text, match in matches:
-                if date.date() == match.date():
-                    return find_generic(original_text.lower(), text.lower(), start, end)
+            },
+            windows=document.date_windows)
+        for original_text, match in matches:
+            if date.date() == match.date():
+                return find_generic(original_text.lower(), document.lower,
+                                    start, end)
         return (-1, -1)
 
     def find_title(title, text, start=0, end=None):
@@ -269,7 +434,11 @@ def find(field, text, datatype, start=0, end=None, threshold_value=0.6):
         ?? 'http://www.digitalspy.com/gaming/retro-corner/news/a381156/retro-corner-wolfenstein-3d/'
         """
         # return find_generic(title.lower(), text.lower())
-        return find_fuzzy_fast(title.lower(), text.lower(), start, end)
+        if method == "edits":
+            max_edits = int(len(title) * (1 - threshold_value))
+            return matching.find_approximate(title.lower(), document.lower,
+                                             max_edits, start, end)
+        return find_fuzzy_fast(title.lower(), document.lower, start, end)
 
     try:
         if datatype.lower() in ["author", "date", "title"]:
@@ -284,39 +453,84 @@ def find(field, text, datatype, start=0, end=None, threshold_value=0.6):
         return (-1, -1)
 
 
+# Transliterations that take precedence over Unicode decompositions
+ASCII_OVERRIDES = {
+    'a': ['à', 'á', 'â', 'ä', 'æ', 'ã', 'å', 'ā'],
+    'c': ['ç', 'ć', 'č'],
+    'e': ['è', 'é', 'ê', 'ë', 'ē', 'ė', 'ę'],
+    'i': ['î', 'ï', 'í', 'ī', 'į', 'ì'],
+    'l': ['ł'],
+    'n': ['ñ', 'ń'],
+    'o': ['ô', 'ö', 'ò', 'ó', 'œ', 'ø', 'ō', 'õ'],
+    's': ['ß', 'ś', 'š'],
+    'u': ['û', 'ü', 'ù', 'ú', 'ū'],
+    'y': ['ÿ'],
+    'z': ['ž', 'ź', 'ż'],
+    'A': ['À', 'Á', 'Â', 'Ä', 'Æ', 'Ã', 'Å', 'Ā'],
+    'C': ['Ç', 'Ć', 'Č'],
+    'E': ['È', 'É', 'Ê', 'Ë', 'Ē', 'Ė', 'Ę'],
+    'I': ['Î', 'Ï', 'Í', 'Ī', 'Į', 'Ì'],
+    'L': ['Ł'],
+    'N': ['Ñ', 'Ń'],
+    'O': ['Ô', 'Ö', 'Ò', 'Ó', 'Œ', 'Ø', 'Ō', 'Õ'],
+    'S': ['Ś', 'Š'],
+    'U': ['Û', 'Ü', 'Ù', 'Ú', 'Ū'],
+    'Y': ['Ÿ'],
+    'Z': ['Ž', 'Ź', 'Ż'],
+    'D': ['Đ', 'Ð'],
+    'd': ['đ', 'ð'],
+    'H': ['Ħ'],
+    'h': ['ħ'],
+    'T': ['Þ'],
+    't': ['þ'],
+    '-': ['‐', '‑', '‒', '–', '—', '―', '−']
+}
+
+
+class TransliterationTable(dict):
+    """A str.translate table that maps every character to one ASCII character.
+
+    Newlines and printable ASCII characters map to themselves and other ASCII
+    characters map to spaces. Other characters map to ASCII_OVERRIDES or to
+    the first ASCII character of their compatibility decomposition (NFKD), so
+    "é" becomes "e" and "ﬁ" becomes "f". Characters without an equivalent map
+    to spaces. Entries are computed when a character is first seen.
+    """
+
+    def __init__(self, overrides=None):
+        dict.__init__(self)
+        for code in range(128):
+            self[code] = chr(code) if code == 10 or 31 < code < 127 else " "
+        for ascii_char, foreign_chars in (overrides or {}).items():
+            for foreign_char in foreign_chars:
+                self[ord(foreign_char)] = ascii_char
+
+    def __missing__(self, code):
+        decomposition = unicodedata.normalize("NFKD", chr(code))
+        ascii_chars = [c for c in decomposition if " " < c < "\x7f"]
+        self[code] = ascii_chars[0] if ascii_chars else " "
+        return self[code]
+
+
+TRANSLITERATION_TABLE = TransliterationTable(ASCII_OVERRIDES)
+
+
+def transliterate(text):
+    """Converts every character of a text into one ASCII character
+
+        >>> transliterate('Califørniå – Đặng')
+        'California - Dang'
+    """
+    return text.translate(TRANSLITERATION_TABLE)
+
+
 def clean_to_ascii(foreign_char):
     """Converts a non-ASCII character into it's ASCII equivalent
 
         >>> clean_to_ascii('ç')
         'c'
     """
-    special_chars = {
-        'a': ['à', 'á', 'â', 'ä', 'æ', 'ã', 'å', 'ā'],
-        'c': ['ç', 'ć', 'č'],
-        'e': ['è', 'é', 'ê', 'ë', 'ē', 'ė', 'ę'],
-        'i': ['î', 'ï', 'í', 'ī', 'į', 'ì'],
-        'l': ['ł'],
-        'n': ['ñ', 'ń'],
-        'o': ['ô', 'ö', 'ò', 'ó', 'œ', 'ø', 'ō', 'õ'],
-        's': ['ß', 'ś', 'š'],
-        'u': ['û', 'ü', 'ù', 'ú', 'ū'],
-        'y': ['ÿ'],
-        'z': ['ž', 'ź', 'ż'],
-        'A': ['À', 'Á', 'Â', 'Ä', 'Æ', 'Ã', 'Å', 'Ā'],
-        'C': ['Ç', 'Ć', 'Č'],
-        'E': ['È', 'É', 'Ê', 'Ë', 'Ē', 'Ė', 'Ę'],
-        'I': ['Î', 'Ï', 'Í', 'Ī', 'Į', 'Ì'],
-        'L': ['Ł'],
-        'N': ['Ñ', 'Ń'],
-        'O': ['Ô', 'Ö', 'Ò', 'Ó', 'Œ', 'Ø', 'Ō', 'Õ'],
-        'S': ['Ś', 'Š'],
-        'U': ['Û', 'Ü', 'Ù', 'Ú', 'Ū'],
-        'Y': ['Ÿ'],
-        'Z': ['Ž', 'Ź', 'Ż']
-    }
-    if foreign_char in sum(special_chars.values(), []):
-        for k in special_chars:
-            if foreign_char in special_chars[k]:
-                return k
-    debug("Can't convert: " + str(foreign_char))
-    return ' '
+    ascii_char = TRANSLITERATION_TABLE[ord(foreign_char)]
+    if ascii_char == ' ' and foreign_char != ' ':
+        debug("Can't convert: " + str(foreign_char))
+    return ascii_char
@@ -14,7 +14,17 @@
 #
 # Author: Balaji Veeramani <bveeramani@berkeley.edu>
 """Define function and objects for manipulating data files."""
-from autociter.utils import multithreading
+import array
+import bisect
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import os
+import random
+
+import numpy as np
+
+from autociter.utils.workers import WorkerPool
 
 
 def csv(item, delimiter):
@@ -22,10 +32,252 @@ def csv(item, delimiter):
     return type(item).__csv__(item, delimiter)
 
 
+def csv_header(fields, delimiter):
+    """Return the header line of a data file with the given fields."""
+    return (delimiter.join(fields) + delimiter).rstrip()
+
+
+def sample(records, size, generator=random):
+    """Return a random sample of at most size records from an iterable.
+
+    The iterable is read once and only the sample is kept in memory
+    (reservoir sampling), so records can be streamed from a file.
+    """
+    reservoir = []
+    for count, record in enumerate(records):
+        if count < size:
+            reservoir.append(record)
+        else:
+            index = generator.randrange(count + 1)
+            if index < size:
+                reservoir[index] = record
+    return reservoir
+
+
+def chunk_offsets(filename, start, chunk_size):
+    """Return (start, end) byte ranges that split a file from start onward
+    into chunks of about chunk_size bytes, each ending after a newline."""
+    size = os.path.getsize(filename)
+    offsets = [start]
+    with open(filename, "rb") as file:
+        for offset in range(start + chunk_size, size, chunk_size):
+            if offset <= offsets[-1]:
+                continue
+            file.seek(offset - 1)
+            file.readline()
+            if file.tell() >= size:
+                break
+            offsets.append(file.tell())
+    offsets.append(size)
+    return [(offsets[i], offsets[i + 1]) for i in range(len(offsets) - 1)
+            if offsets[i] < offsets[i + 1]]
+
+
+def needed_chunks(filename, chunks, num_records):
+    """Return the first of a list of (start, end) byte ranges of a file that
+    together hold at least num_records lines."""
+    if num_records is None:
+        return chunks
+    with open(filename, "rb") as file:
+        for count, (start, end) in enumerate(chunks):
+            if num_records <= 0:
+                return chunks[:count]
+            file.seek(start)
+            # Lines end with "\n" or a lone "\r", so this is at most the number
+            # of lines in the chunk
+            num_records -= file.read(end - start).count(b"\n")
+    return chunks
+
+
+def parse_chunk(filename, start, end, delimiter, num_fields):
+    """Parse the lines in a byte range of a data file into encoded columns.
+
+    Returns the number of rows, a (distinct values, codes) pair for each
+    column, and the values of rows that do not have num_fields values, keyed
+    by their row in the chunk. Codes are the bytes of an array of type "I".
+    """
+    with open(filename, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    # Split lines like a file opened in text mode
+    lines = data.decode("utf-8").replace("\r\n", "\n").replace("\r",
+                                                                "\n")
+    lines = lines.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    counts = np.fromiter(map(str.count, lines, itertools.repeat(delimiter)),
+                         dtype=np.int64, count=len(lines))
+    ragged = {}
+    for row in np.flatnonzero(counts != num_fields - 1).tolist():
+        values = lines[row].split(delimiter)
+        ragged[row] = values
+        values = values[:num_fields] + [""] * (num_fields - len(values))
+        lines[row] = delimiter.join(values)
+    # Every line now has num_fields values, so the values of a column are
+    # every num_fields-th value of the chunk
+    values = delimiter.join(lines).split(delimiter) if lines else []
+    columns = []
+    for position in range(num_fields):
+        column = values[position::num_fields]
+        distinct = list(dict.fromkeys(column))
+        lookup = {value: code for code, value in enumerate(distinct)}
+        codes = array.array("I", map(lookup.__getitem__, column))
+        columns.append((distinct, codes.tobytes()))
+    return len(lines), columns, ragged
+
+
+def parse_in_order(pool, executor, arguments, window):
+    """Yield the results of parse_chunk for each of a list of arguments, in
+    order, applying it in a WorkerPool.
+
+    At most window chunks are submitted ahead of the chunk being yielded, so
+    parsed chunks do not pile up in memory, and nothing more is parsed once
+    the caller stops reading.
+    """
+    arguments = iter(arguments)
+    pending = collections.deque(
+        executor.submit(pool.apply, *args)
+        for args in itertools.islice(arguments, window))
+    while pending:
+        result = pending.popleft().result()
+        for args in itertools.islice(arguments, 1):
+            pending.append(executor.submit(pool.apply, *args))
+        yield result
+
+
+class EncodedColumn:
+    """A column that stores each distinct string once and a code per row.
+
+    Dictionary encoding suits low-cardinality fields such as publisher, where
+    millions of rows share a few thousand values.
+    """
+
+    def __init__(self):
+        self.values, self.codes, self.lookup = [], array.array("I"), {}
+
+    def append(self, value):
+        """Append a string to the column."""
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def extend_encoded(self, values, codes):
+        """Append rows given as codes into a list of distinct values."""
+        mapping = np.empty(len(values), dtype=np.uintc)
+        for index, value in enumerate(values):
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = len(self.values)
+                self.values.append(value)
+            mapping[index] = code
+        self.codes.frombytes(mapping[codes].tobytes())
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+
+class HashIndex:
+    """An index that finds the rows where a field equals a value.
+
+    Unhashable values, such as lists of authors, are kept aside and compared
+    one by one.
+    """
+
+    def __init__(self):
+        self.rows, self.unhashable = {}, []
+
+    def add(self, value, row):
+        """Index the value of a field in a row."""
+        try:
+            self.rows.setdefault(value, []).append(row)
+        except TypeError:
+            self.unhashable.append((value, row))
+
+    def lookup(self, operation, value):
+        """Return the sorted rows that satisfy an operation, or None if the
+        index does not support the operation."""
+        if operation != "equals":
+            return None
+        try:
+            rows = list(self.rows.get(value, ()))
+        except TypeError:
+            rows = []
+        if self.unhashable:
+            rows = sorted(rows + [row for other, row in self.unhashable
+                                  if other == value])
+        return rows
+
+
+class SortedIndex:
+    """An index that finds the rows where a field equals a value or starts
+    with a prefix.
+
+    Entries are sorted when the index is first used after records were added
+    out of order. Values that are not strings are kept aside and compared one
+    by one.
+    """
+
+    def __init__(self):
+        self.entries, self.others, self.sorted = [], [], True
+
+    def add(self, value, row):
+        """Index the value of a field in a row."""
+        if not isinstance(value, str):
+            self.others.append((value, row))
+            return
+        if self.entries and self.sorted and value < self.entries[-1][0]:
+            self.sorted = False
+        self.entries.append((value, row))
+
+    def lookup(self, operation, value):
+        """Return the sorted rows that satisfy an operation, or None if the
+        index does not support the operation."""
+        if operation == "equals":
+            matches = value.__eq__
+        elif operation == "prefix":
+            matches = lambda other: other.startswith(value)
+        else:
+            return None
+        if not self.sorted:
+            self.entries.sort()
+            self.sorted = True
+        rows = [row for other, row in self.others if other == value]
+        if isinstance(value, str):
+            start = bisect.bisect_left(self.entries, (value,))
+            for other, row in itertools.islice(self.entries, start, None):
+                if not matches(other):
+                    break
+                rows.append(row)
+        return sorted(rows)
+
+
 class Table:
-    """A generic data table."""
+    """A generic data table.
+
+    Values are stored by column, one list per field, so adding a record and
+    taking the length of a table take constant time. Columns of strings start
+    dictionary-encoded and are decoded into plain lists once they have too
+    many distinct values. Records are built when they are accessed.
+    """
 
     DELIMITER = "\t"
+    INDEXES = {"hash": HashIndex, "sorted": SortedIndex}
+    # Columns stay encoded while they have at most this many distinct values,
+    # or at most ENCODING_RATIO distinct values per row
+    ENCODING_SIZE = 4096
+    ENCODING_RATIO = 0.5
+    # Files are split into chunks of about this many bytes for parallel loads,
+    # and at most LOAD_WINDOW chunks per worker are parsed or waiting at once
+    LOAD_CHUNK_SIZE = 2**22
+    LOAD_WINDOW = 2
 
     def __init__(self, filename=None, fields=()):
         """Initialize a data table.
@@ -35,30 +287,163 @@ class Table:
             records: A list of Record objects.
             filename: The name of a data sheet.
         """
-        self.dictionary = {}
         if fields and not hasattr(fields, "__iter__"):
             raise TypeError("fields must be a collection.")
+        self.size = 0
+        # Records are keyed by row unless they were added with a custom key
+        self.keys, self.row_keys = {}, {}
+        # The values of records that have more or fewer values than fields
+        self.ragged = {}
         self.fields = fields
         if filename:
             self.load(filename)
 
-    def load(self, filename, num_records=1000000):
+    @property
+    def fields(self):
+        """The names of this table's attributes."""
+        return self._fields
+
+    @fields.setter
+    def fields(self, fields):
+        if self.size:
+            raise ValueError("Cannot change the fields of a nonempty table.")
+        self._fields = fields
+        self.columns = [EncodedColumn() for _ in fields]
+        # Whether each value of each column is nonempty, for contains queries
+        self.filled = [bytearray() for _ in fields]
+        self.positions = field_positions(fields)
+        self.indexes = {}
+
+    def load(self, filename, num_records=1000000, num_workers=1):
         """Load data from a file and return table.
 
         By default, the load method will add at most one million records.
 
+        With more than one worker, the file is split into chunks at line
+        boundaries, the chunks are parsed in worker processes, and the parsed
+        columns are added in file order.
+
         Arguments:
             filename: The name of some data file
             num_records: How many records should be loaded
+            num_workers: How many processes parse the file (default: 1, None
+                         for one per CPU)
         """
+        if num_workers != 1:
+            return self.load_parallel(filename, num_records, num_workers)
         with open(filename, encoding="utf-8") as file:
-            lines = file.read().splitlines()
+            header = next(file, "").rstrip("\n")
+            if not self.fields:
+                self.fields = header.split(self.DELIMITER)
+            for line in itertools.islice(file, num_records):
+                self.append(line.rstrip("\n").split(self.DELIMITER))
+        return self
+
+    def load_parallel(self, filename, num_records=1000000, num_workers=None):
+        """Load data from a file with a pool of worker processes and return
+        table.
+
+        Arguments:
+            filename: The name of some data file
+            num_records: How many records should be loaded
+            num_workers: How many processes parse the file (default: one per
+                         CPU)
+        """
+        with open(filename, "rb") as file:
+            header = file.readline()
+            start = file.tell()
         if not self.fields:
-            self.fields = lines[0].split(self.DELIMITER)
-        for line in lines[1:num_records + 1]:
-            self.add(self.parse(line))
+            self.fields = header.decode("utf-8").rstrip("\r\n").split(
+                self.DELIMITER)
+        arguments = [(filename, chunk_start, chunk_end, self.DELIMITER,
+                      len(self.columns))
+                     for chunk_start, chunk_end in needed_chunks(
+                         filename,
+                         chunk_offsets(filename, start, self.LOAD_CHUNK_SIZE),
+                         num_records)]
+        if len(arguments) < 2:
+            # Starting workers would take longer than reading one chunk
+            return self.load(filename, num_records)
+        pool = WorkerPool(parse_chunk, num_workers)
+        # Threads wait for the workers, so that chunks are parsed while
+        # earlier chunks are added
+        executor = ThreadPoolExecutor(pool.num_workers)
+        try:
+            self.extend_chunks(
+                parse_in_order(pool, executor, arguments,
+                               self.LOAD_WINDOW * pool.num_workers),
+                num_records)
+        finally:
+            # Chunks that were not started are cancelled, and the pool is
+            # closed once the running chunks finish
+            executor.shutdown(cancel_futures=True)
+            pool.close()
         return self
 
+    def extend_chunks(self, chunks, num_records=None):
+        """Add the rows of chunks returned by parse_chunk, in order."""
+        for count, columns, ragged in chunks:
+            if num_records is not None:
+                count = min(count, num_records)
+                num_records -= count
+            self.extend_encoded(count, columns, ragged)
+            if num_records == 0:
+                break
+
+    def extend_encoded(self, count, columns, ragged):
+        """Add rows given as a (distinct values, codes) pair for each column.
+
+        Arguments:
+            count: How many rows to add
+            columns: A list of (distinct values, codes) pairs, where codes are
+                     bytes or an array of type "I"
+            ragged: A dictionary mapping rows (counted from 0) to the values of
+                    records with more or fewer values than fields
+        """
+        for position, (values, codes) in enumerate(columns):
+            codes = np.frombuffer(codes, dtype=np.uintc)[:count]
+            filled = np.array([bool(value) for value in values], dtype=bool)
+            self.filled[position].extend(filled[codes].tobytes())
+            column = self.columns[position]
+            if isinstance(column, EncodedColumn):
+                column.extend_encoded(values, codes)
+                if not all(isinstance(value, str)
+                           for value in column.values) or len(
+                               column.values) > max(
+                                   self.ENCODING_SIZE,
+                                   self.ENCODING_RATIO * (self.size + count)):
+                    self.columns[position] = list(column)
+            else:
+                column.extend(map(values.__getitem__, codes.tolist()))
+        for row, values in ragged.items():
+            if row < count:
+                self.ragged[self.size + row] = list(values)
+        for field, index in self.indexes.items():
+            column = self.columns[self.positions[field]]
+            for row in range(self.size, self.size + count):
+                index.add(column[row], row)
+        self.size += count
+
+    @classmethod
+    def stream(cls, filename, fields=None, num_records=None):
+        """Yield the records of a data file one at a time.
+
+        Only the current line of the file is kept in memory, so files larger
+        than memory can be processed.
+
+        Arguments:
+            filename: The name of some data file
+            fields: The fields of the records (default: the file's header)
+            num_records: How many records should be read (default: all)
+        """
+        with open(filename, encoding="utf-8") as file:
+            header = next(file, "").rstrip("\n")
+            fields = fields or header.split(cls.DELIMITER)
+            positions = field_positions(fields)
+            for line in itertools.islice(file, num_records):
+                yield Record(fields, line.rstrip("\n").split(cls.DELIMITER),
+                             positions)
+
     def parse(self, line):
         """Parse a line of text that represents a data record."""
         values = line.split(self.DELIMITER)
@@ -66,23 +451,31 @@ class Table:
 
     def save(self, filename):
         """Save data to a file."""
-        with open(filename, "w", encoding="utf-8") as file:
-            file.write(self.header + "\n")
-            for record in self.records:
-                file.write(csv(record, self.DELIMITER) + "\n")
+        with RecordWriter(filename, self.fields, self.DELIMITER) as writer:
+            writer.write_all(self)
 
     @property
     def header(self):
         """A string representing this table's header."""
-        header = ""
-        for field in self.fields:
-            header += field + self.DELIMITER
-        return header.rstrip()
+        return csv_header(self.fields, self.DELIMITER)
 
     @property
     def records(self):
         """Return a list of this table's records."""
-        return list(self.dictionary.values())
+        return list(self)
+
+    @property
+    def dictionary(self):
+        """Return a dictionary mapping keys to this table's records."""
+        return {self.row_keys.get(row, row): self.record(row)
+                for row in range(self.size)}
+
+    def record(self, row):
+        """Return the record stored in a row of this table."""
+        if row in self.ragged:
+            return Record(self.fields, self.ragged[row], self.positions)
+        return Record(self.fields, [column[row] for column in self.columns],
+                      self.positions)
 
     def find(self, field, value):
         """Return the first record that contains the given field-value pair.
@@ -93,28 +486,97 @@ class Table:
             field: A record field
             value: A record value
         """
-        for record in self.records:
-            if record[field] == value:
-                return record
+        if field not in self.positions:
+            # Records have an empty value for fields they do not have
+            return self.record(0) if self.size and value == "" else None
+        if field in self.indexes:
+            rows = self.indexes[field].lookup("equals", value)
+            return self.record(rows[0]) if rows else None
+        column = self.columns[self.positions[field]]
+        for row, row_value in enumerate(column):
+            if row_value == value:
+                return self.record(row)
         return None
 
-    def query(self, function):
-        """Return a Table containing records that satisfy some function."""
-        valid = []
+    def create_index(self, field, kind="hash"):
+        """Index a field, so that finding records by its value does not scan
+        the table. The index is updated as records are added.
 
-        def validate(*records):
-            for record in records:
-                if function(record):
-                    valid.append(record)
+        Arguments:
+            field: A table field
+            kind: "hash" for equality lookups, or "sorted" for equality and
+                  prefix lookups
+        """
+        if kind not in self.INDEXES:
+            raise ValueError("Unknown index kind: {0}".format(kind))
+        if field not in self.positions:
+            raise ValueError("Table has no field {0}".format(field))
+        index = self.INDEXES[kind]()
+        for row, value in enumerate(self.columns[self.positions[field]]):
+            index.add(value, row)
+        self.indexes[field] = index
+        return index
+
+    def lookup(self, function):
+        """Return the sorted rows that may satisfy a query according to an
+        index, or None if no index applies."""
+        operation, field, value = getattr(function, "index_lookup",
+                                          (None, None, None))
+        if field not in self.indexes:
+            return None
+        return self.indexes[field].lookup(operation, value)
+
+    def mask(self, field, test):
+        """Return a NumPy boolean array of whether each row's value for a field
+        passes a test.
+
+        Encoded columns only test each distinct value once.
+        """
+        if field not in self.positions:
+            # Records have an empty value for fields they do not have
+            return np.full(self.size, bool(test("")))
+        if test is bool:
+            # Copy, so that the bytearray can still grow
+            return np.frombuffer(self.filled[self.positions[field]],
+                                 dtype=bool).copy()
+        column = self.columns[self.positions[field]]
+        if isinstance(column, EncodedColumn):
+            if not self.size:
+                return np.zeros(0, dtype=bool)
+            passes = np.fromiter(map(test, column.values), dtype=bool,
+                                 count=len(column.values))
+            return passes[np.frombuffer(column.codes, dtype=np.uintc)]
+        return np.fromiter(map(test, column), dtype=bool, count=self.size)
 
-        # Run the query with six seperate threads
-        threads = multithreading.build(6, validate, self.records)
-        multithreading.execute(threads)
+    def query(self, function):
+        """Return a TableView of the records that satisfy some function.
 
-        result = Table(fields=self.fields)
-        for record in valid:
-            result.add(record)
-        return result
+        Queries built with queries.equals or queries.startswith use an index
+        on their field if there is one. Other queries from the queries module
+        are evaluated column by column with their masks, and any other
+        function is called on each record.
+        """
+        rows = self.lookup(function)
+        if rows is not None:
+            rows = [row for row in rows if function(self.record(row))]
+        elif hasattr(function, "mask"):
+            rows = np.flatnonzero(function.mask(self))
+        else:
+            rows = [row for row in range(self.size)
+                    if function(self.record(row))]
+        return TableView(self, rows)
+
+    def map(self, function):
+        """Return a LazyView of the results of a function of each record."""
+        return LazyView(self).map(function)
+
+    def filter(self, function):
+        """Return a LazyView of the records that satisfy some function."""
+        return LazyView(self).filter(function)
+
+    def limit(self, count):
+        """Return a LazyView of at most the first count records."""
+        return LazyView(self).limit(count)
 
     def add(self, record, key=None):
         """Add record to the end of this table.
@@ -129,10 +591,44 @@ class Table:
             raise TypeError("Expected object with fields and values.")
         if record.fields != self.fields:
             raise ValueError("Table and record fields are mismatched.")
-        if key in self.dictionary:
+        if key is not None and self.row(key) is not None:
             raise ValueError("A record with that key already exists.")
-        key = key or len(self.records)
-        self.dictionary[key] = record
+        if key is not None:
+            self.keys[key], self.row_keys[self.size] = self.size, key
+        self.append(record.values)
+
+    def append(self, values):
+        """Add the values of a record to the end of this table's columns."""
+        if len(values) != len(self.columns):
+            self.ragged[self.size] = list(values)
+            values = list(values[:len(self.columns)])
+            values += [""] * (len(self.columns) - len(values))
+        for position, value in enumerate(values):
+            column = self.columns[position]
+            if isinstance(column, EncodedColumn) and not self.encodable(
+                    column, value):
+                column = self.columns[position] = list(column)
+            column.append(value)
+            self.filled[position].append(bool(value))
+        for field, index in self.indexes.items():
+            index.add(values[self.positions[field]], self.size)
+        self.size += 1
+
+    def encodable(self, column, value):
+        """Return true if an encoded column can stay encoded with a value."""
+        if not isinstance(value, str):
+            return False
+        return value in column.lookup or len(column.values) < max(
+            self.ENCODING_SIZE, self.ENCODING_RATIO * self.size)
+
+    def row(self, key):
+        """Return the row of the record with a key, or None if there is none."""
+        if key in self.keys:
+            return self.keys[key]
+        if (isinstance(key, int) and 0 <= key < self.size
+                and key not in self.row_keys):
+            return key
+        return None
 
     def extend(self, records):
         """Add collection of records to the table.
@@ -146,41 +642,274 @@ class Table:
             self.add(record)
 
     def __contains__(self, record):
-        for value in self.dictionary.values():
+        if isinstance(record, Record) and self.indexes:
+            field, index = next(iter(self.indexes.items()))
+            rows = index.lookup("equals", record[field])
+            return any(self.record(row) == record for row in rows)
+        for value in self:
             if record == value:
                 return True
         return False
 
     def __getitem__(self, key):
-        if key not in self.dictionary:
+        row = self.row(key)
+        if row is None:
             raise KeyError("Table has no record with key " + str(key))
-        return self.dictionary[key]
+        return self.record(row)
 
     def __len__(self):
-        return len(self.records)
+        return self.size
 
     def __iter__(self):
-        return iter(self.records)
+        return (self.record(row) for row in range(self.size))
 
     def __eq__(self, other):
         if not isinstance(other, Table):
             return False
-        return self.dictionary == other.dictionary
+        return len(self) == len(other) and self.dictionary == other.dictionary
+
+
+class TableView:
+    """The records of a table at some rows, returned by queries.
+
+    Views refer to the rows of their table instead of copying records, and
+    support the read-only parts of the Table interface. Records added to the
+    table later do not appear in the view.
+
+    Arguments:
+        table: The Table the records belong to.
+        rows: A sequence of rows of table.
+    """
+
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = np.asarray(rows, dtype=np.int64)
+
+    @property
+    def fields(self):
+        """The names of the attributes of the view's records."""
+        return self.table.fields
+
+    @property
+    def header(self):
+        """A string representing this view's header."""
+        return self.table.header
+
+    @property
+    def records(self):
+        """Return a list of this view's records."""
+        return list(self)
+
+    def mask(self, field, test):
+        """Return a NumPy boolean array of whether each record's value for a
+        field passes a test."""
+        return self.table.mask(field, test)[self.rows]
+
+    def find(self, field, value):
+        """Return the first record that contains the given field-value pair,
+        or None."""
+        for record in self:
+            if record[field] == value:
+                return record
+        return None
+
+    def query(self, function):
+        """Return a TableView of the records that satisfy some function."""
+        if hasattr(function, "mask"):
+            return TableView(self.table, self.rows[function.mask(self)])
+        return TableView(self.table, [
+            row for row in self.rows if function(self.table.record(row))
+        ])
+
+    def map(self, function):
+        """Return a LazyView of the results of a function of each record."""
+        return LazyView(self).map(function)
+
+    def filter(self, function):
+        """Return a LazyView of the records that satisfy some function."""
+        return LazyView(self).filter(function)
+
+    def limit(self, count):
+        """Return a LazyView of at most the first count records."""
+        return LazyView(self).limit(count)
+
+    def save(self, filename):
+        """Save data to a file."""
+        with RecordWriter(filename, self.fields,
+                          self.table.DELIMITER) as writer:
+            writer.write_all(self)
+
+    def __contains__(self, record):
+        return any(record == value for value in self)
+
+    def __getitem__(self, position):
+        if not -len(self) <= position < len(self):
+            raise KeyError("View has no record at " + str(position))
+        return self.table.record(int(self.rows[position]))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return (self.table.record(row) for row in self.rows.tolist())
+
+
+class LazyView:
+    """A chain of map, filter and limit steps over records, evaluated on
+    demand.
+
+    Nothing is computed until the view is iterated, and iteration reads the
+    source only until the view's limit is reached, so mapping and filtering
+    stop once enough records have been produced.
+
+        >>> table.map(std_record).filter(queries.contains("url")).limit(10)
+
+    Arguments:
+        source: An iterable of records, such as a Table or a stream. The
+                source is iterated again each time the view is.
+        steps: A sequence of (operation, argument) pairs, where operation is
+               "map", "filter" or "limit".
+    """
+
+    def __init__(self, source, steps=()):
+        self.source = source
+        self.steps = tuple(steps)
+
+    def map(self, function):
+        """Return a view of the results of a function of each record."""
+        return LazyView(self.source, self.steps + (("map", function),))
+
+    def filter(self, function):
+        """Return a view of the records that satisfy some function."""
+        return LazyView(self.source, self.steps + (("filter", function),))
+
+    def limit(self, count):
+        """Return a view of at most the first count records."""
+        if count < 0:
+            raise ValueError("count must be nonnegative.")
+        return LazyView(self.source, self.steps + (("limit", count),))
+
+    @property
+    def records(self):
+        """Return a list of this view's records."""
+        return list(self)
+
+    def find(self, field, value):
+        """Return the first record that contains the given field-value pair,
+        or None."""
+        for record in self:
+            if record[field] == value:
+                return record
+        return None
+
+    def to_table(self, fields=None):
+        """Return a Table of this view's records.
+
+        Arguments:
+            fields: The fields of the table (default: the first record's)
+        """
+        records = iter(self)
+        first = next(records, None)
+        table = Table(fields=fields or (first.fields if first else ()))
+        if first is not None:
+            table.add(first)
+            table.extend(records)
+        return table
+
+    def save(self, filename):
+        """Save data to a file."""
+        self.to_table().save(filename)
+
+    def __iter__(self):
+        records = iter(self.source)
+        for operation, argument in self.steps:
+            if operation == "map":
+                records = map(argument, records)
+            elif operation == "filter":
+                records = filter(argument, records)
+            else:
+                records = itertools.islice(records, argument)
+        return records
+
+
+class RecordWriter:
+    """A buffered writer that saves records to a data file as they arrive.
+
+        >>> with RecordWriter("citations.csv", table.fields) as writer:
+        ...     writer.write_all(Table.stream("dump.csv"))
+
+    Arguments:
+        filename: The name of the data file to write.
+        fields: The fields of the records, written as the header.
+        delimiter: The string that separates values.
+    """
+
+    BUFFER_SIZE = 2**20
+
+    def __init__(self, filename, fields, delimiter=Table.DELIMITER):
+        self.delimiter = delimiter
+        self.file = open(filename, "w", encoding="utf-8",
+                         buffering=self.BUFFER_SIZE)
+        self.file.write(csv_header(fields, delimiter) + "\n")
+
+    def write(self, record):
+        """Write a record to the file."""
+        self.file.write(csv(record, self.delimiter) + "\n")
+
+    def write_all(self, records):
+        """Write every record of an iterable and return how many there were."""
+        count = 0
+        for count, record in enumerate(records, 1):
+            self.write(record)
+        return count
+
+    def close(self):
+        """Flush the buffer and close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+FIELD_POSITIONS = {}
+
+
+def field_positions(fields):
+    """Return a dictionary mapping each field to its position in a record.
+
+    Maps are shared between all records with the same fields.
+    """
+    key = tuple(fields)
+    if key not in FIELD_POSITIONS:
+        FIELD_POSITIONS[key] = {field: i for i, field in enumerate(fields)}
+    return FIELD_POSITIONS[key]
 
 
 class Record:
-    """A record in a data table."""
+    """A record in a data table.
+
+    Records store their fields and values without copying them, and look up
+    fields in a position map shared with every record that has the same
+    fields, so accessing a field allocates nothing.
+    """
+
+    __slots__ = ("fields", "values", "positions")
 
     LABEL_SIZE = 5
 
-    def __init__(self, fields, values):
+    def __init__(self, fields, values, positions=None):
         """Initialize a record.
 
         Arguments:
             fields: A list representing the record's attributes.
             values: A list representing the value of each attribute.
+            positions: A dictionary mapping fields to positions (optional).
         """
         self.fields, self.values = fields, values
+        self.positions = positions or field_positions(fields)
 
     @property
     def data(self):
@@ -188,10 +917,11 @@ class Record:
         return dict(zip(self.fields, self.values))
 
     def __getitem__(self, field):
-        return self.data.get(field, "")
+        position = self.positions.get(field, len(self.values))
+        return self.values[position] if position < len(self.values) else ""
 
     def __contains__(self, field):
-        return bool(self.data.get(field, ""))
+        return bool(self[field])
 
     def __eq__(self, other):
         if not isinstance(other, Record):
@@ -202,18 +932,20 @@ class Record:
 
     def __csv__(self, delimiter):
         """Return csv-compatible representation."""
-        string = ""
-        for field in self.data:
-            string += self.data[field] + delimiter
-        return string.rstrip()
+        if len(self.positions) == len(self.fields):
+            values = self.values[:len(self.fields)]
+        else:
+            # Duplicate fields keep their last value, like data
+            values = self.data.values()
+        return (delimiter.join(values) + delimiter).rstrip()
 
     def __repr__(self):
         return "Record({0}, {1})".format(self.fields, self.values)
 
     def __str__(self):
         string = ""
-        for field in self.data:
-            if self.data[field]:
+        for field, value in self.data.items():
+            if value:
                 string += field[:self.LABEL_SIZE] + "\t"
-                string += str(self.data[field]) + "\n"
+                string += str(value) + "\n"
         return string.rstrip()
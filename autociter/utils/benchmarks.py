@@ -0,0 +1,142 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Time performance-sensitive parts of the pipeline.
+
+Run a benchmark with `python -m autociter.utils.benchmarks <name> [repeat]`.
+"""
+import glob
+import random
+import sys
+import timeit
+import tracemalloc
+
+import html2text
+
+import assets
+from autociter.data import queries, standardization
+from autociter.data.storage import Record, Table
+from autociter.utils.debugging import debug
+from autociter.web import conversion
+
+
+def best_time(function, repeat=5, number=1):
+    """Return the fastest of several timings of a function, in seconds."""
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number
+
+
+def load_webpages():
+    """Return a dictionary mapping the names of the saved webpages to source."""
+    webpages = {}
+    for filename in sorted(glob.glob(assets.WEBPAGES_PATH + "/*.html")):
+        with open(filename, encoding="utf-8") as file:
+            webpages[filename[len(assets.WEBPAGES_PATH) + 1:]] = file.read()
+    return webpages
+
+
+def benchmark_html_conversion(repeat=5, number=20):
+    """Compare html2text to the lite converter on the saved webpages."""
+
+    def convert_with_html2text(source):
+        parser = html2text.HTML2Text()
+        parser.ignore_images = True
+        parser.ignore_links = True
+        return parser.handle(source)
+
+    results = {}
+    for name, source in load_webpages().items():
+        slow = best_time(lambda: convert_with_html2text(source), repeat, number)
+        fast = best_time(lambda: conversion.html_to_markdown(source), repeat,
+                         number)
+        results[name] = (slow, fast)
+        debug("{0} ({1} bytes): html2text {2:.2f} ms, lite {3:.2f} ms, "
+              "{4:.1f}x faster".format(name, len(source), slow * 1000,
+                                       fast * 1000, slow / fast))
+    return results
+
+
+def benchmark_standardization(repeat=5, number=20):
+    """Time the html, markdown and text standardizers on the saved webpages."""
+    results = {}
+    for name, source in load_webpages().items():
+        markdown = conversion.html_to_markdown(source)
+        inputs = {"html": source, "markdown": markdown, "text": markdown}
+        for datatype, data in inputs.items():
+            seconds = best_time(
+                lambda: standardization.standardize(data, datatype), repeat,
+                number)
+            results[(name, datatype)] = seconds
+            debug("{0} ({1} bytes): std_{2} {3:.3f} ms, {4:.1f} MB/s".format(
+                name, len(data), datatype, seconds * 1000,
+                len(data) / seconds / 1e6))
+    return results
+
+
+def citation_table(size=100000, seed=0):
+    """Return a Table of random citations with Wikipedia's citation fields."""
+    fields = ["title", "first", "last", "first1", "last1", "publisher",
+              "date", "url", "archive-url"]
+    generator = random.Random(seed)
+    table = Table(fields=fields)
+    for i in range(size):
+        table.add(Record(fields, [
+            "Title {0}".format(i),
+            generator.choice(["Michael", "Balaji", ""]),
+            generator.choice(["Wan", "Veeramani", ""]),
+            generator.choice(["Grace", ""]), generator.choice(["Chen", ""]),
+            "Publisher {0}".format(generator.randrange(100)),
+            generator.choice(["2018-11-12", ""]),
+            "http://example.com/{0}".format(i),
+            generator.choice(["http://archive.org/{0}".format(i), ""])
+        ]))
+    return table
+
+
+def benchmark_records(repeat=5, size=100000):
+    """Time std_table and a query on a table of citations, and measure the
+    memory of its records."""
+    table = citation_table(size)
+    query = queries.contains("title", "url", "publisher")
+    results = {
+        "std_table": best_time(lambda: standardization.std_table(table),
+                               repeat),
+        "query": best_time(lambda: table.query(query), repeat)
+    }
+    tracemalloc.start()
+    records = table.records
+    results["record_bytes"] = tracemalloc.get_traced_memory()[0] / size
+    tracemalloc.stop()
+    del records
+    debug("{0} records: std_table {1:.3f} s, query {2:.3f} s, "
+          "{3:.0f} bytes per record".format(size, results["std_table"],
+                                            results["query"],
+                                            results["record_bytes"]))
+    return results
+
+
+BENCHMARKS = {
+    "html_conversion": benchmark_html_conversion,
+    "records": benchmark_records,
+    "standardization": benchmark_standardization
+}
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage: benchmarks.py [{0}] [repeat]".format("|".join(BENCHMARKS)))
+        sys.exit(1)
+    if len(sys.argv) > 2 and sys.argv[2].isnumeric():
+        BENCHMARKS[sys.argv[1]](repeat=int(sys.argv[2]))
+    else:
+        BENCHMARKS[sys.argv[1]]()
@@ -0,0 +1,80 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a deadline object that bounds the time spent on a unit of work."""
+import time
+
+from autociter.utils.decorators import TimeoutException
+
+
+class Deadline:
+    """A point in time after which work should be abandoned.
+
+    Unlike the timeout decorator, a deadline does not need a thread of its own.
+    It is passed down through function calls, and each blocking operation
+    limits itself to the time that remains. Work stops by raising a
+    TimeoutException as soon as the deadline has passed.
+
+    >>> deadline = Deadline(15)
+    >>> sock.settimeout(deadline.timeout())
+
+    Arguments:
+        seconds: The time budget, or None for a deadline that never expires.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @property
+    def remaining(self):
+        """Seconds until the deadline, or None if it never expires."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        """Whether the deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self):
+        """Raise a TimeoutException if the deadline has passed."""
+        if self.expired:
+            self.expired_error()
+
+    def expired_error(self):
+        """Raise the TimeoutException for an expired deadline."""
+        raise TimeoutException(
+            "Deadline of {0} seconds exceeded".format(self.seconds))
+
+    def timeout(self, default=None):
+        """Return how long the next blocking operation may wait.
+
+        Arguments:
+            default: An upper bound for the timeout (optional).
+
+        Raises:
+            TimeoutException: if the deadline has already passed.
+        """
+        remaining = self.remaining
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            self.expired_error()
+        return remaining if default is None else min(remaining, default)
+
+    def __repr__(self):
+        return "Deadline({0})".format(self.seconds)
@@ -45,7 +45,11 @@ class TimeoutException(Exception):
 # https://stackoverflow.com/questions/21827874/timeout-a-python-function-in-
 # windows
 def timeout(seconds_before_timeout):
-    """Raise TimeoutException after some amount of time."""
+    """Raise TimeoutException after some amount of time.
+
+    Each call runs in a new thread that keeps running after a timeout. Code
+    that can pass a Deadline (see autociter.utils.deadlines) should do so.
+    """
 
     def decorator(func):
 
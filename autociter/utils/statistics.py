@@ -19,7 +19,7 @@ import numpy as np
 from difflib import SequenceMatcher
 
 from autociter.core.pipeline import slice_text
-from autociter.data.storage import Table
+from autociter.data.storage import Table, sample
 from autociter.web.webpages import Webpage
 from autociter.utils.debugging import debug
 from autociter.data.queries import contains
@@ -27,23 +27,32 @@ from autociter.data.queries import contains
 import assets
 import autociter.core.pipeline as pipeline
 import autociter.data.standardization as standardization
+import autociter.data.mapped as mapped
 
-def accuracy_fuzzy_match(sample, min_length=10, max_edits=3, strings_per_url=100):
+def accuracy_fuzzy_match(sample, min_length=10, max_edits=3, strings_per_url=100,
+                         methods=standardization.FIND_METHODS):
     """Return the accuracy of the fuzzy_match algorithm in standardization.find
+
+    Every method is evaluated on the same randomly edited strings, so their
+    accuracy and latency can be compared.
     """
     debug("Collecting seed urls...")
     contents = []
     edit_types = ["swap", "add", "del"]
-    errors_by_edit_type = {e: {"error": [], "total": 0} for e in edit_types}
-    errors_by_num_edits = {e: {"error": [], "total": 0} for e in range(max_edits+1)}
     char_dict = string.ascii_uppercase + string.ascii_lowercase + string.digits + "\n_-#"
-    success, total, wrong_string_found, no_string_found = 0, 0, [], []
+    webpages = Webpage.fetch_many(
+        [record["url"] for record in sample if ".pdf" not in record["url"]])
+    webpages = {webpage.url: webpage for webpage in webpages}
     for record in sample:
         try:
-            contents.append(pipeline.get_content_from_url(record["url"]))
+            contents.append(
+                (pipeline.get_content_from_url(record["url"],
+                                               webpages.get(record["url"])),
+                 record["url"]))
         except Exception as ex:
             debug("Error: {0} | {1}".format(ex, record["url"]))
-    for content in contents:
+    cases = []
+    for content, url in contents:
         if len(content) < 2:
             continue
         for num_edits in range(max_edits+1):
@@ -71,27 +80,46 @@ def accuracy_fuzzy_match(sample, min_length=10, max_edits=3, strings_per_url=100
                         field = field[:incident_index] + random.choice(char_dict) + field[incident_index:]
                     elif edit_type == 2:
                         field = field[:incident_index] + field[incident_index+1:]
-                    errors_by_edit_type[edit_types[edit_type]]["total"] += 1
-                loc = standardization.find(field, content, "title", threshold_value=0.5)
-                if loc == (-1, -1) or abs(loc[0] - s) >= max_edits or abs(loc[1] - e) >= max_edits:
-                    for e in edits:
-                        errors_by_edit_type[edit_types[e]]["error"].append((field, record["url"]))
-                    if loc != (-1, -1):
-                        debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| Wrong String Found \t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, record["url"]))
-                        wrong_string_found.append(num_edits)
-                    else:
-                        debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| String Not Found \t\t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, record["url"]))
-                        no_string_found.append(num_edits)
-                    errors_by_num_edits[num_edits]["error"].append((field, record["url"]))
-                else:
-                    success += 1
-                    debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| String Found \t\t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, record["url"]))
-                errors_by_num_edits[num_edits]["total"] += 1
-                total += 1
+                cases.append((content, url, field, s, e, num_edits, edits))
+    for method in methods:
+        debug("\n\nMETHOD: {0}\n=======".format(method))
+        evaluate_fuzzy_match(cases, method, max_edits, edit_types)
+
+
+def evaluate_fuzzy_match(cases, method, max_edits, edit_types):
+    """Print the accuracy and latency of a standardization.find method on
+    generated fuzzy match cases"""
+    errors_by_edit_type = {e: {"error": [], "total": 0} for e in edit_types}
+    errors_by_num_edits = {e: {"error": [], "total": 0} for e in range(max_edits+1)}
+    success, total, wrong_string_found, no_string_found = 0, 0, [], []
+    latencies = []
+    for content, url, field, s, e, num_edits, edits in cases:
+        for edit_type in edits:
+            errors_by_edit_type[edit_types[edit_type]]["total"] += 1
+        start_time = time.time()
+        loc = standardization.find(field, content, "title", threshold_value=0.5, method=method)
+        latencies.append(time.time() - start_time)
+        if loc == (-1, -1) or abs(loc[0] - s) >= max_edits or abs(loc[1] - e) >= max_edits:
+            for edit_type in edits:
+                errors_by_edit_type[edit_types[edit_type]]["error"].append((field, url))
+            if loc != (-1, -1):
+                debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| Wrong String Found \t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, url))
+                wrong_string_found.append(num_edits)
+            else:
+                debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| String Not Found \t\t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, url))
+                no_string_found.append(num_edits)
+            errors_by_num_edits[num_edits]["error"].append((field, url))
+        else:
+            success += 1
+            debug("Original: ({0}, {1}) \t| Found: ({2}, {3}) \t| String Found \t\t| {4} edits | {5}".format(s, e, loc[0], loc[1], num_edits, url))
+        errors_by_num_edits[num_edits]["total"] += 1
+        total += 1
     debug("Test complete.\n\nSUMMARY\n-------")
     debug("Accuracy: {0}/{1} = {2:.2f}%\n".format(success, total, 100.0*success/total))
     debug("Wrong String Found: {0}".format(len(wrong_string_found)))
     debug("No String Found: {0}".format(len(no_string_found)))
+    debug("Latency: {0:.2f} ms mean, {1:.2f} ms max".format(
+        1000 * np.mean(latencies), 1000 * np.max(latencies)))
 
     debug("\nError breakdown by edit type:")
     for error in errors_by_edit_type:
@@ -130,6 +158,9 @@ def accuracy_data_preservation(sample,
     }
     no_title_found, urls_with_errors = [], []
     skips = 0
+    webpages = Webpage.fetch_many(
+        [record["url"] for record in sample if ".pdf" not in record["url"]])
+    webpages = {webpage.url: webpage for webpage in webpages}
     for record in sample:
         try:
             if ".pdf" in record["url"]:
@@ -139,13 +170,15 @@ def accuracy_data_preservation(sample,
             defined_values = [(record[field], field)
                               for field in considered_fields
                               if (record[field])]
-            content = Webpage(record["url"]).content
-            standardized_content = slice_text(
-                standardization.standardize(content, "text"))
+            content = webpages[record["url"]].content
+            # Every field is located in the same document, so its views are
+            # computed once
+            document = standardization.StandardizedDocument(
+                slice_text(standardization.standardize(content, "text")),
+                standardized=True)
             values_found_in_content, values_expected_in_content = 0, 0
             for value, field in defined_values:
-                location = standardization.find(value, standardized_content,
-                                                field)
+                location = standardization.find(value, document, field)
                 if isinstance(location, list):
                     for loc in location:
                         values_expected_in_content += 1
@@ -200,15 +233,19 @@ def accuracy_title_content_extractor(sample):
     debug("Running accuracy statistic for title_content_extractor...")
     no_title_found, locs, urls_with_errors = [], [], []
     skips = 0
+    webpages = Webpage.fetch_many([
+        record["url"] for record in sample
+        if ".pdf" not in record["url"] and record["title"]
+    ])
+    webpages = {webpage.url: webpage for webpage in webpages}
     for record in sample:
         try:
             start_time = time.time()
-            webpage = Webpage(record["url"])
             expected_title = record["title"]
             if ".pdf" in record["url"] or expected_title == "":
                 skips += 1
                 continue
-            content = Webpage(record["url"]).content
+            content = webpages[record["url"]].content
             standardized_content = slice_text(
                 standardization.standardize(content, "text"))
             loc = standardization.find(expected_title, standardized_content,
@@ -272,12 +309,14 @@ if __name__ == '__main__':
         if sys.argv[1] in methods:
             file_name = "clean_100_citations.csv"
             debug("Gathering points from {0}...".format(file_name))
-            table = Table(assets.DATA_PATH + "/{0}".format(file_name))
             num_points = default_num_points[sys.argv[1]]
             if len(sys.argv) > 2 and sys.argv[2].isnumeric():
                 num_points = int(sys.argv[2])
-            random_records = random.sample(table.records, num_points)
-            new_table = Table(fields=table.fields)
+            # Sample while streaming, so that large files are never loaded
+            random_records = sample(
+                mapped.stream(assets.DATA_PATH + "/{0}".format(file_name)),
+                num_points)
+            new_table = Table(fields=random_records[0].fields)
             new_table.extend(random_records)
             new_table = new_table.query(contains("title"))
             new_table = standardization.standardize(new_table, 'table')
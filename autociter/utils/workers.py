@@ -0,0 +1,192 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a pool of worker processes for CPU-bound tasks."""
+import multiprocessing
+import queue
+import threading
+
+from autociter.utils.decorators import TimeoutException
+
+# Forking a multithreaded process is unsafe, so start workers from a server
+if "forkserver" in multiprocessing.get_all_start_methods():
+    CONTEXT = multiprocessing.get_context("forkserver")
+else:
+    CONTEXT = multiprocessing.get_context("spawn")
+
+
+def serve(function, connection):
+    """Apply function to arguments received over a connection until it closes."""
+    while True:
+        try:
+            args = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = (True, function(*args))
+        except Exception as error:  #pylint: disable=broad-except
+            result = (False, error)
+        try:
+            connection.send(result)
+        except Exception as error:  #pylint: disable=broad-except
+            # The result or exception could not be pickled
+            connection.send((False, RuntimeError(repr(error))))
+
+
+class Worker:
+    """A process that applies a function to the arguments it is sent."""
+
+    def __init__(self, function):
+        self.connection, child_connection = CONTEXT.Pipe()
+        self.process = CONTEXT.Process(
+            target=serve, args=(function, child_connection), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def kill(self):
+        """Terminate the process immediately."""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        """Ask the process to exit once it is idle."""
+        self.connection.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+
+class WorkerPool:
+    """Applies a function in separate processes, so it does not hold the GIL.
+
+    Tasks wait for an idle worker, and at most max_pending tasks may wait at
+    once; further callers block until there is room. A task that runs past its
+    timeout has its worker killed and replaced, so a stuck task cannot leak a
+    process.
+
+    >>> pool = WorkerPool(parse, num_workers=4, timeout=10)
+    >>> pool.apply(data)
+
+    Arguments:
+        function: A picklable (module-level) function.
+        num_workers: The number of worker processes.
+        max_pending: The number of tasks that may wait for a worker.
+        timeout: The default number of seconds a task may run.
+    """
+
+    def __init__(self, function, num_workers=None, max_pending=None,
+                 timeout=None):
+        self.function = function
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        if max_pending is None:
+            max_pending = 2 * self.num_workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(self.num_workers + max_pending)
+        self.idle = queue.LifoQueue()
+        self.workers = set()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def apply(self, *args, timeout=None, deadline=None):
+        """Apply the pool's function to args in a worker and return the result.
+
+        Exceptions raised by the function are re-raised here.
+
+        Arguments:
+            *args: Picklable arguments for the function.
+            timeout: Seconds the task may run (default: the pool's timeout).
+            deadline: A Deadline that bounds both waiting and running.
+
+        Raises:
+            TimeoutException: if the task waited or ran for too long.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if deadline:
+            timeout = deadline.timeout(timeout)
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutException("Timed out waiting for a worker")
+        try:
+            worker = self.acquire(deadline)
+            try:
+                worker.connection.send(args)
+                if deadline:
+                    timeout = deadline.timeout(timeout)
+                if not worker.connection.poll(timeout):
+                    self.discard(worker)
+                    worker = None
+                    raise TimeoutException(
+                        "Task timed out after {0} seconds".format(timeout))
+                success, result = worker.connection.recv()
+            except (EOFError, OSError):
+                if worker:
+                    self.discard(worker)
+                    worker = None
+                raise RuntimeError("Worker process died")
+            finally:
+                if worker:
+                    self.release(worker)
+        finally:
+            self.slots.release()
+        if not success:
+            raise result
+        return result
+
+    def acquire(self, deadline=None):
+        """Return an idle worker, starting a new one if there is capacity."""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Cannot apply tasks after close.")
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                if len(self.workers) < self.num_workers:
+                    worker = Worker(self.function)
+                    self.workers.add(worker)
+                    return worker
+        try:
+            return self.idle.get(timeout=deadline.timeout() if deadline else None)
+        except queue.Empty:
+            raise TimeoutException("Timed out waiting for a worker")
+
+    def release(self, worker):
+        """Return a worker to the idle queue."""
+        with self.lock:
+            if self.closed:
+                self.workers.discard(worker)
+                worker.close()
+                return
+        self.idle.put(worker)
+
+    def discard(self, worker):
+        """Kill a worker and replace it with a fresh one."""
+        worker.kill()
+        replacement = Worker(self.function)
+        with self.lock:
+            self.workers.discard(worker)
+            if self.closed:
+                replacement.close()
+                return
+            self.workers.add(replacement)
+        # The replacement wakes any caller that is waiting for an idle worker
+        self.idle.put(replacement)
+
+    def close(self):
+        """Stop every worker."""
+        with self.lock:
+            self.closed = True
+            workers, self.workers = self.workers, set()
+        for worker in workers:
+            worker.close()
@@ -0,0 +1,241 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a persistent on-disk cache for downloaded documents."""
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import fcntl
+except ImportError:  # fcntl is unavailable on Windows
+    fcntl = None
+
+ASSETS_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../../assets'
+CACHE_PATH = ASSETS_PATH + '/cache/http'
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Return a canonical form of a URL so that equivalent URLs share entries.
+
+    The scheme and host are lowercased, default ports and fragments are
+    removed, and query parameters are sorted.
+
+    >>> normalize_url("HTTP://Example.com:80/a?b=2&a=1#top")
+    'http://example.com/a?a=1&b=2'
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host += ":" + str(parts.port)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class DiskCache:
+    """A size-bounded cache of documents stored on disk.
+
+    Entries are compressed and keyed by the hash of their normalized URL, so
+    the cache can be shared by every process that uses the same directory.
+    Writes are atomic, expired entries are ignored, and the least recently used
+    entries are evicted once the cache grows past its byte budget.
+
+    Arguments:
+        directory: The directory where entries are stored.
+        max_bytes: The byte budget for the entire cache.
+        ttl: Seconds until an entry expires.
+        max_entry_bytes: Documents larger than this are not cached.
+    """
+
+    HEADER = struct.Struct("<4sd")
+    MAGIC = b"ACC1"
+    SUFFIX = ".z"
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self,
+                 directory=CACHE_PATH,
+                 max_bytes=1024**3,
+                 ttl=7 * 24 * 60 * 60,
+                 max_entry_bytes=64 * 1024**2):
+        self.directory = directory
+        self.max_bytes, self.ttl = max_bytes, ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.lock = threading.Lock()
+        # An estimate of the cache size; other processes may also write to it
+        self.estimated_size = None
+
+    def path(self, url):
+        """Return the path of the file that stores the entry for a URL."""
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + self.SUFFIX)
+
+    def get(self, url):
+        """Return the cached document for a URL, or None if there is none."""
+        file = io.BytesIO()
+        if not self.get_file(url, file):
+            return None
+        return file.getvalue()
+
+    def get_file(self, url, file):
+        """Write the cached document for a URL into a file object.
+
+        The document is decompressed in chunks, so large documents are never
+        held in memory at once.
+
+        Returns:
+            True if the document was found, otherwise False.
+        """
+        path = self.path(url)
+        start = file.tell()
+        try:
+            with open(path, "rb") as entry:
+                magic, stored_at = self.HEADER.unpack(
+                    entry.read(self.HEADER.size))
+                if magic != self.MAGIC:
+                    return False
+                if time.time() - stored_at > self.ttl:
+                    self.remove(path)
+                    return False
+                decompressor = zlib.decompressobj()
+                for chunk in iter(lambda: entry.read(self.CHUNK_SIZE), b""):
+                    file.write(decompressor.decompress(chunk))
+                file.write(decompressor.flush())
+                if not decompressor.eof:
+                    raise zlib.error("Truncated cache entry")
+            # Modification times double as recency information for eviction
+            os.utime(path)
+        except (OSError, struct.error, zlib.error):
+            file.seek(start)
+            file.truncate()
+            return False
+        return True
+
+    def put(self, url, data):
+        """Store a document for a URL.
+
+        Arguments:
+            url: The URL of the document.
+            data: The document as bytes.
+        """
+        self.put_file(url, io.BytesIO(data))
+
+    def put_file(self, url, file):
+        """Store the rest of a file object as the document for a URL.
+
+        The file is compressed in chunks and is left positioned at its end.
+        """
+        start = file.tell()
+        if file.seek(0, io.SEEK_END) - start > self.max_entry_bytes:
+            return
+        file.seek(start)
+        path = self.path(url)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as entry:
+                entry.write(self.HEADER.pack(self.MAGIC, time.time()))
+                compressor = zlib.compressobj()
+                for chunk in iter(lambda: file.read(self.CHUNK_SIZE), b""):
+                    entry.write(compressor.compress(chunk))
+                entry.write(compressor.flush())
+                size = entry.tell()
+            os.replace(temp_path, path)
+        except OSError:
+            self.remove(temp_path)
+            return
+        with self.lock:
+            if self.estimated_size is None:
+                self.estimated_size = self.size
+            self.estimated_size += size
+            over_budget = self.estimated_size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def entries(self):
+        """Return a list of (modification time, size, path) for every entry."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @property
+    def size(self):
+        """The number of bytes used by the cache."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache is under budget.
+
+        The cache is trimmed to 90% of its budget so that eviction does not run
+        after every write. Only one process evicts at a time.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            if fcntl:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # Another process is already evicting entries
+                    return
+            entries = sorted(self.entries())
+            size = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            for _, entry_size, path in entries:
+                if size <= target:
+                    break
+                if self.remove(path):
+                    size -= entry_size
+        with self.lock:
+            self.estimated_size = size
+
+    def clear(self):
+        """Remove every entry."""
+        for _, _, path in self.entries():
+            self.remove(path)
+        with self.lock:
+            self.estimated_size = 0
+
+    @staticmethod
+    def remove(path):
+        """Remove a file, returning whether it was removed."""
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+DEFAULT_CACHE = DiskCache()
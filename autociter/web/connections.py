@@ -0,0 +1,235 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define objects for reusing HTTP connections between requests."""
+import http.client
+import socket
+import threading
+from urllib import error
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_TIMEOUT = 15
+MAX_REDIRECTS = 10
+CHUNK_SIZE = 64 * 1024
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Errors that indicate a pooled connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (http.client.BadStatusLine,
+                           http.client.CannotSendRequest, ConnectionResetError,
+                           BrokenPipeError)
+
+
+class ConnectionPool:
+    """Keeps idle keep-alive connections so that later requests can reuse them.
+
+    Connections are grouped by scheme and host. A connection is only returned
+    to the pool once its response has been read completely.
+
+    Arguments:
+        max_idle_per_host: The number of idle connections kept for each host.
+    """
+
+    def __init__(self, max_idle_per_host=8):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def urlopen(self, url, headers=None, timeout=DEFAULT_TIMEOUT, deadline=None):
+        """Send a GET request and return the response, following redirects.
+
+        Like urllib.request.urlopen, an HTTPError is raised for error statuses
+        and a URLError is raised if the server cannot be reached.
+
+        Arguments:
+            url: The URL to request.
+            headers: A dictionary of additional request headers.
+            timeout: Seconds to wait on any single socket operation.
+            deadline: A Deadline that bounds the whole request (optional).
+
+        Returns:
+            A Response object.
+        """
+        headers = headers or {}
+        for _ in range(MAX_REDIRECTS + 1):
+            if deadline:
+                response = self.request(url, headers, deadline.timeout(timeout))
+            else:
+                response = self.request(url, headers, timeout)
+            location = response.headers.get("Location")
+            if response.status in REDIRECT_CODES and location:
+                response.read()
+                response.close()
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                response.close()
+                raise error.HTTPError(url, response.status, response.reason,
+                                      response.headers, None)
+            return response
+        raise error.URLError("Too many redirects: " + url)
+
+    def request(self, url, headers, timeout):
+        """Send a single GET request without following redirects."""
+        parts = urlsplit(url)
+        scheme, host = parts.scheme.lower(), parts.netloc
+        if scheme not in ("http", "https"):
+            raise error.URLError("unknown url type: " + url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        while True:
+            connection, reused = self.acquire(scheme, host, timeout)
+            try:
+                connection.request("GET", path, headers=headers)
+                # Keep the socket, since the connection forgets it when the
+                # server asks to close the connection after this response.
+                sock = connection.sock
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS as err:
+                connection.close()
+                # A pooled connection may have gone stale, so retry once with
+                # a fresh connection before giving up.
+                if reused:
+                    continue
+                raise error.URLError(err)
+            except OSError as err:
+                connection.close()
+                raise error.URLError(err)
+            return Response(self, (scheme, host), connection, sock, response,
+                            url)
+
+    def acquire(self, scheme, host, timeout):
+        """Return an idle connection to a host, or a new one if none exist.
+
+        Returns:
+            A tuple containing the connection and whether it was reused.
+        """
+        with self.lock:
+            connections = self.idle.get((scheme, host))
+            connection = connections.pop() if connections else None
+        if connection is None:
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(host, timeout=timeout)
+            else:
+                connection = http.client.HTTPConnection(host, timeout=timeout)
+            return connection, False
+        connection.timeout = timeout
+        if connection.sock:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def release(self, key, connection):
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        """Close every idle connection."""
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class Response:
+    """The response to a request sent through a ConnectionPool.
+
+    Responses should be closed (or used as context managers) so that their
+    connection can be reused.
+    """
+
+    def __init__(self, pool, key, connection, sock, response, url):  #pylint: disable=too-many-arguments
+        self.pool, self.key = pool, key
+        self.connection, self.sock = connection, sock
+        self.response, self.url = response, url
+
+    @property
+    def status(self):
+        """The HTTP status code."""
+        return self.response.status
+
+    @property
+    def reason(self):
+        """The HTTP reason phrase."""
+        return self.response.reason
+
+    @property
+    def headers(self):
+        """The HTTP response headers."""
+        return self.response.headers
+
+    def read(self, amt=None, deadline=None):
+        """Read and return up to amt bytes of the body (default: all).
+
+        If a deadline is given, the body is read in chunks and each socket read
+        waits no longer than the time remaining, so a slow server cannot hold
+        the caller past its deadline.
+        """
+        if deadline is None:
+            return self.response.read(amt)
+        return b"".join(self.stream(deadline, amt))
+
+    def stream(self, deadline=None, amt=None, chunk_size=CHUNK_SIZE):
+        """Yield the body in chunks of at most chunk_size bytes.
+
+        Arguments:
+            deadline: A Deadline that bounds every socket read (optional).
+            amt: The maximum number of bytes to read (default: all).
+            chunk_size: The maximum size of each chunk.
+        """
+        size = 0
+        while amt is None or size < amt:
+            # The socket is closed once the body has been read if the server
+            # asked to close the connection, so stop before touching it.
+            if self.response.isclosed():
+                return
+            if deadline:
+                self.sock.settimeout(deadline.timeout())
+            try:
+                chunk = self.response.read(
+                    chunk_size if amt is None else min(chunk_size, amt - size))
+            except socket.timeout:
+                if deadline:
+                    deadline.check()
+                raise
+            if not chunk:
+                return
+            size += len(chunk)
+            yield chunk
+
+    def close(self):
+        """Release the connection, or close it if the body was not consumed."""
+        if self.connection is None:
+            return
+        if self.response.isclosed() and not self.response.will_close:
+            self.pool.release(self.key, self.connection)
+        else:
+            self.response.close()
+            self.connection.close()
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+DEFAULT_POOL = ConnectionPool()
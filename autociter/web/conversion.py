@@ -0,0 +1,160 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a lightweight, single-pass HTML to markdown converter."""
+import re
+from html.parser import HTMLParser
+
+# Elements whose contents are never displayed as text
+IGNORED_ELEMENTS = {"head", "script", "style", "template", "svg"}
+# Elements that start a new paragraph
+BLOCK_ELEMENTS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "header", "hr",
+    "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul"
+}
+HEADING_ELEMENTS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"\s+")
+BLANK_LINES = re.compile(r"\n(?:[ \t]*\n)+")
+
+
+class MarkdownConverter(HTMLParser):
+    """Converts HTML into plain text with markdown headings in a single pass.
+
+    The converter emits only what the content extractors rely on: paragraphs
+    separated by blank lines, headings prefixed by "#" characters, and list
+    items. Scripts, styles, images and link targets are dropped. The output is
+    similar to html2text with ignore_images and ignore_links enabled, without
+    the cost of building its full markdown representation.
+
+    The contents of the <title> tag and the og:title property are recorded
+    during the same pass, so the source does not have to be searched again.
+
+    >>> html_to_markdown("<h1>Heading</h1><p>This is a paragraph.</p>")
+    '# Heading\\n\\nThis is a paragraph.'
+    """
+
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.pieces = []
+        self.ignored_depth = 0
+        self.preformatted_depth = 0
+        self.pending_space = False
+        self.title_pieces = None
+        self.title = ""
+        self.open_graph_title = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and self.title_pieces is None and not self.title:
+            self.title_pieces = []
+        elif tag == "meta" and not self.open_graph_title:
+            attributes = dict(attrs)
+            if attributes.get("property") == "og:title":
+                self.open_graph_title = attributes.get("content") or ""
+        if tag in IGNORED_ELEMENTS:
+            self.ignored_depth += 1
+        elif self.ignored_depth:
+            return
+        elif tag in HEADING_ELEMENTS:
+            self.paragraph()
+            self.pieces.append("#" * HEADING_ELEMENTS[tag] + " ")
+        elif tag in BLOCK_ELEMENTS:
+            self.paragraph()
+            if tag == "pre":
+                self.preformatted_depth += 1
+        elif tag == "br":
+            self.newline()
+        elif tag == "li":
+            self.newline()
+            self.pieces.append("  * ")
+        elif tag == "td" or tag == "th":
+            self.pending_space = True
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in IGNORED_ELEMENTS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self.title_pieces is not None:
+            self.title = "".join(self.title_pieces).strip()
+            self.title_pieces = None
+        if tag in IGNORED_ELEMENTS:
+            self.ignored_depth = max(0, self.ignored_depth - 1)
+        elif self.ignored_depth:
+            return
+        elif tag in HEADING_ELEMENTS or tag in BLOCK_ELEMENTS:
+            if tag == "pre":
+                self.preformatted_depth = max(0, self.preformatted_depth - 1)
+            self.paragraph()
+
+    def handle_data(self, data):
+        if self.title_pieces is not None:
+            self.title_pieces.append(data)
+        if self.ignored_depth:
+            return
+        if self.preformatted_depth:
+            self.pieces.append(data)
+            return
+        starts_with_space = data[:1].isspace()
+        text = WHITESPACE.sub(" ", data).strip()
+        if not text:
+            self.pending_space = self.pending_space or starts_with_space
+            return
+        if (self.pending_space or starts_with_space) and self.pieces and \
+                not self.pieces[-1].endswith(("\n", " ")):
+            self.pieces.append(" ")
+        self.pieces.append(text)
+        self.pending_space = data[-1:].isspace()
+
+    def paragraph(self):
+        """End the current paragraph."""
+        self.pieces.append("\n\n")
+        self.pending_space = False
+
+    def newline(self):
+        """End the current line."""
+        self.pieces.append("\n")
+        self.pending_space = False
+
+    @property
+    def markdown(self):
+        """The markdown converted so far."""
+        text = "".join(self.pieces)
+        text = BLANK_LINES.sub("\n\n", text)
+        lines = [line.rstrip() for line in text.split("\n")]
+        return "\n".join(lines).strip("\n")
+
+
+def convert(html, deadline=None):
+    """Feed HTML through a MarkdownConverter and return the converter.
+
+    Arguments:
+        html: A string of HTML source code.
+        deadline: A Deadline that is checked between chunks of the source.
+    """
+    converter = MarkdownConverter()
+    for start in range(0, len(html), CHUNK_SIZE):
+        if deadline:
+            deadline.check()
+        converter.feed(html[start:start + CHUNK_SIZE])
+    converter.close()
+    return converter
+
+
+def html_to_markdown(html, deadline=None):
+    """Convert HTML to markdown in one pass over the source."""
+    return convert(html, deadline).markdown
@@ -23,15 +23,40 @@ import html
 class ContentExtractor:  #pylint: disable=too-few-public-methods
     """An object that assists with extracting content from webpage."""
 
-    def __init__(self, webpage):
-        """Construct extractor and standardize markdown."""
-        self.source = standardization.standardize(webpage.source, "html")
-        self.markdown = standardization.standardize(webpage.markdown,
-                                                    "markdown")
+    def __init__(self, webpage, document=None):
+        """Construct extractor and standardize markdown.
+
+        Arguments:
+            webpage: The webpage to extract from.
+            document: An optional StandardizedDocument of the webpage's
+                      markdown, whose cached views are shared with the caller.
+        """
+        self.webpage = webpage
+        if document is None:
+            document = standardization.StandardizedDocument(
+                webpage.markdown, "markdown")
+        self.document = document
+        self._source = None
+
+    @property
+    def markdown(self):
+        """Return the standardized markdown."""
+        return self.document.text
+
+    @property
+    def source(self):
+        """Return the webpage source without script and style elements."""
+        if self._source is None:
+            self._source = standardization.standardize(self.webpage.source,
+                                                       "html")
+        return self._source
 
     @property
     def title(self):
         """Return the title as defined by the <title> tag."""
+        if "title" in self.webpage.cache:
+            # The lite converter records the title while converting
+            return self.webpage.cache["title"]
         open_tag_start = self.source.find("<title")
         if open_tag_start == -1:
             return ""
@@ -41,7 +66,9 @@ class ContentExtractor:  #pylint: disable=too-few-public-methods
 
     @property
     def open_graph_title(self):
-        """Return the title as defined by the <title> tag."""
+        """Return the title as defined by the og:title property."""
+        if "open_graph_title" in self.webpage.cache:
+            return self.webpage.cache["open_graph_title"]
         property_value_start = self.source.find("\"og:title\"")
         if property_value_start == -1:
             return ""
@@ -89,7 +116,7 @@ class TitleFirstContentExtractor(ContentExtractor):
         """Predict title and return its index."""
         cached_title = html.unescape(self.open_graph_title or self.title)
         if cached_title:
-            loc = standardization.find(cached_title, self.markdown, "title", threshold_value=0.5)
+            loc = standardization.find(cached_title, self.document, "title", threshold_value=0.5)
             if loc == (-1, -1):
                 return self.find_title_in_markdown_naive()
             return loc[0]
@@ -100,23 +127,10 @@ class TitleFirstContentExtractor(ContentExtractor):
         ignored_headings = {"", "Search", "News", "Home"}
         considered_heading_sizes = {1, 2, 3, 4}
 
-        def markdown_contains_heading(heading_size, start=0):
-            """Return true if the markdown contains a heading of the given size."""
-            heading_prefix = "#" * heading_size + " "
-            for index in range(start, len(self.markdown)):
-                substring = self.markdown[index:index + len(heading_prefix)]
-                if substring == heading_prefix and self.markdown[index -
-                                                                 1] != "#":
-                    return True
-            return False
-
         def find_heading_in_markdown(heading_size, start=0):
             """Return index of the first heading of the given size."""
-            heading_prefix = "#" * heading_size + " "
-            for index in range(start, len(self.markdown)):
-                substring = self.markdown[index:index + len(heading_prefix)]
-                if substring == heading_prefix and self.markdown[index -
-                                                                 1] != "#":
+            for index in self.document.heading_offsets(heading_size):
+                if index >= start:
                     return index
             return -1
 
@@ -135,9 +149,8 @@ class TitleFirstContentExtractor(ContentExtractor):
 
         for heading_size in considered_heading_sizes:
             current_index = 0
-            while markdown_contains_heading(heading_size, start=current_index):
-                heading_start_index = find_heading_in_markdown(
-                    heading_size, start=current_index)
+            heading_start_index = find_heading_in_markdown(heading_size)
+            while heading_start_index != -1:
                 heading = retrieve_heading_from_markdown(heading_start_index)
                 predicted_title = retrieve_title_from_heading(heading)
                 if predicted_title not in ignored_headings:
@@ -145,4 +158,6 @@ class TitleFirstContentExtractor(ContentExtractor):
                 heading_prefix = "#" * heading_size + " "
                 current_index = heading_start_index + len(heading_prefix) + len(
                     heading)
+                heading_start_index = find_heading_in_markdown(
+                    heading_size, start=current_index)
             return 0
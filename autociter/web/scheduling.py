@@ -0,0 +1,186 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Define a scheduler that politely spreads requests across hosts."""
+import collections
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+
+def host_of(url):
+    """Return the lowercased host name of a URL."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+class HostStatistics:  #pylint: disable=too-few-public-methods
+    """Counters that describe the scheduling of one host's tasks."""
+
+    def __init__(self):
+        self.queued, self.active, self.completed = 0, 0, 0
+        self.total_wait, self.max_wait = 0.0, 0.0
+
+    @property
+    def average_wait(self):
+        """The average number of seconds a task waited before starting."""
+        started = self.active + self.completed
+        return self.total_wait / started if started else 0.0
+
+    def __repr__(self):
+        return ("HostStatistics(queued={0}, active={1}, completed={2}, "
+                "average_wait={3:.3f}, max_wait={4:.3f})").format(
+                    self.queued, self.active, self.completed,
+                    self.average_wait, self.max_wait)
+
+
+class HostScheduler:
+    """Runs tasks on a pool of threads while limiting the load on each host.
+
+    Each task is associated with a URL. At most max_per_host tasks for the same
+    host run at once, and consecutive tasks for a host start at least
+    min_interval seconds apart. Hosts take turns, so a host with a long queue
+    does not starve the others.
+
+    >>> with HostScheduler(concurrency=8, max_per_host=2) as scheduler:
+    ...     futures = [scheduler.submit(url, download, url) for url in urls]
+
+    Arguments:
+        concurrency: The total number of worker threads.
+        max_per_host: The number of tasks that may run at once for each host.
+        min_interval: The minimum number of seconds between the starts of two
+                      tasks for the same host.
+    """
+
+    def __init__(self, concurrency=16, max_per_host=4, min_interval=0.0):
+        self.concurrency = max(1, concurrency)
+        self.max_per_host = max(1, max_per_host)
+        self.min_interval = min_interval
+        self.queues = {}
+        self.rotation = collections.deque()
+        self.next_start = {}
+        self.statistics = collections.defaultdict(HostStatistics)
+        self.condition = threading.Condition()
+        self.workers = []
+        self.closed = False
+
+    def submit(self, url, function, *args, **kwargs):
+        """Schedule function(*args, **kwargs) as a task for the host of url.
+
+        Returns:
+            A concurrent.futures.Future for the result of the task.
+        """
+        host = host_of(url)
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Cannot submit tasks after shutdown.")
+            if host not in self.queues:
+                self.queues[host] = collections.deque()
+                self.rotation.append(host)
+            task = (future, function, args, kwargs, time.time())
+            self.queues[host].append(task)
+            self.statistics[host].queued += 1
+            if len(self.workers) < self.concurrency:
+                worker = threading.Thread(target=self.work, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+        return future
+
+    def map(self, function, urls):
+        """Apply function to every URL and return the results in order.
+
+        Exceptions raised by function are re-raised here.
+        """
+        # Queue every task before workers start taking them, so that hosts
+        # are interleaved from the start
+        with self.condition:
+            futures = [self.submit(url, function, url) for url in urls]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        """Return a dictionary that maps each host to its HostStatistics."""
+        with self.condition:
+            return dict(self.statistics)
+
+    def shutdown(self, wait=True):
+        """Stop accepting tasks and let the workers exit once queues drain."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+    def next_task(self):
+        """Block until some host may start a task, then dequeue that task.
+
+        Returns None once the scheduler is shut down and no work remains. Must
+        be called while holding the condition.
+        """
+        while True:
+            now, earliest = time.time(), None
+            # Only hosts with queued tasks take turns
+            for _ in range(len(self.rotation)):
+                host = self.rotation[0]
+                self.rotation.rotate(-1)
+                if self.statistics[host].active >= self.max_per_host:
+                    continue
+                start = self.next_start.get(host, 0)
+                if start > now:
+                    earliest = start if earliest is None else min(earliest, start)
+                    continue
+                self.next_start[host] = now + self.min_interval
+                queue = self.queues[host]
+                task = queue.popleft()
+                if not queue:
+                    # The host was rotated to the back; submit adds it again
+                    del self.queues[host]
+                    self.rotation.pop()
+                return host, task
+            if self.closed and not self.queues:
+                return None
+            self.condition.wait(None if earliest is None else earliest - now)
+
+    def work(self):
+        """Run tasks until the scheduler is shut down."""
+        while True:
+            with self.condition:
+                scheduled = self.next_task()
+                if scheduled is None:
+                    return
+                host, (future, function, args, kwargs, submitted) = scheduled
+                statistics = self.statistics[host]
+                wait = time.time() - submitted
+                statistics.queued -= 1
+                statistics.active += 1
+                statistics.total_wait += wait
+                statistics.max_wait = max(statistics.max_wait, wait)
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as err:  #pylint: disable=broad-except
+                    future.set_exception(err)
+            with self.condition:
+                statistics.active -= 1
+                statistics.completed += 1
+                self.condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
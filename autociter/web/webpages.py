@@ -14,22 +14,45 @@
 #
 # Author: Balaji Veeramani <bveeramani@berkeley.edu>
 """Define Webpage and WikipediaArticle objects."""
-from urllib import request
-from urllib.request import Request
-
 import html2text
 from fake_useragent import UserAgent
 
-from autociter.utils.decorators import timeout
+from autociter.utils.deadlines import Deadline
+from autociter.web import caching, connections
+from autociter.web import conversion
 from autociter.web.extractors import TitleFirstContentExtractor
+from autociter.web.scheduling import HostScheduler
 
 ua = UserAgent()
 
 class Webpage:
-    """A generic webpage."""
+    """A generic webpage.
+
+    Downloaded source code is stored in DISK_CACHE so that it can be reused
+    across runs. Set DISK_CACHE to None to always download webpages.
+
+    Arguments:
+        url: The URL of the webpage.
+        deadline: A Deadline that bounds downloading and processing the
+                  webpage. By default, every step shares a budget of
+                  DEFAULT_TIMEOUT seconds that starts when the webpage is
+                  first fetched or processed.
+        converter: The HTML to markdown converter, either "html2text" or
+                   "lite". The lite converter is much faster but only keeps
+                   the paragraphs and headings that content extraction uses.
+    """
 
-    def __init__(self, url):
+    DISK_CACHE = caching.DEFAULT_CACHE
+    DEFAULT_TIMEOUT = connections.DEFAULT_TIMEOUT
+    CONVERTER = "html2text"
+    CONVERTERS = ("html2text", "lite")
+
+    def __init__(self, url, deadline=None, converter=None):
         self.url = url
+        self.deadline = deadline
+        self.converter = converter or self.CONVERTER
+        if self.converter not in self.CONVERTERS:
+            raise ValueError("Unknown converter: " + self.converter)
         self.cache = {}
 
     def __repr__(self):
@@ -43,36 +66,115 @@ class Webpage:
             return False
         return self.url == other.url
 
-    @property
-    @timeout(15)
-    def source(self):
-        """Return the source code of a webpage."""
+    @classmethod
+    def fetch_many(cls, urls, concurrency=8, max_per_host=4, scheduler=None):
+        """Download the source code of many webpages concurrently.
+
+        Requests are spread across hosts by a HostScheduler and connections to
+        the same host are reused. Webpages that fail to download remember the
+        error and raise it when their source is accessed. Each download has a
+        deadline of DEFAULT_TIMEOUT seconds unless the webpage has its own.
+
+        Arguments:
+            urls: A collection of URLs or Webpage objects.
+            concurrency: The maximum number of simultaneous requests.
+            max_per_host: The maximum number of simultaneous requests per host.
+            scheduler: A HostScheduler to use instead of a new one. Its
+                       statistics can be inspected after fetching.
+
+        Returns:
+            A list of Webpage objects in the same order as urls.
+        """
+        webpages = [url if isinstance(url, Webpage) else cls(url) for url in urls]
+
+        def fetch(webpage):
+            # Give the download its own deadline, so that the webpage's budget
+            # for processing starts when the webpage is processed, not now
+            try:
+                webpage.fetch(webpage.deadline or Deadline(cls.DEFAULT_TIMEOUT))
+            except Exception as err:  #pylint: disable=broad-except
+                webpage.cache["error"] = err
+
+        owns_scheduler = scheduler is None
+        if owns_scheduler:
+            scheduler = HostScheduler(concurrency, max_per_host)
+        futures = [
+            scheduler.submit(webpage.url, fetch, webpage) for webpage in webpages
+        ]
+        for future in futures:
+            future.result()
+        if owns_scheduler:
+            scheduler.shutdown()
+        return webpages
+
+    def fetch(self, deadline=None):
+        """Download and return the source code of this webpage.
+
+        Arguments:
+            deadline: A Deadline for the download. Defaults to the webpage's
+                      deadline (see budget).
+        """
         if "source" in self.cache:
             return self.cache["source"]
-        headers = ua.random
-        client = request.urlopen(Request(self.url, headers={'User-Agent': headers}))
-        bytecode = client.read()
+        if "error" in self.cache:
+            raise self.cache["error"]
+        deadline = deadline or self.budget()
+        bytecode = self.DISK_CACHE.get(self.url) if self.DISK_CACHE else None
+        if bytecode is None:
+            headers = {"User-Agent": ua.random}
+            with connections.DEFAULT_POOL.urlopen(
+                    self.url, headers=headers, deadline=deadline) as response:
+                bytecode = response.read(deadline=deadline)
+            if self.DISK_CACHE:
+                self.DISK_CACHE.put(self.url, bytecode)
         self.cache["source"] = bytecode.decode("utf-8", "replace")
         return self.cache["source"]
 
+    def budget(self):
+        """Return the deadline for processing this webpage.
+
+        A webpage without a deadline gets one of DEFAULT_TIMEOUT seconds the
+        first time it is asked for, which every later step shares.
+        """
+        if self.deadline is None:
+            self.deadline = Deadline(self.DEFAULT_TIMEOUT)
+        return self.deadline
+
+    @property
+    def source(self):
+        """Return the source code of a webpage."""
+        return self.fetch()
+
     @property
     def markdown(self):
         """Return the text of a webpage in markdown formatting."""
         if "markdown" in self.cache:
             return self.cache["markdown"]
+        source = self.source
+        deadline = self.budget()
+        deadline.check()
+        if self.converter == "lite":
+            converter = conversion.convert(source, deadline)
+            self.cache["title"] = converter.title
+            self.cache["open_graph_title"] = converter.open_graph_title
+            self.cache["markdown"] = converter.markdown
+            return self.cache["markdown"]
         parser = html2text.HTML2Text()
         parser.ignore_images = True
         parser.ignore_links = True
-        self.cache["markdown"] = parser.handle(self.source).rstrip()
+        self.cache["markdown"] = parser.handle(source).rstrip()
         return self.cache["markdown"]
 
     @property
-    @timeout(15)
     def content(self):
         """Return the predicted webpage content."""
         if "content" in self.cache:
             return self.cache["content"]
+        deadline = self.budget()
+        self.fetch(deadline)
+        deadline.check()
         extractor = TitleFirstContentExtractor(webpage=self)
+        deadline.check()
         self.cache["content"] = extractor.content
         return self.cache["content"]
 
@@ -44,10 +44,31 @@ class WikipediaCrawler:  # pylint: disable=too-few-public-methods
             Scraped data if no errors occurred, otherwise an empty list.
         """
         try:
-            return self._scrape(webpage)
+            return self._scrape(self.target(webpage))
         except (error.HTTPError, error.URLError, OSError):
             return []
 
+    def scrape_many(self, webpages, scheduler=None):
+        """Safely scrape many webpages, downloading them concurrently.
+
+        Downloads are fed through a HostScheduler, so that no single host is
+        overloaded while the others sit idle.
+
+        Arguments:
+            webpages: A collection of Webpage objects (or their subclasses).
+            scheduler: An optional HostScheduler used for the downloads.
+
+        Returns:
+            A list containing the scraped data of each webpage.
+        """
+        Webpage.fetch_many([self.target(webpage) for webpage in webpages],
+                           scheduler=scheduler)
+        return [self.scrape(webpage) for webpage in webpages]
+
+    def target(self, webpage):  #pylint: disable=no-self-use
+        """Return the webpage whose source code is scraped."""
+        return webpage
+
     def _scrape(self, webpage):
         """Scrape a webpage.
 
@@ -70,16 +91,13 @@ class WikipediaArticleCrawler(WikipediaCrawler):
         ]
         WikipediaCrawler.__init__(self, extractors)
 
-    def scrape(self, webpage):
-        """Return references found in an article as Reference objects.
+    def target(self, webpage):
+        """Return the edit page of an article, which contains its citations.
 
         Arguments:
             webpage: A WikipediaArticle object (or one of its subclasses)
-
-        Returns:
-            A list of WikipediaCitation objects.
         """
-        return WikipediaCrawler.scrape(self, webpage.edit)
+        return webpage.edit_page
 
 
 class WikipediaArticleListCrawler(WikipediaCrawler):
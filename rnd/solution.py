@@ -37,9 +37,9 @@ def generate_rules(data_table):
     """
     rules = []
     debug("I. Generating rules...")
-    for record in data_table:
+    webpages = Webpage.fetch_many([record["url"] for record in data_table])
+    for record, webpage in zip(data_table, webpages):
         debug("Analyzing {0}".format(record["url"]))
-        webpage = Webpage(record["url"])
         new_rules = analyze(webpage.source, record["title"])
         rules.extend(new_rules)
     debug("")
@@ -57,8 +57,10 @@ def evaluate_rules(rules, data_table):
        A collection of Rule instances
     """
     debug("II. Evaluating rules...")
+    webpages = Webpage.fetch_many([record["url"] for record in data_table])
     source_to_title = {
-        Webpage(record["url"]).source: record["title"] for record in data_table
+        webpage.source: record["title"]
+        for record, webpage in zip(data_table, webpages)
     }
     debug("Calling evaluate()...")
     return evaluate(rules, source_to_title)
@@ -14,12 +14,19 @@
 #
 # Author: Michael Wan <m.wan@berkeley.edu>
 """Test methods defined in autociter.core.pipeline"""
+import shutil
+import tempfile
 import unittest
 import random
 
+from PyPDF2 import PdfFileReader
+
+from test import server
 import assets
 import autociter.core.pipeline as pipeline
 import autociter.utils.debugging as debug
+from autociter.web.caching import DiskCache
+from autociter.web.webpages import Webpage
 
 
 # pylint: disable=missing-docstring
@@ -28,9 +35,16 @@ class PipelineTest(unittest.TestCase):
         self.mock_data_dir = assets.MOCK_DATA_PATH + "/pipeline/"
         self.originalDebugValue = debug.DEBUGGING_ENABLED
         debug.DEBUGGING_ENABLED = False
+        # Webpages and pdfs are cached in a temporary directory, so every
+        # test fetches them
+        self.original_cache = Webpage.DISK_CACHE
+        self.cache_directory = tempfile.mkdtemp()
+        Webpage.DISK_CACHE = DiskCache(self.cache_directory)
 
     def tearDown(self):
         debug.DEBUGGING_ENABLED = self.originalDebugValue
+        Webpage.DISK_CACHE = self.original_cache
+        shutil.rmtree(self.cache_directory)
 
     def test_get_text_from_url_pdf(self):
         with open(self.mock_data_dir + "pdf_url_list", "r") as datafile:
@@ -40,6 +54,34 @@ class PipelineTest(unittest.TestCase):
                 bools.append(pipeline.get_text_from_pdf(url) != "")
             self.assertEqual(all(bools), True)
 
+    def test_get_text_from_pdf_local(self):
+        server.start()
+        try:
+            text = pipeline.get_text_from_pdf(server.ADDRESS + "/sample.pdf")
+        finally:
+            server.end()
+        self.assertEqual(text, "Autociter first pageAutociter last page")
+
+    def test_get_text_from_pdf_too_large(self):
+        server.start()
+        try:
+            text = pipeline.get_text_from_pdf(
+                server.ADDRESS + "/sample.pdf", max_bytes=100)
+        finally:
+            server.end()
+        self.assertEqual(text, "")
+
+    def test_get_pdf_page(self):
+        with open(assets.WEBPAGES_PATH + "/sample.pdf", "rb") as file:
+            reader = PdfFileReader(file, strict=False)
+            for number in range(reader.getNumPages()):
+                page = pipeline.get_pdf_page(reader, number)
+                self.assertEqual(page.extractText(),
+                                 reader.getPage(number).extractText())
+                self.assertIn("/Resources", page)
+            with self.assertRaises(IndexError):
+                pipeline.get_pdf_page(reader, 3)
+
     def test_get_text_from_url_regular(self):
         with open(self.mock_data_dir + "regular_url_list", "r") as datafile:
             urls = datafile.read().split('\n')
@@ -81,3 +123,9 @@ class PipelineTest(unittest.TestCase):
             bools.append(unvectorized == word)
             bools.append(unhashed == vectorized)
         self.assertEqual(all(bools), True)
+
+    def test_one_hot_foreign_characters(self):
+        text = "Ærø – Đặng\tok"
+        vectorized = pipeline.one_hot(text)
+        self.assertEqual(len(vectorized), len(text))
+        self.assertEqual(pipeline.unvectorize_text(vectorized), "Aro - Dang ok")
@@ -0,0 +1,80 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Test methods defined in autociter.data.automata"""
+import random
+import unittest
+
+from autociter.data import automata
+
+
+# pylint: disable=missing-docstring
+class AhoCorasickTest(unittest.TestCase):
+
+    def test_find_all(self):
+        automaton = automata.AhoCorasick(["he", "she", "hers", "his"])
+        self.assertEqual(
+            list(automaton.find_all("ushers and his")),
+            [(1, 4, 1), (2, 4, 0), (2, 6, 2), (11, 14, 3)])
+
+    def test_find_all_matches_str_find(self):
+        random.seed(0)
+        for _ in range(300):
+            patterns = [
+                "".join(random.choice("ab ") for _ in range(random.randint(1, 5)))
+                for _ in range(random.randint(1, 6))
+            ]
+            text = "".join(random.choice("ab c") for _ in range(random.randint(0, 40)))
+            expected = sorted(
+                (k, k + len(pattern), i)
+                for i, pattern in enumerate(patterns)
+                for k in range(len(text)) if text.startswith(pattern, k))
+            for dense in (True, False):
+                automaton = automata.AhoCorasick(patterns, dense=dense)
+                self.assertEqual(sorted(automaton.find_all(text)), expected)
+
+    def test_find_first(self):
+        random.seed(1)
+        for _ in range(300):
+            patterns = [
+                "".join(random.choice("ab ") for _ in range(random.randint(0, 5)))
+                for _ in range(random.randint(1, 6))
+            ]
+            text = "".join(random.choice("ab c") for _ in range(random.randint(0, 40)))
+            start = min(random.randint(0, 5), len(text))
+            expected = []
+            for pattern in patterns:
+                index = text.find(pattern, start)
+                expected.append((index, index + len(pattern)) if index != -1 else (-1, -1))
+            self.assertEqual(
+                automata.AhoCorasick(patterns).find_first(text, start), expected)
+
+    def test_many_patterns_stay_sparse(self):
+        patterns = ["a" * length + "b" for length in range(1, 300)]
+        automaton = automata.AhoCorasick(patterns)
+        self.assertFalse(automaton.dense)
+        self.assertEqual(sum(map(len, automaton.transitions)),
+                         len(automaton.transitions) - 1)
+        self.assertEqual(automaton.find_first("aaab"),
+                         [(2, 4), (1, 4), (0, 4)] + [(-1, -1)] * 296)
+
+    def test_duplicate_patterns(self):
+        automaton = automata.AhoCorasick(["wan", "michael", "wan"])
+        self.assertEqual(automaton.find_first("michael wan"),
+                         [(8, 11), (0, 7), (8, 11)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test methods of the SQLiteTable object defined in data.databases."""
+import filecmp
+import os
+import unittest
+
+from autociter.data import queries
+from autociter.data.databases import SQLiteTable
+from autociter.data.storage import Record, Table
+import assets
+
+
+# pylint: disable=missing-docstring
+class SQLiteTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = assets.MOCK_DATA_PATH + "/mock_table_data.csv"
+        self.fields = ["id", "first", "last", "department"]
+
+    def tearDown(self):
+        for filename in ["temp_test_data.db", "temp_test_data.csv"]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_load(self):
+        table = SQLiteTable(":memory:", fields=self.fields).load(self.filename)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table, Table(self.filename))
+
+    def test_save(self):
+        table = SQLiteTable(":memory:", fields=self.fields).load(self.filename)
+        table.save("temp_test_data.csv")
+        self.assertTrue(filecmp.cmp(self.filename, "temp_test_data.csv"))
+
+    def test_find(self):
+        table = SQLiteTable(":memory:", fields=self.fields).load(self.filename)
+        record = Record(self.fields, ["1738", "Michael", "Wan", "EECS"])
+        self.assertEqual(table.find("department", "EECS"), record)
+        self.assertEqual(table.find("department", "Chemistry"), None)
+        self.assertIn(record, table)
+        self.assertNotIn(Record(self.fields, ["1738", "Michael", "Wan", ""]),
+                         table)
+
+    def test_query(self):
+        table = SQLiteTable(":memory:", fields=self.fields).load(self.filename)
+        table.add(Record(self.fields, ["2001", "", "Lovelace", "EECS"]))
+        expected = Table(self.filename)
+        expected.add(Record(self.fields, ["2001", "", "Lovelace", "EECS"]))
+        for query in [
+                queries.contains("first", "last"),
+                queries.contains("salary"),
+                queries.equals("department", "Mathematics"),
+                queries.negate(queries.startswith("last", "W")),
+                queries.both(
+                    queries.contains("id"),
+                    queries.either(queries.equals("department", "EECS"),
+                                   queries.startswith("first", "G"))),
+                lambda record: record["id"] > "2000"
+        ]:
+            self.assertEqual(table.query(query).records,
+                             expected.query(query).records)
+
+    def test_create_index(self):
+        table = SQLiteTable(":memory:", fields=self.fields).load(self.filename)
+        table.create_index("department")
+        plan = table.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM records WHERE department = ?",
+            ("EECS",)).fetchall()
+        self.assertIn("INDEX", str(plan))
+        self.assertEqual(table.find("department", "EECS")["last"], "Wan")
+        with self.assertRaises(ValueError):
+            table.create_index("salary")
+
+    def test_keys(self):
+        table = SQLiteTable(":memory:", fields=["flavor", "rating"])
+        record1 = Record(table.fields, ["vanilla", 7.8])
+        record2 = Record(table.fields, ["chocolate", 5.3])
+        table.add(record1, "vanilla")
+        table.add(record2)
+        self.assertEqual(table["vanilla"], record1)
+        self.assertEqual(table[1], record2)
+        with self.assertRaises(KeyError):
+            table[0]  # pylint: disable=pointless-statement
+        with self.assertRaises(ValueError):
+            table.add(record2, "vanilla")
+        with self.assertRaises(TypeError):
+            table.add(Record(table.fields, ["mint", [1, 2]]))
+
+    def test_batches(self):
+        table = SQLiteTable(":memory:", fields=["number"])
+        table.BATCH_SIZE = 3
+        for i in range(7):
+            table.add(Record(table.fields, [str(i)]))
+        self.assertEqual(len(table.pending), 1)
+        self.assertEqual(len(table), 7)
+        self.assertEqual([record["number"] for record in table],
+                         [str(i) for i in range(7)])
+
+    def test_keyed_batches(self):
+        table = SQLiteTable(":memory:", fields=["number"])
+        table.BATCH_SIZE = 4
+        for i in range(3):
+            table.add(Record(table.fields, [str(i)]), "key" + str(i))
+        self.assertEqual(len(table.pending), 3)
+        table.add(Record(table.fields, ["3"]))
+        self.assertEqual(len(table.pending), 0)
+        table.add(Record(table.fields, ["4"]), "key4")
+        self.assertEqual(len(table.pending), 1)
+        with self.assertRaises(ValueError):
+            table.add(Record(table.fields, ["5"]), "key4")
+        with self.assertRaises(ValueError):
+            table.add(Record(table.fields, ["5"]), 3)
+        table.add(Record(table.fields, ["5"]), 0)
+        self.assertEqual(table["key4"]["number"], "4")
+        self.assertEqual(table[3]["number"], "3")
+        self.assertEqual(table[0]["number"], "5")
+
+    def test_reopen(self):
+        with SQLiteTable("temp_test_data.db", fields=self.fields) as table:
+            table.load(self.filename)
+        with SQLiteTable("temp_test_data.db") as table:
+            self.assertEqual(table.fields, self.fields)
+            self.assertEqual(table, Table(self.filename))
+        with self.assertRaises(ValueError):
+            SQLiteTable("temp_test_data.db", fields=["id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Test methods defined in autociter.data.datasets."""
+import json
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+from autociter.data import datasets
+
+
+# pylint: disable=missing-docstring
+class DatasetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = "temp_test_dataset"
+        self.articles = [
+            ("http://a.com", {"title": "A"}, [0, 1, 2, 3], {"title": (1, 3)}),
+            ("http://b.com", {"title": "B"}, [3, 2, 1, 0],
+             {"author": [(0, 1), (2, 4)]}),
+            ("http://c.com", {"title": "C"}, [4, 4, 4, 4], {}),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        if os.path.exists("temp_test_data.dat"):
+            os.remove("temp_test_data.dat")
+
+    def write(self, articles, append=False):
+        with datasets.DatasetWriter(self.path, 5, append=append,
+                                    shard_size=2) as writer:
+            for article in articles:
+                writer.add(*article)
+
+    def test_round_trip(self):
+        self.write(self.articles)
+        dataset = datasets.Dataset(self.path)
+        self.assertEqual(len(dataset), 3)
+        self.assertEqual(len(dataset.shards), 2)
+        self.assertEqual(dataset.urls, [url for url, _, _, _ in self.articles])
+        self.assertEqual(dataset[0]["locs"], {"title": [1, 3]})
+        self.assertEqual(dataset[1]["locs"], {"author": [[0, 1], [2, 4]]})
+        self.assertEqual(dataset[2]["citation_info"], {"title": "C"})
+        self.assertEqual(dataset[2]["indices"].tolist(), [4, 4, 4, 4])
+        one_hot = dataset.one_hot([2, 0])
+        self.assertEqual(one_hot.shape, (2, 4, 5))
+        self.assertEqual(one_hot.dtype, np.uint8)
+        self.assertEqual(one_hot.argmax(axis=2).tolist(),
+                         [[4, 4, 4, 4], [0, 1, 2, 3]])
+        self.assertTrue((one_hot.sum(axis=2) == 1).all())
+
+    def test_append(self):
+        self.write(self.articles[:2])
+        self.write([("http://a.com", {"title": "A2"}, [1, 1, 1, 1], {})] +
+                   self.articles[2:], append=True)
+        dataset = datasets.Dataset(self.path)
+        self.assertEqual(dataset.urls, ["http://b.com", "http://a.com",
+                                        "http://c.com"])
+        self.assertEqual(dataset[1]["citation_info"], {"title": "A2"})
+        self.assertEqual(dataset.indices().tolist(),
+                         [[3, 2, 1, 0], [1, 1, 1, 1], [4, 4, 4, 4]])
+        self.write(self.articles[2:])
+        self.assertEqual(len(datasets.Dataset(self.path)), 1)
+        self.assertEqual(len(os.listdir(self.path)), 4)
+
+    def test_failed_write(self):
+        self.write(self.articles)
+        with self.assertRaises(ValueError):
+            with datasets.DatasetWriter(self.path, 5, shard_size=1) as writer:
+                writer.add("http://new.com", {}, [0, 0, 0, 0], {})
+                writer.add("http://bad.com", {}, [0, 0], {})
+        dataset = datasets.Dataset(self.path)
+        self.assertEqual(dataset.urls, [url for url, _, _, _ in self.articles])
+        self.assertEqual(dataset.indices([2]).tolist(), [[4, 4, 4, 4]])
+        self.assertEqual(len(os.listdir(self.path)), 7)
+
+    def test_invalid_indices(self):
+        with datasets.DatasetWriter(self.path, 5) as writer:
+            writer.add("http://a.com", {}, [0, 1], {})
+            with self.assertRaises(ValueError):
+                writer.add("http://b.com", {}, [0, 1, 2], {})
+            with self.assertRaises(ValueError):
+                writer.add("http://b.com", {}, [0, 5], {})
+
+    def test_migrate(self):
+        saved_dict = {
+            url: dict(citation_info, article_one_hot=str(indices),
+                      locs=json.loads(json.dumps(locs)))
+            for url, citation_info, indices, locs in self.articles
+        }
+        with open("temp_test_data.dat", "w") as out:
+            json.dump(saved_dict, out, sort_keys=True, indent=4)
+        datasets.migrate("temp_test_data.dat", self.path, 5)
+        dataset = datasets.Dataset(self.path)
+        self.assertEqual(len(dataset), 3)
+        self.assertEqual(dataset[1]["citation_info"], {
+            "title": "B",
+            "url": "http://b.com"
+        })
+        self.assertEqual(dataset[1]["locs"], {"author": [[0, 1], [2, 4]]})
+        self.assertEqual(dataset.indices([0]).tolist(), [[0, 1, 2, 3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
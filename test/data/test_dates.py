@@ -0,0 +1,73 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Test methods defined in autociter.data.dates"""
+import datetime
+import unittest
+
+from autociter.data import dates, standardization
+
+SETTINGS = {
+    'STRICT_PARSING': True,
+    'RELATIVE_BASE': datetime.datetime(1000, 1, 1, 0, 0)
+}
+
+
+# pylint: disable=missing-docstring
+class DatesTest(unittest.TestCase):
+
+    def test_candidate_windows(self):
+        text = "Hello\nPublished April 13 2000\nMay I help\nUpdated 2018 11 12"
+        windows = dates.candidate_windows(text)
+        self.assertEqual([text[s:e] for s, e in windows],
+                         ["Published April 13 2000", "Updated 2018 11 12"])
+
+    def test_candidate_windows_iso(self):
+        text = "Posted 2018-11-12T10:00:00Z"
+        self.assertEqual(dates.candidate_windows(text), [(0, len(text))])
+
+    def test_no_candidates(self):
+        self.assertEqual(dates.candidate_windows("No dates\nin 2018 text"), [])
+
+    def test_iter_dates(self):
+        text = ("Intro\nHow many dates are in this sentence October 6th 2000, "
+                "January 1st 1999\nThe end")
+        found = list(dates.iter_dates(text, settings=SETTINGS))
+        self.assertEqual(found, [
+            ("October 6th 2000", datetime.datetime(2000, 10, 6)),
+            ("January 1st 1999", datetime.datetime(1999, 1, 1)),
+        ])
+
+    def test_candidate_windows_other_languages(self):
+        text = "Intro\n2018年11月12日に公開\nLe 12 nov. 2018\nMarket 12"
+        windows = dates.candidate_windows(text)
+        self.assertEqual([text[s:e] for s, e in windows],
+                         ["2018年11月12日に公開", "Le 12 nov. 2018"])
+
+    def test_find_date_other_languages(self):
+        cases = [
+            ("Le rapport publie le 12 novembre 2018 par le ministere.",
+             "11/12/18", (18, 37)),
+            ("Publicado el 5 de marzo de 2017 en Madrid.", "03/05/17",
+             (13, 34)),
+            ("Updated 12 11 2018 at noon", "11/12/18", (8, 18)),
+        ]
+        for text, date, location in cases:
+            self.assertEqual(standardization.find(date, text, "date"),
+                             location)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test methods defined in autociter.data.mapped."""
+import filecmp
+import os
+import unittest
+
+from autociter.data import mapped, queries
+from autociter.data.storage import Record, Table
+import assets
+
+
+# pylint: disable=missing-docstring
+class MappedTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = assets.MOCK_DATA_PATH + "/mock_table_data.csv"
+
+    def tearDown(self):
+        for filename in ["temp_test_data.tbl", "temp_test_data.csv"]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_round_trip(self):
+        mapped.to_binary(self.filename, "temp_test_data.tbl")
+        mapped.to_tsv("temp_test_data.tbl", "temp_test_data.csv")
+        self.assertTrue(filecmp.cmp(self.filename, "temp_test_data.csv"))
+
+    def test_to_binary_converts_every_record(self):
+        # Table.load stops at one million records by default
+        with open("temp_test_data.csv", "w") as out:
+            out.write("number\n" + "\n".join(map(str, range(1000001))))
+        mapped.to_binary("temp_test_data.csv", "temp_test_data.tbl")
+        with mapped.MappedTable("temp_test_data.tbl") as mapped_table:
+            self.assertEqual(len(mapped_table), 1000001)
+            self.assertEqual(mapped_table[1000000]["number"], "1000000")
+
+    def test_open(self):
+        table = Table(self.filename)
+        mapped.save(table, "temp_test_data.tbl")
+        with mapped.MappedTable("temp_test_data.tbl") as mapped_table:
+            self.assertEqual(len(mapped_table), 4)
+            self.assertEqual(mapped_table.fields, table.fields)
+            self.assertEqual(mapped_table, table)
+            self.assertEqual(mapped_table[2], table[2])
+            self.assertEqual(mapped_table.find("department", "EECS"), table[2])
+
+    def test_unicode_and_plain_columns(self):
+        table = Table(fields=["title", "publisher"])
+        table.ENCODING_SIZE = 1
+        table.ENCODING_RATIO = 0
+        for title in ["Café", "", "Đặng", "naïve"]:
+            table.add(Record(table.fields, [title, "Zeitung"]))
+        mapped.save(table, "temp_test_data.tbl")
+        with mapped.MappedTable("temp_test_data.tbl") as mapped_table:
+            self.assertEqual(mapped_table.records, table.records)
+            for query in [
+                    queries.contains("title"),
+                    queries.equals("title", "Đặng"),
+                    queries.negate(queries.startswith("publisher", "Z"))
+            ]:
+                self.assertEqual(mapped_table.query(query).records,
+                                 table.query(query).records)
+
+    def test_stream(self):
+        mapped.to_binary(self.filename, "temp_test_data.tbl")
+        self.assertEqual(list(mapped.stream("temp_test_data.tbl")),
+                         list(mapped.stream(self.filename)))
+
+    def test_read_only(self):
+        table = Table(self.filename)
+        mapped.save(table, "temp_test_data.tbl")
+        with mapped.MappedTable("temp_test_data.tbl") as mapped_table:
+            with self.assertRaises(TypeError):
+                mapped_table.add(table[0])
+
+    def test_not_mapped(self):
+        with self.assertRaises(ValueError):
+            mapped.MappedTable(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Test methods defined in autociter.data.matching"""
+import random
+import unittest
+
+from autociter.data import matching
+
+
+def search_distances(pattern, text):
+    previous = list(range(len(pattern) + 1))
+    distances = []
+    for char in text:
+        current = [0]
+        for i, pattern_char in enumerate(pattern, 1):
+            current.append(
+                min(previous[i] + 1, current[i - 1] + 1,
+                    previous[i - 1] + (pattern_char != char)))
+        distances.append(current[-1])
+        previous = current
+    return distances
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+# pylint: disable=missing-docstring
+class MatchingTest(unittest.TestCase):
+
+    def test_edit_distances(self):
+        random.seed(0)
+        for _ in range(200):
+            pattern = "".join(random.choice("ab") for _ in range(random.randint(1, 80)))
+            text = "".join(random.choice("ab") for _ in range(random.randint(0, 40)))
+            self.assertEqual(list(matching.edit_distances(pattern, text)),
+                             search_distances(pattern, text))
+
+    def test_find_is_optimal(self):
+        random.seed(1)
+        for _ in range(200):
+            pattern = "".join(random.choice("abc") for _ in range(random.randint(1, 70)))
+            text = "".join(random.choice("abc") for _ in range(random.randint(0, 90)))
+            best = min(search_distances(pattern, text), default=len(pattern))
+            start, end = matching.find_approximate(pattern, text, 5)
+            if best > 5:
+                self.assertEqual((start, end), (-1, -1))
+            else:
+                self.assertEqual(levenshtein(pattern, text[start:end]), best)
+
+    def test_find_exact(self):
+        text = "the quick brown fox jumps over the lazy dog"
+        self.assertEqual(matching.find_approximate("fox", text, 0), (16, 19))
+
+    def test_find_approximate(self):
+        text = "a new clmate reprt today"
+        self.assertEqual(matching.find_approximate("climate report", text, 3),
+                         (6, 18))
+
+    def test_find_over_budget(self):
+        text = "a new clmate reprt today"
+        self.assertEqual(matching.find_approximate("climate report", text, 1),
+                         (-1, -1))
+
+    def test_find_start(self):
+        text = "fox and another fox"
+        self.assertEqual(matching.find_approximate("fox", text, 0, start=1),
+                         (16, 19))
+
+
+if __name__ == '__main__':
+    unittest.main()
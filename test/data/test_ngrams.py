@@ -0,0 +1,76 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Michael Wan <m.wan@berkeley.edu>
+"""Test methods defined in autociter.data.ngrams"""
+import unittest
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from autociter.data import ngrams
+from autociter.data.ngrams import NgramIndex
+
+TEXT = ("researchers publish new climate report\nby jane doe june 15 2018\n"
+        "the report says that climate policy and energy markets are changing "
+        "faster than governments expected")
+
+
+def trigrams(string):
+    return [string[i:i + 3] for i in range(len(string) - 2)]
+
+
+# pylint: disable=missing-docstring
+class NgramIndexTest(unittest.TestCase):
+
+    def test_similarities_match_tfidf_vectorizer(self):
+        field = "climate policy"
+        starts = list(range(0, len(TEXT) - len(field), 7))
+        windows = [TEXT[s:s + len(field)] for s in starts]
+        matrix = TfidfVectorizer(analyzer=trigrams).fit_transform([field] +
+                                                                  windows)
+        expected = (matrix[1:] @ matrix[0].T).toarray().flatten()
+        actual = NgramIndex(TEXT).similarities(field, starts)
+        np.testing.assert_allclose(actual, expected)
+
+    def test_find_exact(self):
+        index = NgramIndex(TEXT)
+        field = "climate policy and energy"
+        position = TEXT.find(field)
+        self.assertEqual(index.find(field), (position, position + len(field)))
+
+    def test_find_fuzzy(self):
+        index = NgramIndex(TEXT)
+        position = TEXT.find("climate policy and energy")
+        self.assertEqual(index.find("climate polcy and enrgy", 0.3),
+                         (position, position + 23))
+
+    def test_find_threshold(self):
+        index = NgramIndex(TEXT)
+        self.assertEqual(index.find("zebra quartz vixen"), (-1, -1))
+        self.assertEqual(index.find("ab"), (-1, -1))
+
+    def test_find_start(self):
+        index = NgramIndex(TEXT)
+        start = TEXT.find("\nthe report")
+        location = index.find("climate", start=start)
+        self.assertGreater(location[0], start)
+        self.assertEqual(TEXT[location[0]:location[1]], "climate")
+
+    def test_ngram_index_cache(self):
+        self.assertIs(ngrams.ngram_index(TEXT), ngrams.ngram_index(TEXT))
+
+
+if __name__ == '__main__':
+    unittest.main()
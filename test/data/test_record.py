@@ -30,6 +30,18 @@ class WikipediaArticleTest(unittest.TestCase):
         record = Record(["title", "author"], ["Painting", "Bob Ross"])
         self.assertEqual("", record["url"])
 
+    def test_get_item_with_missing_value(self):
+        record = Record(["title", "author", "url"], ["Painting"])
+        self.assertEqual("", record["author"])
+        self.assertFalse("url" in record)
+
+    def test_shared_positions(self):
+        record1 = Record(["title", "author"], ["Painting", "Bob Ross"])
+        record2 = Record(["title", "author"], ["Food", "Gordon Ramsay"])
+        self.assertIs(record1.positions, record2.positions)
+        with self.assertRaises(AttributeError):
+            record1.publisher = "PBS"
+
     def test_contains(self):
         record = Record(["title", "author"], ["Painting", "Bob Ross"])
         self.assertTrue("title" in record)
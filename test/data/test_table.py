@@ -18,8 +18,9 @@ import unittest
 import filecmp
 import os
 
-from autociter.data.storage import Table, Record
+from autociter.data.storage import EncodedColumn, LazyView, RecordWriter, Table, Record, sample
 import assets
+from autociter.data import queries
 
 
 # pylint: disable=missing-docstring,
@@ -156,3 +157,158 @@ class TableTest(unittest.TestCase):
         table1 = Table(self.filename)
         table2 = Table(self.filename)
         self.assertEqual(table1, table2)
+
+    def test_columns(self):
+        table = Table(fields=["url", "publisher"])
+        table.ENCODING_SIZE = 4
+        for i in range(20):
+            table.add(Record(table.fields, ["url" + str(i), "pub" + str(i % 2)]))
+        url_column, publisher_column = table.columns
+        self.assertIsInstance(url_column, list)
+        self.assertIsInstance(publisher_column, EncodedColumn)
+        self.assertEqual(publisher_column.values, ["pub0", "pub1"])
+        self.assertEqual(table[7], Record(table.fields, ["url7", "pub1"]))
+        self.assertEqual(table.find("publisher", "pub1")["url"], "url1")
+
+    def test_ragged_records(self):
+        table = Table(fields=["name", "number", "city"])
+        short = Record(table.fields, ["Balaji"])
+        long = Record(table.fields, ["Grace", "1", "Boston", "extra"])
+        table.extend([short, long])
+        self.assertEqual(table.records, [short, long])
+        self.assertEqual(table.find("city", "")["name"], "Balaji")
+
+    def test_add_after_custom_key(self):
+        table = Table(fields=["flavor", "rating"])
+        record1 = Record(table.fields, ["vanilla", 7.8])
+        record2 = Record(table.fields, ["chocolate", 5.3])
+        table.add(record1, "vanilla")
+        table.add(record2)
+        self.assertEqual(table[1], record2)
+        self.assertEqual(table.dictionary, {"vanilla": record1, 1: record2})
+        with self.assertRaises(KeyError):
+            table[0]  # pylint: disable=pointless-statement
+
+    def test_stream(self):
+        records = Table.stream(self.filename)
+        self.assertEqual(next(records),
+                         Record(["id", "first", "last", "department"],
+                                ["0316", "Balaji", "Veeramani", "Statistics"]))
+        self.assertEqual(list(Table.stream(self.filename, num_records=2)),
+                         Table(self.filename).records[:2])
+
+    def test_record_writer(self):
+        table = Table(self.filename)
+        with RecordWriter("temp_test_data.csv", table.fields) as writer:
+            count = writer.write_all(Table.stream(self.filename))
+        self.assertEqual(count, 4)
+        files_are_identical = filecmp.cmp(self.filename, "temp_test_data.csv")
+        self.assertTrue(files_are_identical)
+        os.remove("temp_test_data.csv")
+
+    def test_sample(self):
+        records = sample(Table.stream(self.filename), 2)
+        self.assertEqual(len(records), 2)
+        self.assertTrue(all(record in Table(self.filename) for record in records))
+        self.assertEqual(len(sample(Table.stream(self.filename), 10)), 4)
+
+    def test_create_index(self):
+        for kind in Table.INDEXES:
+            table = Table(self.filename)
+            table.create_index("department", kind)
+            table.add(Record(table.fields, ["2001", "Ada", "Lovelace", "EECS"]))
+            self.assertEqual(table.find("department", "EECS")["first"], "Michael")
+            self.assertEqual(table.find("department", "Chemistry"), None)
+            queried = table.query(queries.equals("department", "EECS"))
+            self.assertEqual([record["last"] for record in queried],
+                             ["Wan", "Lovelace"])
+            self.assertIn(Record(table.fields, ["2001", "Ada", "Lovelace", "EECS"]),
+                          table)
+            self.assertNotIn(Record(table.fields, ["2001", "Ada", "Byron", "EECS"]),
+                             table)
+
+    def test_sorted_index_prefix(self):
+        table = Table(self.filename)
+        table.create_index("last", "sorted")
+        self.assertEqual(table.lookup(queries.startswith("last", "W")), [2, 3])
+        queried = table.query(
+            queries.both(queries.startswith("last", "W"),
+                         queries.equals("department", "EECS")))
+        self.assertEqual(queried.records, [table[2]])
+
+    def test_create_index_with_invalid_arguments(self):
+        table = Table(self.filename)
+        with self.assertRaises(ValueError):
+            table.create_index("department", "btree")
+        with self.assertRaises(ValueError):
+            table.create_index("salary")
+
+    def test_compiled_query(self):
+        table = Table(self.filename)
+        table.add(Record(table.fields, ["2001", "", "Lovelace", "EECS"]))
+        query = queries.both(
+            queries.contains("first"),
+            queries.either(queries.equals("department", "EECS"),
+                           queries.negate(queries.startswith("last", "V"))))
+        view = table.query(query)
+        self.assertEqual(list(view.rows), [1, 2, 3])
+        self.assertEqual(view.records,
+                         [record for record in table if query(record)])
+        self.assertEqual(len(table.query(queries.contains("salary"))), 0)
+        self.assertEqual(len(table.query(lambda record: True)), 5)
+
+    def test_view(self):
+        table = Table(self.filename)
+        view = table.query(queries.equals("department", "Mathematics"))
+        self.assertEqual(len(view), 2)
+        self.assertEqual(view[1], table[3])
+        self.assertEqual(view.find("first", "Derek"), table[3])
+        narrowed = view.query(queries.startswith("last", "W"))
+        self.assertEqual(narrowed.records, [table[3]])
+        self.assertIn(table[1], view)
+        with self.assertRaises(KeyError):
+            view[2]  # pylint: disable=pointless-statement
+
+
+    def test_parallel_load(self):
+        with open("temp_test_data.csv", "w", encoding="utf-8") as file:
+            file.write("id\tname\n")
+            for number in range(50):
+                file.write("{0}\tdepartment {1}\n".format(number, number % 3))
+            file.write("50\n51\tEECS\textra\r\n52\tEECS")
+        expected = Table("temp_test_data.csv")
+        table = Table()
+        table.LOAD_CHUNK_SIZE = 64
+        self.assertEqual(table.load("temp_test_data.csv", num_workers=2),
+                         expected)
+        self.assertEqual(table.ragged, expected.ragged)
+        self.assertEqual(table.filled, expected.filled)
+        table = Table()
+        table.LOAD_CHUNK_SIZE = 64
+        self.assertEqual(table.load("temp_test_data.csv", 20, 2),
+                         Table().load("temp_test_data.csv", 20))
+        os.remove("temp_test_data.csv")
+
+    def test_lazy_view(self):
+        table = Table(self.filename)
+        calls = []
+
+        def upper(record):
+            calls.append(record)
+            return Record(record.fields, [value.upper() for value in record.values])
+
+        view = table.map(upper).filter(queries.contains("first")).limit(2)
+        self.assertIsInstance(view, LazyView)
+        self.assertEqual(calls, [])
+        self.assertEqual([record["first"] for record in view],
+                         ["BALAJI", "GRACE"])
+        self.assertEqual(len(calls), 2)
+        mathematics = queries.equals("department", "Mathematics")
+        self.assertEqual(table.filter(mathematics).limit(1).records, [table[1]])
+        self.assertEqual(
+            table.query(mathematics).map(upper).find("last", "WALEFFE"),
+            upper(table[3]))
+        self.assertEqual(table.limit(0).records, [])
+        self.assertEqual(
+            LazyView(Table.stream(self.filename)).limit(3).to_table(),
+            Table(fields=table.fields).load(self.filename, 3))
@@ -32,16 +32,24 @@ server = None  # pylint: disable=invalid-name
 class CustomHandler(http.server.SimpleHTTPRequestHandler):
     """Custom request handler does NOT print to the console."""
 
+    # Keep connections alive so that connection reuse can be tested
+    protocol_version = "HTTP/1.1"
+
     # Disable output from handler
     def log_message(self, format, *args):  # pylint: disable=redefined-builtin
         return ""
 
 
-class CustomServer(socketserver.TCPServer):
-    """Custom TCP server that is less prone to errors."""
+class CustomServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Custom TCP server that is less prone to errors.
+
+    Each connection is handled by its own thread, so concurrent clients are
+    served concurrently.
+    """
 
     # Allow address reuse to prevent errors
     allow_reuse_address = True
+    daemon_threads = True
 
 
 def start():
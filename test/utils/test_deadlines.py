@@ -0,0 +1,48 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the Deadline object defined in autociter.utils.deadlines."""
+import time
+import unittest
+
+from autociter.utils.deadlines import Deadline
+from autociter.utils.decorators import TimeoutException
+
+
+# pylint: disable=missing-docstring
+class DeadlineTest(unittest.TestCase):
+
+    def test_unbounded(self):
+        deadline = Deadline()
+        self.assertIsNone(deadline.remaining)
+        self.assertFalse(deadline.expired)
+        self.assertEqual(deadline.timeout(5), 5)
+
+    def test_remaining(self):
+        deadline = Deadline(10)
+        self.assertTrue(9 < deadline.remaining <= 10)
+        self.assertEqual(deadline.timeout(1), 1)
+        self.assertTrue(9 < deadline.timeout(20) <= 10)
+
+    def test_expired(self):
+        deadline = Deadline(0.01)
+        deadline.check()
+        time.sleep(0.02)
+        self.assertTrue(deadline.expired)
+        self.assertEqual(deadline.remaining, 0)
+        with self.assertRaises(TimeoutException):
+            deadline.check()
+        with self.assertRaises(TimeoutException):
+            deadline.timeout()
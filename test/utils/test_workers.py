@@ -0,0 +1,78 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the WorkerPool object defined in autociter.utils.workers."""
+import os
+import threading
+import time
+import unittest
+
+from autociter.utils.decorators import TimeoutException
+from autociter.utils.workers import WorkerPool
+
+
+def task(seconds, value):
+    time.sleep(seconds)
+    if isinstance(value, Exception):
+        raise value
+    return value, os.getpid()
+
+
+# pylint: disable=missing-docstring
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(task, num_workers=2, max_pending=1)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_apply(self):
+        value, pid = self.pool.apply(0, "foo")
+        self.assertEqual(value, "foo")
+        self.assertNotEqual(pid, os.getpid())
+
+    def test_worker_is_reused(self):
+        _, pid1 = self.pool.apply(0, None)
+        _, pid2 = self.pool.apply(0, None)
+        self.assertEqual(pid1, pid2)
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            self.pool.apply(0, ValueError("bar"))
+
+    def test_timeout_kills_worker(self):
+        _, pid = self.pool.apply(0, None)
+        with self.assertRaises(TimeoutException):
+            self.pool.apply(5, None, timeout=0.2)
+        value, new_pid = self.pool.apply(0, "baz")
+        self.assertEqual(value, "baz")
+        self.assertEqual(len(self.pool.workers), 1)
+        with self.assertRaises(OSError):
+            os.kill(pid, 0)
+        self.assertNotEqual(pid, new_pid)
+
+    def test_pending_tasks_are_bounded(self):
+        threads = [
+            threading.Thread(target=self.pool.apply, args=(0.5, None))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        with self.assertRaises(TimeoutException):
+            self.pool.apply(0, None, timeout=0.1)
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,88 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the DiskCache object defined in web.caching."""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from autociter.web.caching import DiskCache, normalize_url
+
+
+# pylint: disable=missing-docstring
+class DiskCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DiskCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("HTTP://Example.com:80/a?b=2&a=1#top"),
+            "http://example.com/a?a=1&b=2")
+        self.assertEqual(
+            normalize_url("https://example.com:8443"),
+            "https://example.com:8443/")
+
+    def test_put_and_get(self):
+        self.cache.put("http://example.com/", b"<html></html>")
+        self.assertEqual(self.cache.get("http://EXAMPLE.com"), b"<html></html>")
+        self.assertIsNone(self.cache.get("http://example.org/"))
+
+    def test_shared_between_instances(self):
+        self.cache.put("http://example.com/", b"data")
+        other = DiskCache(self.directory)
+        self.assertEqual(other.get("http://example.com/"), b"data")
+
+    def test_entries_are_compressed(self):
+        data = b"a" * 100000
+        self.cache.put("http://example.com/", data)
+        self.assertLess(self.cache.size, len(data) // 10)
+
+    def test_expired_entry(self):
+        cache = DiskCache(self.directory, ttl=0)
+        cache.put("http://example.com/", b"data")
+        time.sleep(0.01)
+        self.assertIsNone(cache.get("http://example.com/"))
+        self.assertEqual(cache.size, 0)
+
+    def test_large_entry_is_not_cached(self):
+        cache = DiskCache(self.directory, max_entry_bytes=10)
+        cache.put("http://example.com/", b"a" * 11)
+        self.assertIsNone(cache.get("http://example.com/"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        urls = ["http://example.com/" + str(i) for i in range(3)]
+        for i, url in enumerate(urls):
+            self.cache.put(url, os.urandom(1000))
+            # Give each entry a distinct modification time
+            path = self.cache.path(url)
+            os.utime(path, (i, i))
+        self.cache.get(urls[0])
+        cache = DiskCache(self.directory, max_bytes=2500)
+        cache.put("http://example.com/new", os.urandom(1000))
+        self.assertIsNotNone(cache.get(urls[0]))
+        self.assertIsNone(cache.get(urls[1]))
+        self.assertLessEqual(cache.size, 2500)
+
+    def test_clear(self):
+        self.cache.put("http://example.com/", b"data")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("http://example.com/"))
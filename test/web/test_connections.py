@@ -0,0 +1,137 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the ConnectionPool object defined in web.connections."""
+import http.server
+import socket
+import socketserver
+import threading
+import time
+import unittest
+from urllib.error import HTTPError, URLError
+
+from test import server
+import assets
+
+from autociter.utils.deadlines import Deadline
+from autociter.utils.decorators import TimeoutException
+from autociter.web.connections import ConnectionPool
+
+
+class ClosingHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files over HTTP/1.0 without printing to the console."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        return ""
+
+
+# pylint: disable=missing-docstring
+class ConnectionPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        server.start()
+
+    def setUp(self):
+        self.url = server.ADDRESS + "/simple_webpage.html"
+        self.pool = ConnectionPool()
+
+    def tearDown(self):
+        self.pool.clear()
+
+    def test_urlopen(self):
+        filename = assets.WEBPAGES_PATH + "/simple_webpage.html"
+        with open(filename, "rb") as source:
+            expected = source.read()
+        with self.pool.urlopen(self.url) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.read(), expected)
+
+    def test_connection_reuse(self):
+        with self.pool.urlopen(self.url) as response:
+            response.read()
+        connection = self.pool.idle[("http", server.HOST + ":" +
+                                     str(server.PORT))][0]
+        with self.pool.urlopen(self.url) as response:
+            response.read()
+            self.assertIs(response.connection, connection)
+
+    def test_unread_response_is_not_reused(self):
+        with self.pool.urlopen(self.url):
+            pass
+        self.assertFalse(any(self.pool.idle.values()))
+
+    def test_http_error(self):
+        with self.assertRaises(HTTPError):
+            self.pool.urlopen(server.ADDRESS + "/missing.html")
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(URLError):
+            self.pool.urlopen("ftp://localhost/file.txt")
+
+    def test_read_with_deadline(self):
+        deadline = Deadline(5)
+        with self.pool.urlopen(self.url, deadline=deadline) as response:
+            self.assertEqual(len(response.read(deadline=deadline)), 134)
+        self.assertTrue(any(self.pool.idle.values()))
+
+    def test_read_with_deadline_from_closing_server(self):
+        # An HTTP/1.0 server closes the connection after every response
+        closing = socketserver.TCPServer(("localhost", 0), ClosingHandler)
+        thread = threading.Thread(target=closing.serve_forever)
+        thread.start()
+        url = "http://localhost:" + str(closing.server_address[1])
+        deadline = Deadline(5)
+        try:
+            with self.pool.urlopen(url + "/simple_webpage.html",
+                                   deadline=deadline) as response:
+                self.assertTrue(response.response.will_close)
+                self.assertEqual(len(response.read(deadline=deadline)), 134)
+            self.assertFalse(any(self.pool.idle.values()))
+        finally:
+            closing.shutdown()
+            closing.server_close()
+            thread.join()
+
+    def test_deadline_aborts_stalled_response(self):
+        listener = socket.socket()
+        listener.bind(("localhost", 0))
+        listener.listen(1)
+        accepted = []
+
+        def stall():
+            connection, _ = listener.accept()
+            accepted.append(connection)
+            connection.recv(1024)
+            connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n1")
+
+        thread = threading.Thread(target=stall)
+        thread.start()
+        url = "http://localhost:" + str(listener.getsockname()[1]) + "/"
+        start = time.time()
+        deadline = Deadline(0.3)
+        with self.assertRaises(TimeoutException):
+            with self.pool.urlopen(url, deadline=deadline) as response:
+                response.read(deadline=deadline)
+        self.assertLess(time.time() - start, 2)
+        self.assertFalse(any(self.pool.idle.values()))
+        thread.join()
+        for connection in accepted:
+            connection.close()
+        listener.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        server.end()
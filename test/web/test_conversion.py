@@ -0,0 +1,72 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the lightweight converter defined in web.conversion."""
+import unittest
+
+import assets
+
+from autociter.utils.deadlines import Deadline
+from autociter.utils.decorators import TimeoutException
+from autociter.web import conversion
+from autociter.web.conversion import html_to_markdown
+
+
+# pylint: disable=missing-docstring
+class ConversionTest(unittest.TestCase):
+
+    def test_headings(self):
+        html = "<h1>Title</h1><h3>Sub<em>title</em></h3>"
+        self.assertEqual("# Title\n\n### Subtitle", html_to_markdown(html))
+
+    def test_ignored_elements(self):
+        html = ("<head><title>T</title><style>p {}</style></head><body>"
+                "<script>var x = '<p>';</script><p>Text</p></body>")
+        self.assertEqual("Text", html_to_markdown(html))
+
+    def test_whitespace(self):
+        html = "<p>  One\n\n  <b>two</b>   three<span>four</span> </p>"
+        self.assertEqual("One two threefour", html_to_markdown(html))
+
+    def test_lists_and_breaks(self):
+        html = "<p>a<br>b</p><ul><li>one</li><li>two</li></ul>"
+        self.assertEqual("a\nb\n\n  * one\n  * two", html_to_markdown(html))
+
+    def test_entities(self):
+        self.assertEqual("Q&A", html_to_markdown("<p>Q&amp;A</p>"))
+
+    def test_titles(self):
+        converter = conversion.convert(
+            "<head><title> Page </title><meta property=\"og:title\" "
+            "content=\"Open Graph\"></head><h1>Heading</h1>")
+        self.assertEqual("Page", converter.title)
+        self.assertEqual("Open Graph", converter.open_graph_title)
+        self.assertEqual("# Heading", converter.markdown)
+
+    def test_article(self):
+        with open(assets.WEBPAGES_PATH + "/news_article.html") as file:
+            markdown = html_to_markdown(file.read())
+        self.assertIn("\n# Researchers Publish New Climate Report\n", markdown)
+        self.assertNotIn("dataLayer", markdown)
+        self.assertNotIn("<", markdown)
+
+    def test_deadline(self):
+        deadline = Deadline(0)
+        with self.assertRaises(TimeoutException):
+            html_to_markdown("<p>Text</p>", deadline)
+
+
+if __name__ == '__main__':
+    unittest.main()
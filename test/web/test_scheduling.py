@@ -0,0 +1,96 @@
+# Copyright 2018 Balaji Veeramani, Michael Wan
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# Author: Balaji Veeramani <bveeramani@berkeley.edu>
+"""Test the HostScheduler object defined in web.scheduling."""
+import threading
+import time
+import unittest
+
+from autociter.web.scheduling import HostScheduler, host_of
+
+
+# pylint: disable=missing-docstring
+class HostSchedulerTest(unittest.TestCase):
+
+    def test_host_of(self):
+        self.assertEqual(host_of("https://WWW.NYTimes.com:443/a"),
+                         "www.nytimes.com")
+
+    def test_map(self):
+        urls = ["http://a.com/" + str(i) for i in range(10)]
+        with HostScheduler(concurrency=4) as scheduler:
+            self.assertEqual(scheduler.map(len, urls), [len(u) for u in urls])
+
+    def test_exceptions_are_propagated(self):
+
+        def fail(url):
+            raise ValueError(url)
+
+        with HostScheduler() as scheduler:
+            with self.assertRaises(ValueError):
+                scheduler.map(fail, ["http://a.com/"])
+
+    def test_max_per_host(self):
+        lock = threading.Lock()
+        active, peak = {}, {}
+
+        def task(url):
+            host = host_of(url)
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+        urls = ["http://a.com/" + str(i) for i in range(8)]
+        urls += ["http://b.com/" + str(i) for i in range(8)]
+        with HostScheduler(concurrency=8, max_per_host=2) as scheduler:
+            scheduler.map(task, urls)
+        self.assertEqual(peak, {"a.com": 2, "b.com": 2})
+
+    def test_hosts_are_interleaved(self):
+        order = []
+        urls = ["http://a.com/" + str(i) for i in range(3)]
+        urls += ["http://b.com/" + str(i) for i in range(3)]
+        with HostScheduler(concurrency=1) as scheduler:
+            scheduler.map(lambda url: order.append(host_of(url)), urls)
+        self.assertEqual(order, ["a.com", "b.com"] * 3)
+
+    def test_min_interval(self):
+        starts = []
+        urls = ["http://a.com/" + str(i) for i in range(3)]
+        with HostScheduler(concurrency=3, min_interval=0.05) as scheduler:
+            scheduler.map(lambda url: starts.append(time.time()), urls)
+        starts.sort()
+        self.assertGreaterEqual(starts[2] - starts[0], 0.09)
+
+    def test_idle_hosts_leave_rotation(self):
+        with HostScheduler(concurrency=2) as scheduler:
+            scheduler.map(len, ["http://a.com/", "http://b.com/"])
+            self.assertEqual((list(scheduler.rotation), scheduler.queues),
+                             ([], {}))
+            self.assertEqual(scheduler.map(len, ["http://a.com/1"]), [14])
+        self.assertEqual(scheduler.stats()["a.com"].completed, 2)
+
+    def test_stats(self):
+        urls = ["http://a.com/" + str(i) for i in range(4)] + ["http://b.com/"]
+        with HostScheduler(concurrency=2, max_per_host=1) as scheduler:
+            scheduler.map(lambda url: time.sleep(0.01), urls)
+        stats = scheduler.stats()
+        self.assertEqual(stats["a.com"].completed, 4)
+        self.assertEqual(stats["b.com"].completed, 1)
+        self.assertEqual(stats["a.com"].queued, 0)
+        self.assertGreater(stats["a.com"].max_wait, 0)
@@ -14,11 +14,15 @@
 #
 # Author: Balaji Veeramani <bveeramani@berkeley.edu>
 """Test methods of the Webpage object defined in web.webpages."""
+import shutil
+import tempfile
 import unittest
+from urllib.error import HTTPError
 
 from test import server
 import assets
 
+from autociter.web.caching import DiskCache
 from autociter.web.webpages import Webpage
 
 
@@ -31,6 +35,14 @@ class WebpageTest(unittest.TestCase):
 
     def setUp(self):
         self.url = server.ADDRESS + "/simple_webpage.html"
+        # Cache downloads in a temporary directory, so every test fetches
+        self.original_cache = Webpage.DISK_CACHE
+        self.cache_directory = tempfile.mkdtemp()
+        Webpage.DISK_CACHE = DiskCache(self.cache_directory)
+
+    def tearDown(self):
+        Webpage.DISK_CACHE = self.original_cache
+        shutil.rmtree(self.cache_directory)
 
     def test_url(self):
         webpage = Webpage(self.url)
@@ -59,6 +71,40 @@ class WebpageTest(unittest.TestCase):
         webpage = Webpage(self.url)
         self.assertEqual("# Heading\n\nThis is a paragraph.", webpage.markdown)
 
+    def test_markdown_lite(self):
+        webpage = Webpage(self.url, converter="lite")
+        self.assertEqual("# Heading\n\nThis is a paragraph.", webpage.markdown)
+        self.assertEqual("# Heading\n\nThis is a paragraph.", webpage.content)
+
+    def test_unknown_converter(self):
+        with self.assertRaises(ValueError):
+            Webpage(self.url, converter="pandoc")
+
+    def test_fetch_many(self):
+        urls = [self.url] * 4 + [server.ADDRESS + "/missing.html"]
+        webpages = Webpage.fetch_many(urls, concurrency=3)
+        filename = assets.WEBPAGES_PATH + "/simple_webpage.html"
+        with open(filename) as source:
+            expected = source.read()
+        self.assertEqual([w.url for w in webpages], urls)
+        for webpage in webpages[:4]:
+            self.assertEqual(webpage.cache["source"], expected)
+        with self.assertRaises(HTTPError):
+            webpages[4].source  # pylint: disable=pointless-statement
+
+    def test_budget(self):
+        webpage = Webpage(self.url)
+        deadline = webpage.budget()
+        self.assertIs(webpage.budget(), deadline)
+        webpage.markdown  # pylint: disable=pointless-statement
+        self.assertIs(webpage.deadline, deadline)
+
+    def test_budget_starts_after_fetch_many(self):
+        webpage, = Webpage.fetch_many([self.url])
+        self.assertIsNone(webpage.deadline)
+        webpage.markdown  # pylint: disable=pointless-statement
+        self.assertIsNotNone(webpage.deadline)
+
     @classmethod
     def tearDownClass(cls):
         server.end()